@@ -4,6 +4,8 @@ import re
 import sys
 from datetime import datetime
 import logging
+from services.company_repository import get_company_repository
+from services.json_stream import get_json_stream_reader
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +23,13 @@ def extract_linkedin_url(text):
     match = re.search(linkedin_pattern, text)
     return match.group(0) if match else "Not available"
 
+def parse_final_summary(final_summary):
+    """Return (name, linkedin_url) parsed from a 'Name: ...\nLinkedIn: ...' summary"""
+    linkedin_url = extract_linkedin_url(final_summary)
+    name_match = re.search(r'Name:\s*([^\n]+)', final_summary or '')
+    name = name_match.group(1).strip() if name_match else "Not available"
+    return name, linkedin_url
+
 def extract_company_data():
     """Extract company names and LinkedIn URLs from final_summaries.json"""
     try:
@@ -39,146 +48,35 @@ def extract_company_data():
                 logger.warning(f"final_summaries.json not found at {file_path} or {cwd_path}")
                 return []
 
-        logger.info(f"Reading file from: {file_path}")
-        
-        # Read the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Incremental decode: only objects appended since the last call are parsed
+        records = get_json_stream_reader(file_path).read()
         
-        if not content.strip():
+        if not records:
             logger.warning("final_summaries.json is empty")
             return []
-            
-        logger.info(f"File content length: {len(content)} characters")
         
-        # Fix for malformed JSON - find all JSON objects
         results = []
-        
-        # First try to parse as a JSON array
-        try:
-            # Check if the content starts with [ and ends with ]
-            if content.strip().startswith('[') and content.strip().endswith(']'):
-                data_array = json.loads(content)
-                logger.info(f"Successfully parsed content as JSON array with {len(data_array)} items")
-                
-                for data in data_array:
-                    try:
-                        company_name = data.get('Company', 'Unknown')
-                        final_summary = data.get('Final_Summary', '')
-                        
-                        # Extract LinkedIn URL
-                        linkedin_url = extract_linkedin_url(final_summary)
-                        
-                        # Extract name using regex
-                        name_match = re.search(r'Name:\s*([^\n]+)', final_summary)
-                        name = name_match.group(1).strip() if name_match else "Not available"
-                        
-                        # Create result object
-                        result = {
-                            'company': company_name,
-                            'name': name,
-                            'linkedin_url': linkedin_url,
-                            'timestamp': data.get('Timestamp', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                        }
-                        
-                        results.append(result)
-                    except Exception as e:
-                        logger.error(f"Error processing array item: {str(e)}")
-                        continue
-                
-                # If we successfully parsed data, return it
-                if results:
-                    logger.info(f"Extracted {len(results)} companies from JSON array")
-                    return results
-        except json.JSONDecodeError:
-            logger.info("Content is not a valid JSON array, trying individual JSON objects")
-        except Exception as e:
-            logger.error(f"Error parsing JSON array: {str(e)}")
-        
-        # If array parsing failed, try finding individual JSON objects
-        logger.info("Attempting to extract individual JSON objects")
-        
-        # More robust pattern to match JSON objects - looks for content between { and }
-        # This handles nested braces more effectively
-        pattern = r'\{(?:[^{}]|(?R))*\}'
-        
-        # Fallback to simpler pattern if re.DOTALL is not supported or for compatibility
-        try:
-            json_matches = re.findall(pattern, content, re.DOTALL)
-        except Exception:
-            # Fallback to simpler but less accurate pattern
-            pattern = r'\{[^{]*?\}'
-            json_matches = re.findall(pattern, content, re.DOTALL)
-        
-        logger.info(f"Found {len(json_matches)} potential JSON objects")
-        
-        for json_str in json_matches:
+        for data in records:
             try:
-                data = json.loads(json_str)
                 company_name = data.get('Company', 'Unknown')
                 final_summary = data.get('Final_Summary', '')
                 
                 if not company_name or company_name == 'Unknown':
                     continue
                 
-                # Extract LinkedIn URL
-                linkedin_url = extract_linkedin_url(final_summary)
+                name, linkedin_url = parse_final_summary(final_summary)
                 
-                # Extract name using regex
-                name_match = re.search(r'Name:\s*([^\n]+)', final_summary)
-                name = name_match.group(1).strip() if name_match else "Not available"
-                
-                # Create result object
-                result = {
+                results.append({
                     'company': company_name,
                     'name': name,
                     'linkedin_url': linkedin_url,
+                    'summary': final_summary,
                     'timestamp': data.get('Timestamp', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                }
-                
-                results.append(result)
-                logger.info(f"Successfully extracted data for company: {company_name}")
-            except json.JSONDecodeError:
-                logger.warning(f"Error decoding JSON object: {json_str[:50]}...")
-                continue
+                })
             except Exception as e:
                 logger.error(f"Error processing object: {str(e)}")
                 continue
         
-        # If no results found, try one last method - line by line parsing
-        if not results:
-            logger.info("Trying line-by-line parsing as a last resort")
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line.startswith('{') and line.endswith('}'):
-                            try:
-                                data = json.loads(line)
-                                company_name = data.get('Company', 'Unknown')
-                                final_summary = data.get('Final_Summary', '')
-                                
-                                # Extract LinkedIn URL
-                                linkedin_url = extract_linkedin_url(final_summary)
-                                
-                                # Extract name using regex
-                                name_match = re.search(r'Name:\s*([^\n]+)', final_summary)
-                                name = name_match.group(1).strip() if name_match else "Not available"
-                                
-                                # Create result object
-                                result = {
-                                    'company': company_name,
-                                    'name': name,
-                                    'linkedin_url': linkedin_url,
-                                    'timestamp': data.get('Timestamp', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                                }
-                                
-                                results.append(result)
-                            except:
-                                continue
-            except Exception as e:
-                logger.error(f"Error in line-by-line parsing: {str(e)}")
-        
         logger.info(f"Final extraction result: {len(results)} companies")
         return results
     except Exception as e:
@@ -203,9 +101,50 @@ def save_extracted_data(data, filename='extracted_company_data.json'):
         logger.error(f"Error saving extracted data: {str(e)}")
         return False
 
-def get_formatted_company_data():
-    """Get extracted company data in a formatted string"""
-    data = extract_company_data()
+def sync_company_repository():
+    """Import final_summaries.json into the SQLite repository once"""
+    repository = get_company_repository()
+    if repository.get_meta('final_summaries_imported'):
+        return repository
+    
+    rows = extract_company_data()
+    repository.add_final_summaries([
+        {
+            'company': row['company'],
+            'name': row['name'],
+            'linkedin_url': row['linkedin_url'],
+            'summary': row['summary'],
+            'timestamp': row['timestamp']
+        }
+        for row in rows
+    ])
+    repository.set_meta('final_summaries_imported', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    logger.info(f"Imported {len(rows)} summaries from final_summaries.json into {repository.db_path}")
+    return repository
+
+def record_final_summary(company_name, final_summary, timestamp, source_results=None, name=None, linkedin_url=None):
+    """Store a final summary (and optionally its source results) in the SQLite repository.
+
+    Callers that already hold the parsed name/LinkedIn URL pass them to skip re-parsing the text.
+    """
+    try:
+        repository = sync_company_repository()
+        run_id = repository.record_run(company_name, source_results, timestamp) if source_results else None
+        if name is None:
+            name, linkedin_url = parse_final_summary(final_summary)
+        repository.add_final_summary(company_name, final_summary, name, linkedin_url, timestamp, run_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error recording final summary in repository: {str(e)}")
+        return False
+
+def get_formatted_company_data(search=None, limit=None, offset=0):
+    """Get company data from the SQLite repository"""
+    try:
+        data = sync_company_repository().list_summaries(limit=limit, offset=offset, search=search)
+    except Exception as e:
+        logger.error(f"Error querying company repository: {str(e)}")
+        data = []
     
     if not data:
         logger.warning("No company data available for formatting")
@@ -216,6 +155,22 @@ def get_formatted_company_data():
     # Return the raw data for processing in the UI
     return data
 
+def get_company_count(search=None):
+    """Number of summaries matching the search, for pagination"""
+    try:
+        return sync_company_repository().count_summaries(search=search)
+    except Exception as e:
+        logger.error(f"Error counting companies: {str(e)}")
+        return 0
+
+def get_company_summary(row_id):
+    """Look up a single summary row by id"""
+    try:
+        return sync_company_repository().get_summary(row_id)
+    except Exception as e:
+        logger.error(f"Error fetching company row {row_id}: {str(e)}")
+        return None
+
 def get_formatted_company_markdown(data):
     """Convert the company data to a markdown table"""
     if not data or not isinstance(data, list):
@@ -270,27 +225,15 @@ def fix_final_summaries_file():
             logger.info("File is already in JSON array format")
             return True
             
-        # Find all JSON objects in the file
-        pattern = r'\{[^{]*?\}'
-        json_matches = re.findall(pattern, content, re.DOTALL)
-        
-        logger.info(f"Found {len(json_matches)} potential JSON objects")
+        # Decode all concatenated JSON objects in the file
+        records = get_json_stream_reader(file_path).read()
+        logger.info(f"Found {len(records)} JSON objects")
         
-        # Parse each JSON object
-        extracted_objects = []
-        for json_str in json_matches:
-            try:
-                data = json.loads(json_str)
-                # Ensure we have all the required fields
-                if 'Company' in data and 'Final_Summary' in data:
-                    extracted_objects.append(data)
-                    logger.info(f"Successfully parsed object for company: {data.get('Company')}")
-            except json.JSONDecodeError:
-                logger.warning(f"Error decoding JSON object: {json_str[:50]}...")
-                continue
-            except Exception as e:
-                logger.error(f"Error processing object: {str(e)}")
-                continue
+        # Keep only objects with the required fields
+        extracted_objects = [
+            data for data in records
+            if isinstance(data, dict) and 'Company' in data and 'Final_Summary' in data
+        ]
         
         if not extracted_objects:
             logger.warning("No valid objects extracted, cannot fix file")
@@ -0,0 +1,249 @@
+import argparse
+import asyncio
+import csv
+import functools
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from services.batch_summarizer import SummaryBatcher
+from services.lookup_cache import is_cacheable
+from services.models import SourceResult
+from services.rate_limiter import TokenBucket
+from services.result_store import ResultStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+SOURCES = ("perplexity", "openai", "google", "jecrc")
+SUMMARY = "summary"
+
+# Browser-driven sources are expensive; API/crawler sources can fan out further
+DEFAULT_CONCURRENCY = {"perplexity": 1, "openai": 1, "google": 4, "jecrc": 2, SUMMARY: 4}
+# Requests per second allowed for each source (0 disables the limiter)
+DEFAULT_RATES = {"perplexity": 0.2, "openai": 0.2, "google": 1.0, "jecrc": 0.5, SUMMARY: 1.0}
+
+
+def parse_limits(value: str, defaults: Dict[str, float], cast=float) -> Dict[str, float]:
+    """Parse 'source=value,source=value' overrides on top of the defaults"""
+    limits = dict(defaults)
+    for item in filter(None, (value or "").split(",")):
+        source, _, amount = item.partition("=")
+        if source.strip() not in limits:
+            raise argparse.ArgumentTypeError(f"Unknown source '{source}'")
+        limits[source.strip()] = cast(amount)
+    return limits
+
+
+def read_companies(path: str) -> List[str]:
+    """Read company names from a CSV (a 'Company Name' column or the first column) or a plain text file"""
+    companies = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.reader(f)
+            header = next(reader, None)
+            column = header.index('Company Name') if header and 'Company Name' in header else 0
+            if header and column == 0 and 'Company Name' not in header:
+                companies.append(header[0])
+            companies.extend(row[column] for row in reader if row and len(row) > column)
+        else:
+            companies.extend(f.read().splitlines())
+
+    seen = set()
+    unique = []
+    for company in (c.strip() for c in companies):
+        if company and company not in seen:
+            seen.add(company)
+            unique.append(company)
+    return unique
+
+
+class BatchPipeline:
+    """Run the four-source + summary pipeline over many companies concurrently.
+
+    Every source has its own semaphore and token bucket. Each finished
+    (company, source) step is appended to a JSONL checkpoint, so an
+    interrupted run resumes at the first step that has no checkpoint record.
+    Source steps are SourceResults (checkpointed as dicts); the summary step is text.
+    """
+
+    def __init__(self,
+                 sources,
+                 summarize,
+                 checkpoint_path: str,
+                 concurrency: Dict[str, int],
+                 rates: Dict[str, float],
+                 companies_in_flight: int = 8,
+                 retry_errors: bool = False):
+        self.sources = sources
+        self.summarize = summarize
+        self.checkpoint = ResultStore(checkpoint_path)
+        self.concurrency = concurrency
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        self.buckets = {name: TokenBucket(rate) for name, rate in rates.items()}
+        self.companies_in_flight = companies_in_flight
+        self.retry_errors = retry_errors
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(int(limit) for limit in concurrency.values()),
+            thread_name_prefix="batch"
+        )
+        self.completed: Dict[Tuple[str, str], Any] = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict[Tuple[str, str], Any]:
+        completed = {}
+        for record in self.checkpoint:
+            result = record['result']
+            if record['source'] != SUMMARY:
+                result = SourceResult.coerce(record['source'], result)
+            if self.retry_errors and not is_cacheable(result):
+                continue
+            completed[(record['company'], record['source'])] = result
+        logger.info(f"Loaded {len(completed)} completed steps from {self.checkpoint.path}")
+        return completed
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        """Per-source semaphore for the running loop (created on first use, not in __init__)"""
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if name not in semaphores:
+            semaphores[name] = asyncio.Semaphore(max(1, int(self.concurrency[name])))
+        return semaphores[name]
+
+    async def _call(self, name: str, fn, *args):
+        """Run one step under its source's concurrency limit and rate limiter"""
+        async with self._semaphore(name):
+            await self.buckets[name].acquire()
+            if asyncio.iscoroutinefunction(fn):
+                return await fn(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def _run_step(self, company: str, name: str, fn, *args) -> Any:
+        key = (company, name)
+        if key in self.completed:
+            return self.completed[key]
+        start = time.monotonic()
+        try:
+            result = await self._call(name, fn, *args)
+        except Exception as e:
+            logger.error(f"Error in {name} for {company}: {str(e)}")
+            result = SourceResult(source=name, text=f"Error in {name} search: {str(e)}", error=str(e))
+        if name != SUMMARY:
+            result = SourceResult.coerce(name, result, time.monotonic() - start)
+        elif isinstance(result, SourceResult):
+            result = result.text
+        self.checkpoint.append({
+            'company': company,
+            'source': name,
+            'result': result.to_dict() if isinstance(result, SourceResult) else result,
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+        self.completed[key] = result
+        return result
+
+    async def process_company(self, company: str) -> str:
+        results = await asyncio.gather(*(
+            self._run_step(company, name, self.sources[name], company) for name in SOURCES
+        ))
+        return await self._run_step(company, SUMMARY, self.summarize, company, dict(zip(SOURCES, results)))
+
+    async def run(self, companies: List[str]):
+        remaining = [c for c in companies if (c, SUMMARY) not in self.completed]
+        logger.info(f"{len(companies) - len(remaining)} of {len(companies)} companies already complete")
+        queue: asyncio.Queue = asyncio.Queue()
+        for company in remaining:
+            queue.put_nowait(company)
+        done_count = 0
+
+        async def worker():
+            nonlocal done_count
+            while True:
+                try:
+                    company = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                summary = await self.process_company(company)
+                done_count += 1
+                logger.info(f"[{done_count}/{len(remaining)}] {company}: {summary.strip()[:120]}")
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.companies_in_flight, len(remaining)) or 1)))
+        finally:
+            self.checkpoint.close()
+            self._executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find CHROs for a list of companies using all sources concurrently")
+    parser.add_argument('companies', nargs='?', default='top100.csv', help="CSV or text file of company names")
+    parser.add_argument('--checkpoint', default='batch_checkpoint.jsonl', help="JSONL checkpoint used to resume")
+    parser.add_argument('--concurrency', default='', help="per-source limits, e.g. 'google=8,jecrc=3'")
+    parser.add_argument('--rate', default='', help="per-source requests/second, e.g. 'openai=0.1'")
+    parser.add_argument('--companies-in-flight', type=int, default=8, help="companies processed at the same time")
+    parser.add_argument('--retry-errors', action='store_true', help="re-run steps whose checkpointed result was an error")
+    parser.add_argument('--force-refresh', action='store_true', help="bypass the lookup cache")
+    parser.add_argument('--batch-summaries', action='store_true',
+                        help="summarize many companies per Gemini request instead of one each")
+    args = parser.parse_args()
+
+    concurrency = parse_limits(args.concurrency, DEFAULT_CONCURRENCY, int)
+    rates = parse_limits(args.rate, DEFAULT_RATES)
+
+    # Browser pools must be large enough for the requested Selenium concurrency
+    os.environ.setdefault("PERPLEXITY_POOL_SIZE", str(concurrency["perplexity"]))
+    os.environ.setdefault("OPENAI_POOL_SIZE", str(concurrency["openai"]))
+
+    import ultimate
+
+    sources = {
+        name: functools.partial(fn, force_refresh=args.force_refresh)
+        for name, fn in ultimate.search_orchestrator.sources.items()
+    }
+
+    summarize = functools.partial(ultimate.summarize_results, force_refresh=args.force_refresh)
+    if args.batch_summaries:
+        batcher = SummaryBatcher(
+            functools.partial(ultimate.summarize_results_batch, force_refresh=args.force_refresh),
+            cost=ultimate.summary_cost,
+            token_budget=ultimate.SUMMARY_BATCH_TOKEN_BUDGET,
+            max_items=ultimate.SUMMARY_BATCH_MAX_COMPANIES,
+            rate=rates[SUMMARY]
+        )
+        summarize = batcher.summarize
+        # Every finished company must be able to join the pending batch; the batcher rate-limits the real calls
+        concurrency[SUMMARY] = max(concurrency[SUMMARY], args.companies_in_flight)
+        rates[SUMMARY] = 0
+
+    companies = read_companies(args.companies)
+    pipeline = BatchPipeline(
+        sources=sources,
+        summarize=summarize,
+        checkpoint_path=args.checkpoint,
+        concurrency=concurrency,
+        rates=rates,
+        companies_in_flight=args.companies_in_flight,
+        retry_errors=args.retry_errors
+    )
+    try:
+        asyncio.run(pipeline.run(companies))
+    finally:
+        ultimate.openai_driver_pool.close()
+        ultimate.perplexity_driver_pool.close()
+        ultimate.async_runtime.shutdown()
+    logger.info(f"Batch complete. Checkpoint: {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
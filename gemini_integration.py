@@ -5,6 +5,9 @@ from datetime import datetime
 import logging
 from dotenv import load_dotenv
 from services.gemini_direct_search import GeminiDirectSearcher
+from services.result_store import get_result_store
+from services.models import results_record
+from automation import record_final_summary
 
 # Configure logging
 logging.basicConfig(
@@ -25,52 +28,12 @@ if not GEMINI_API_KEY:
 gemini_searcher = GeminiDirectSearcher(api_key=GEMINI_API_KEY)
 
 def store_results(company_name, perplexity_result, openai_result, google_result, linkedin_head_result):
-    """Store the results in a JSON file"""
+    """Store the results in the append-only results log"""
     try:
-        data = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'company': company_name,
-            'perplexity_result': {
-                'Response': perplexity_result,
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            'openai_result': {
-                'Response': openai_result,
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            'google_result': {
-                'chro_name': google_result.split("\n")[0] if "\n" in google_result else google_result,
-                'linkedin_url': google_result.split("\n")[1] if "\n" in google_result and len(google_result.split("\n")) > 1 else "Not found"
-            },
-            'linkedin_head_result': {
-                'head_info': {
-                    'name': linkedin_head_result.split("Name: ")[1].split("\n")[0] if "Name: " in linkedin_head_result else "Information Not Available",
-                    'title': linkedin_head_result.split("Title: ")[1].split("\n")[0] if "Title: " in linkedin_head_result else "",
-                    'url': linkedin_head_result.split("URL: ")[1].split("\n")[0] if "URL: " in linkedin_head_result else "",
-                    'location': linkedin_head_result.split("Location: ")[1].split("\n")[0] if "Location: " in linkedin_head_result else ""
-                }
-            }
-        }
+        data = results_record(company_name, perplexity_result, openai_result, google_result, linkedin_head_result)
         
-        filename = 'chro_results.json'
-        # Read existing data if file exists
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                try:
-                    existing_data = json.load(f)
-                    if not isinstance(existing_data, list):
-                        existing_data = [existing_data]
-                except:
-                    existing_data = []
-        else:
-            existing_data = []
-            
-        # Add new data
-        existing_data.append(data)
-        
-        # Write back to file
-        with open(filename, 'w') as f:
-            json.dump(existing_data, f, indent=4)
+        # O(1) append to the JSONL results log (legacy chro_results.json is migrated on first use)
+        get_result_store().append(data)
             
         return True
     except Exception as e:
@@ -124,6 +87,19 @@ async def get_final_summary_with_gemini_direct(company_name, perplexity_result,
             except Exception as e:
                 logger.error(f"Error storing final summary: {str(e)}")
             
+            # Index the run and summary for the Company Database tab
+            record_final_summary(
+                company_name,
+                final_summary,
+                result['Timestamp'],
+                source_results={
+                    'perplexity': perplexity_result,
+                    'openai': openai_result,
+                    'google': google_result,
+                    'jecrc': linkedin_result
+                }
+            )
+            
             return final_summary
                 
         except Exception as e:
@@ -6,29 +6,39 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 import time
+from services.result_store import get_result_store, DEFAULT_RESULTS_PATH, LEGACY_RESULTS_PATH
+from services.llm_cache import get_llm_cache
+from services.markdown_pruner import prune_search_markdown
+from services.rate_limiter import AIMDRateController
 
 # Load environment variables
 load_dotenv()
 
 # Configure Gemini API
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-model = genai.GenerativeModel('gemini-2.0-flash')
+MODEL_ID = 'gemini-2.0-flash'
+model = genai.GenerativeModel(MODEL_ID)
+llm_cache = get_llm_cache()
 
-def save_result(data, filename='chro_results.json'):
+# Companies processed at once; each worker shares the one crawler and Gemini model
+GOOGLE_WORKERS = int(os.getenv('GOOGLE_WORKERS', '4'))
+
+# Adaptive per-backend limits: start at the configured rate, halve on 429s, creep back up on success
+search_rate = AIMDRateController(
+    'google-search',
+    rate=float(os.getenv('GOOGLE_SEARCH_RATE', '0.5')),
+    max_rate=float(os.getenv('GOOGLE_SEARCH_MAX_RATE', '2'))
+)
+gemini_rate = AIMDRateController(
+    'gemini',
+    rate=float(os.getenv('GEMINI_RATE', '1')),
+    max_rate=float(os.getenv('GEMINI_MAX_RATE', '4'))
+)
+
+def save_result(data, filename=DEFAULT_RESULTS_PATH):
     try:
-        # Read existing results
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                results = json.load(f)
-        else:
-            results = []
-        
-        # Append new result
-        results.append(data)
-        
-        # Save updated results
-        with open(filename, 'w') as f:
-            json.dump(results, f, indent=2)
+        # Append a single record instead of rewriting the whole results file
+        get_result_store(filename, legacy_path=None).append(data)
     except Exception as e:
         print(f"Error saving result: {str(e)}")
 
@@ -44,69 +54,74 @@ def extract_json_from_text(text):
         pass
     return None
 
+async def search_google(company, crawler):
+    search_query = f"who is the CHRO of {company} India linkedin"
+    result = await crawler.arun(url=f"https://www.google.com/search?q={'+'.join(search_query.split())}")
+    # Google answers throttled clients with a 429 or an "unusual traffic" interstitial
+    if getattr(result, 'status_code', None) == 429 or 'unusual traffic' in (result.markdown or '').lower():
+        raise RuntimeError("429 Google search rate limited")
+    return result
+
 async def process_company(company, crawler, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            search_query = f"who is the CHRO of {company} India linkedin"
-            result = await crawler.arun(url=f"https://www.google.com/search?q={'+'.join(search_query.split())}")
-            
-            # Extract relevant section (from Advanced Search till end)
-            content = result.markdown
-            start_idx = content.find("Advanced Search")
-            if start_idx != -1:
-                content = content[start_idx:]
-            
-            # Process with Gemini
-            prompt = f"""
-            Based on the following search results about {company}'s CHRO, provide only:
-            1. CHRO  of India Name
-            2. LinkedIn URL (if available)
-            
-            Return ONLY a valid JSON object in this exact format, nothing else:
-            {{
-                "company": "{company}",
-                "chro_name": "name",
-                "linkedin_url": "url or null"
-            }}
-            
-            Search results:
-            {content}
-            """
-            
-            response = model.generate_content(prompt)
-            result_json = extract_json_from_text(response.text)
-            
-            if result_json:
-                # Save result immediately
-                save_result(result_json)
-                print(f"Successfully saved data for {company}")
-            else:
-                # If JSON parsing failed, create error result
-                result_json = {
-                    "company": company,
-                    "chro_name": "ERROR",
-                    "linkedin_url": "Failed to parse Gemini response"
-                }
-                save_result(result_json)
-                print(f"Failed to parse response for {company}")
-            
-            return result_json
-            
-        except Exception as e:
-            if "429" in str(e) or "exhausted" in str(e).lower():
-                if attempt < max_retries - 1:  # Don't sleep on last attempt
-                    print(f"Rate limit hit for {company}, sleeping for 10 seconds...")
-                    await asyncio.sleep(10)
-                    continue
-            print(f"Error processing {company}: {str(e)}")
-            # Save error result
-            error_result = {
+    try:
+        # Each backend retries its own 429s at the rate its controller settles on
+        result = await search_rate.call(lambda: search_google(company, crawler), retries=max_retries - 1)
+        
+        # Extract relevant result blocks (from Advanced Search on), capped at the prompt token budget
+        content, prune_stats = prune_search_markdown(result.markdown, company)
+        print(f"Prompt pruned for {company}: {prune_stats['tokens_saved']} tokens saved")
+        
+        # Process with Gemini
+        prompt = f"""
+        Based on the following search results about {company}'s CHRO, provide only:
+        1. CHRO  of India Name
+        2. LinkedIn URL (if available)
+        
+        Return ONLY a valid JSON object in this exact format, nothing else:
+        {{
+            "company": "{company}",
+            "chro_name": "name",
+            "linkedin_url": "url or null"
+        }}
+        
+        Search results:
+        {content}
+        """
+        
+        async def generate():
+            response = await gemini_rate.call(lambda: model.generate_content_async(prompt), retries=max_retries - 1)
+            return response.text
+        
+        # Async call so the other workers keep crawling while Gemini answers; cache hits skip the limiter
+        response_text = await llm_cache.aget_or_call(MODEL_ID, prompt, generate)
+        result_json = extract_json_from_text(response_text)
+        
+        if result_json:
+            # Save result immediately
+            save_result(result_json)
+            print(f"Successfully saved data for {company}")
+        else:
+            # If JSON parsing failed, create error result
+            result_json = {
                 "company": company,
                 "chro_name": "ERROR",
-                "linkedin_url": str(e)
+                "linkedin_url": "Failed to parse Gemini response"
             }
-            save_result(error_result)
-            return error_result
+            save_result(result_json)
+            print(f"Failed to parse response for {company}")
+        
+        return result_json
+        
+    except Exception as e:
+        print(f"Error processing {company}: {str(e)}")
+        # Save error result
+        error_result = {
+            "company": company,
+            "chro_name": "ERROR",
+            "linkedin_url": str(e)
+        }
+        save_result(error_result)
+        return error_result
 
 async def main():
     # Read companies from CSV
@@ -117,16 +132,29 @@ async def main():
             if row and row[0].strip():  # Skip empty rows
                 companies.append(row[0].strip())
     
-    # Create fresh results file
-    if os.path.exists('chro_results.json'):
-        os.remove('chro_results.json')
+    # Create fresh results file; drop the legacy JSON too so no later process migrates it back in
+    if os.path.exists(LEGACY_RESULTS_PATH):
+        os.remove(LEGACY_RESULTS_PATH)
+    get_result_store(legacy_path=None).clear()
     
-    async with AsyncWebCrawler() as crawler:
-        for company in companies:
-            result = await process_company(company, crawler)
+    queue = asyncio.Queue()
+    for company in companies:
+        queue.put_nowait(company)
+    
+    async def worker(crawler):
+        while True:
+            try:
+                company = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await process_company(company, crawler)
             print(f"Processed {company}")
-            # Add small delay between requests to avoid rate limiting
-            await asyncio.sleep(1)
+    
+    # One browser for every worker; the rate controllers pace the requests
+    async with AsyncWebCrawler() as crawler:
+        await asyncio.gather(*(worker(crawler) for _ in range(min(GOOGLE_WORKERS, len(companies)) or 1)))
+    
+    print(f"Rate limits: {search_rate.stats()} {gemini_rate.stats()}")
 
 if __name__ == "__main__":
     asyncio.run(main())
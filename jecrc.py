@@ -1,10 +1,10 @@
 import os
 import csv
-import json
 import asyncio
 import logging
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 from services.linkedin_scraper import LinkedInScraper
+from services.result_store import ResultStore
 from dotenv import load_dotenv
 
 # Configure logging
@@ -17,6 +17,10 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+RESULTS_PATH = "top100.json"
+# One JSON line per finished company; top100.json is only written from it at the end
+JOURNAL_PATH = os.getenv("JECRC_JOURNAL_PATH", "top100.journal.jsonl")
+
 class LinkedInHeadSearcher:
     def __init__(self):
         """Initialize LinkedIn scraper"""
@@ -36,16 +40,7 @@ class LinkedInHeadSearcher:
                 if linkedin_results and linkedin_results.get('linkedin_results'):
                     linkedin_profile = linkedin_results['linkedin_results'][0]
                 
-                return {
-                    "company": company_name,
-                    "head_info": {
-                        "name": linkedin_profile.get('name', '').replace(f" - {company_name}", "") if linkedin_profile else "Information Not Available",
-                        "url": linkedin_profile.get('url', '') if linkedin_profile else "",
-                        "title": linkedin_profile.get('title', '') if linkedin_profile else "",
-                        "location": linkedin_profile.get('location', '') if linkedin_profile else "",
-                        "snippet": linkedin_profile.get('snippet', '') if linkedin_profile else ""
-                    }
-                }
+                return self.build_result(company_name, linkedin_profile)
                     
             except Exception as e:
                 retries += 1
@@ -57,35 +52,110 @@ class LinkedInHeadSearcher:
                     continue
                 else:
                     logger.error(f"Max retries reached for {company_name}")
-                    return {
-                        "company": company_name,
-                        "head_info": {
-                            "name": "Error in Processing",
-                            "url": "",
-                            "title": "",
-                            "location": "",
-                            "snippet": str(e)
-                        }
-                    }
+                    return self.build_error_result(company_name, str(e))
+
+    async def process_companies(self, companies: List[str], sessions: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Process many companies over a few LinkedIn browser sessions, yielding results as they arrive.
+
+        Companies are dealt round-robin into ``sessions`` shards (default: the
+        scraper's browser limit), each served by one reused browser.
+        """
+        sessions = max(1, min(sessions or self.linkedin_scraper.max_browsers, len(companies)))
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run_shard(shard: List[str]):
+            try:
+                async for item in self.linkedin_scraper.stream_profiles(shard, search_query="HR Head", location="India"):
+                    if item['error']:
+                        logger.error(f"Max retries reached for {item['company']}")
+                        await results.put(self.build_error_result(item['company'], item['error']))
+                    else:
+                        profiles = item['profiles']
+                        await results.put(self.build_result(item['company'], profiles[0] if profiles else None))
+            except Exception as e:
+                logger.error(f"LinkedIn session failed: {str(e)}")
+            finally:
+                await results.put(done)
+
+        shards = [asyncio.create_task(run_shard(companies[i::sessions])) for i in range(sessions)]
+        try:
+            remaining = len(shards)
+            while remaining:
+                result = await results.get()
+                if result is done:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            for shard in shards:
+                shard.cancel()
+
+    @staticmethod
+    def build_result(company_name: str, linkedin_profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "company": company_name,
+            "head_info": {
+                "name": linkedin_profile.get('name', '').replace(f" - {company_name}", "") if linkedin_profile else "Information Not Available",
+                "url": linkedin_profile.get('url', '') if linkedin_profile else "",
+                "title": linkedin_profile.get('title', '') if linkedin_profile else "",
+                "location": linkedin_profile.get('location', '') if linkedin_profile else "",
+                "snippet": linkedin_profile.get('snippet', '') if linkedin_profile else ""
+            }
+        }
+
+    @staticmethod
+    def build_error_result(company_name: str, error: str) -> Dict[str, Any]:
+        return {
+            "company": company_name,
+            "head_info": {
+                "name": "Error in Processing",
+                "url": "",
+                "title": "",
+                "location": "",
+                "snippet": error
+            }
+        }
+
+def open_journal(path: str = JOURNAL_PATH, legacy_path: str = RESULTS_PATH) -> ResultStore:
+    """Open the checkpoint journal, seeding it once from an existing top100.json"""
+    journal = ResultStore(path)
+    if not len(journal) and os.path.exists(legacy_path):
+        journal.migrate_from_json(legacy_path)
+    return journal
+
+def processed_companies(journal: ResultStore) -> set:
+    """Companies already in the journal, read one record at a time"""
+    return {record["company"] for record in journal}
+
+def materialize_results(journal: ResultStore, companies: List[str], path: str = RESULTS_PATH) -> List[str]:
+    """Compact the journal (latest record per company) and write it out as the top100.json array.
+
+    Returns the input companies that have no record in the written file
+    (e.g. dropped by a failed session shard), logging them as a warning.
+    """
+    journal.compact(key=lambda record: record["company"])
+    written = journal.export_json(path)
+    saved = processed_companies(journal)
+    expected = list(dict.fromkeys(companies))
+    missing = [company for company in expected if company not in saved]
+    if missing:
+        logger.warning(f"{path} has results for {len(expected) - len(missing)} of {len(expected)} companies; "
+                       f"missing: {', '.join(missing)}")
+    else:
+        logger.info(f"Results for all {len(expected)} companies ({written} records) saved to {path}")
+    return missing
 
 async def main():
     """Main function to process companies from top100.csv"""
+    searcher = None
+    journal = None
     try:
-        # Initialize searcher
-        searcher = LinkedInHeadSearcher()
-        all_results = []
-        
-        # Load existing results if top100.json exists
-        processed_companies = set()
-        if os.path.exists("top100.json"):
-            try:
-                with open("top100.json", 'r', encoding='utf-8') as f:
-                    all_results = json.load(f)
-                    processed_companies = {result["company"] for result in all_results}
-                logger.info(f"Loaded {len(processed_companies)} already processed companies from top100.json")
-            except json.JSONDecodeError:
-                logger.warning("Error reading top100.json, starting fresh")
-                all_results = []
+        # Resume from the journal; a crash loses at most the company in flight
+        journal = open_journal()
+        processed = processed_companies(journal)
+        if processed:
+            logger.info(f"Loaded {len(processed)} already processed companies from {journal.path}")
         
         # Read companies from CSV
         try:
@@ -98,7 +168,7 @@ async def main():
             return
         
         # Filter out already processed companies
-        remaining_companies = [company for company in companies if company not in processed_companies]
+        remaining_companies = [company for company in companies if company not in processed]
         total_remaining = len(remaining_companies)
         total_companies = len(companies)
         
@@ -106,29 +176,32 @@ async def main():
         
         if total_remaining == 0:
             logger.info("All companies have already been processed!")
+            materialize_results(journal, companies)
             return
         
-        # Process remaining companies
-        for i, company in enumerate(remaining_companies, 1):
-            logger.info(f"Processing company {i}/{total_remaining} (Overall: {len(processed_companies) + i}/{total_companies}): {company}")
-            
-            result = await searcher.process_company(company)
-            all_results.append(result)
-            
-            # Save after each company in case of interruption
-            with open("top100.json", 'w', encoding='utf-8') as f:
-                json.dump(all_results, f, indent=2, ensure_ascii=False)
-            
-            # Add a delay between requests
-            await asyncio.sleep(2)
+        # Initialize searcher
+        searcher = LinkedInHeadSearcher()
+        
+        # Process remaining companies, one reused browser session per LINKEDIN_MAX_BROWSERS
+        i = 0
+        async for result in searcher.process_companies(remaining_companies):
+            i += 1
+            logger.info(f"Processed company {i}/{total_remaining} (Overall: {len(processed) + i}/{total_companies}): {result['company']}")
             
-        logger.info("All companies processed successfully!")
-        logger.info("Results saved to top100.json")
+            # O(1) append per company instead of rewriting the whole results file
+            journal.append(result)
+        
+        if not materialize_results(journal, companies):
+            logger.info("All companies processed successfully!")
         
     except Exception as e:
         logger.error(f"An error occurred: {str(e)}")
     
     finally:
+        if searcher:
+            searcher.linkedin_scraper.shutdown()
+        if journal:
+            journal.close()
         logger.info("Processing complete!")
 
 if __name__ == "__main__":
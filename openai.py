@@ -7,15 +7,20 @@ import time
 import os
 import random
 import csv
-import re
 import json
 from dotenv import load_dotenv
 import undetected_chromedriver as uc
 import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-import requests
+from services.chrome_resolver import get_chrome_version as resolve_chrome_version, get_driver_path
+from services.chat_input import insert_prompt, click_if_enabled, navigate_async
+from services.response_detector import ResponseDetector
+from services.result_writer import ResultWriter
 
 # Configure logging
 logging.basicConfig(
@@ -27,43 +32,31 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+CHAT_URL = "https://chat.openai.com/"
+PROMPT_INPUT_SELECTOR = "#prompt-textarea"
+SEND_BUTTON_SELECTOR = "button[data-testid='send-button']"
+
+RESULTS_CSV = 'chatgpt_results.csv'
+RESULTS_JSONL = 'chatgpt_results.jsonl'
+RESULTS_JSON = 'chatgpt_results.json'
+
+response_detector = ResponseDetector(
+    selectors=[
+        "//div[contains(@class, 'markdown prose')]//p",
+        "//div[@data-message-author-role='assistant']//div[contains(@class, 'markdown')]//p",
+        "//div[contains(@class, 'prose')]//p/a",
+    ],
+    busy_selectors=["//button[@data-testid='stop-button']"],
+    done_selectors=["//button[@data-testid='copy-turn-action-button']"],
+)
+
+def build_prompt(company):
+    return f"""Provide the full name of the Chief Human Resources Officer (CHRO) of {company}, based in India, as of February 23, 2025. Ensure the response pertains exclusively to {company} and no other entity or region. Respond with only the full name, nothing else. Also give the LinkedIn URL."""
+
 def get_chrome_version():
-    """Get the installed Chrome version using multiple detection methods"""
+    """Get the installed Chrome version from the shared, cached resolver"""
     try:
-        # Try multiple commands to detect Chrome version
-        commands = [
-            ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version'],
-            ['google-chrome', '--version'],
-            ['chromium', '--version'],
-            ['chrome', '--version']
-        ]
-        
-        for cmd in commands:
-            try:
-                import subprocess
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                stdout, _ = process.communicate()
-                version_str = stdout.decode('UTF-8').lower()
-                if 'chrome' in version_str:
-                    # Extract version using regex
-                    match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', version_str)
-                    if match:
-                        version = int(match.group(1))  # Major version number
-                        logger.info(f"Detected Chrome version: {version}")
-                        return version
-            except:
-                continue
-        
-        # If local detection fails, try getting latest version from ChromeDriver
-        try:
-            response = requests.get('https://chromedriver.storage.googleapis.com/LATEST_RELEASE')
-            version = int(response.text.split('.')[0])
-            logger.info(f"Using latest ChromeDriver version: {version}")
-            return version
-        except:
-            logger.warning("Failed to get latest ChromeDriver version")
-            
-        return 133  # Default fallback version
+        return resolve_chrome_version(default=133)
     except Exception as e:
         logger.error(f"Error detecting Chrome version: {str(e)}")
         return 133
@@ -102,6 +95,11 @@ def setup_driver():
         options.add_argument('--no-default-browser-check')
         options.add_argument('--no-first-run')
         
+        # Keep background tabs running at full speed for the multi-tab batch mode
+        options.add_argument('--disable-background-timer-throttling')
+        options.add_argument('--disable-renderer-backgrounding')
+        options.add_argument('--disable-backgrounding-occluded-windows')
+        
         # Random window size
         width = random.randint(1050, 1920)
         height = random.randint(800, 1080)
@@ -140,7 +138,7 @@ def setup_driver():
             except Exception as e:
                 exceptions.append(f"Generic undetected-chromedriver failed: {str(e)}")
 
-        # Approach 3: Try selenium with ChromeDriverManager
+        # Approach 3: Try selenium with the cached chromedriver path
         if not driver:
             try:
                 chrome_options = webdriver.ChromeOptions()
@@ -152,7 +150,7 @@ def setup_driver():
                 chrome_options.add_experimental_option('useAutomationExtension', False)
                 chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
                 
-                service = Service(ChromeDriverManager().install())
+                service = Service(get_driver_path())
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 
                 # Execute CDP commands to make selenium more stealthy
@@ -285,12 +283,11 @@ def send_prompt(driver, prompt):
             driver.execute_script("arguments[0].click();", textarea)
         
         time.sleep(random.uniform(0.5, 1))
-        textarea.clear()
         
-        # Type prompt with random delays
-        for char in prompt:
-            textarea.send_keys(char)
-            time.sleep(random.uniform(0.01, 0.03))
+        # Insert the whole prompt in one script call; fall back to a single send_keys
+        if not insert_prompt(driver, PROMPT_INPUT_SELECTOR, prompt):
+            textarea.clear()
+            textarea.send_keys(prompt)
         
         time.sleep(random.uniform(0.5, 1))
         
@@ -312,6 +309,156 @@ def send_prompt(driver, prompt):
         logger.error(f"Error sending prompt: {str(e)}")
         return False
 
+def response_from_texts(texts, selectors):
+    """Pick the name line and the LinkedIn line out of a detector snapshot's texts"""
+    name = ""
+    url = ""
+    for selector in selectors:
+        for text in texts.get(selector, []):
+            if 'linkedin.com' in text.lower():
+                url = text
+            else:
+                name = text
+        if name and url:
+            break
+    return f"{name}\n{url}".strip() if name or url else ""
+
+@dataclass
+class ChatTab:
+    """One browser tab of the batch runner and the company it is working on"""
+    handle: str
+    company: Optional[str] = None
+    prompt: Optional[str] = None
+    attempt: int = 0
+    state: str = "idle"
+    since: float = 0.0
+    last_key: Optional[str] = None
+    last_change: float = 0.0
+    texts: Optional[Dict[str, List[str]]] = None
+
+class TabBatchRunner:
+    """Ask ChatGPT about many companies at once from several tabs of one browser.
+
+    Each tab moves through idle -> loading (fresh conversation) -> typed
+    (prompt inserted with one script call) -> waiting (answer streaming).
+    The driver can only run one command at a time, so the runner visits the
+    tabs round-robin with non-blocking steps: navigation is started from JS
+    and completion is checked with a one-shot DOM probe instead of a blocking
+    wait. While one tab's answer streams, the other tabs load and send.
+    Results are yielded in completion order.
+    """
+
+    def __init__(self, driver, tabs=3, timeout=90, load_timeout=30, max_retries=3, poll_interval=0.25):
+        self.driver = driver
+        self.tab_count = max(1, tabs)
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self.tabs: List[ChatTab] = []
+
+    def _open_tabs(self):
+        handles = list(self.driver.window_handles[:1])
+        while len(handles) < self.tab_count:
+            self.driver.switch_to.new_window('tab')
+            handles.append(self.driver.current_window_handle)
+        self.tabs = [ChatTab(handle=handle) for handle in handles]
+        logger.info(f"Batch runner using {len(self.tabs)} tabs")
+
+    def _set_state(self, tab: ChatTab, state: str):
+        tab.state = state
+        tab.since = time.monotonic()
+
+    def _result(self, tab: ChatTab, response: str) -> Dict[str, Any]:
+        result = {
+            'Company': tab.company,
+            'Prompt': tab.prompt,
+            'Response': response,
+            'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        tab.company = tab.prompt = None
+        self._set_state(tab, "idle")
+        return result
+
+    def _fail(self, tab: ChatTab, pending: Deque[Tuple[str, int]], reason: str) -> Optional[Dict[str, Any]]:
+        logger.warning(f"Attempt {tab.attempt + 1}/{self.max_retries} failed for {tab.company}: {reason}")
+        if tab.attempt + 1 < self.max_retries:
+            pending.append((tab.company, tab.attempt + 1))
+            tab.company = tab.prompt = None
+            self._set_state(tab, "idle")
+            return None
+        logger.error(f"Failed all attempts for {tab.company}")
+        return self._result(tab, 'FAILED_ALL_ATTEMPTS')
+
+    def _step(self, tab: ChatTab, pending: Deque[Tuple[str, int]]) -> Optional[Dict[str, Any]]:
+        """Advance one tab by at most one state without blocking; returns a finished result"""
+        elapsed = time.monotonic() - tab.since
+
+        if tab.state == "idle":
+            if not pending:
+                return None
+            tab.company, tab.attempt = pending.popleft()
+            tab.prompt = build_prompt(tab.company)
+            navigate_async(self.driver, CHAT_URL)
+            self._set_state(tab, "loading")
+            return None
+
+        if tab.state == "loading":
+            snapshot = response_detector.probe(self.driver)
+            if snapshot and not snapshot['stale'] and snapshot['loaded'] and \
+                    insert_prompt(self.driver, PROMPT_INPUT_SELECTOR, tab.prompt):
+                self._set_state(tab, "typed")
+            elif elapsed > self.load_timeout:
+                return self._fail(tab, pending, "page did not load")
+            return None
+
+        if tab.state == "typed":
+            if click_if_enabled(self.driver, SEND_BUTTON_SELECTOR):
+                tab.last_key, tab.texts = None, None
+                tab.last_change = time.monotonic()
+                self._set_state(tab, "waiting")
+            elif elapsed > self.load_timeout:
+                return self._fail(tab, pending, "send button never enabled")
+            elif elapsed > 2:
+                # The editor may have hydrated after the first insert; put the prompt in again
+                insert_prompt(self.driver, PROMPT_INPUT_SELECTOR, tab.prompt)
+            return None
+
+        snapshot = response_detector.probe(self.driver)
+        now = time.monotonic()
+        if snapshot:
+            key = json.dumps(snapshot['texts'], sort_keys=True)
+            if key != tab.last_key:
+                tab.last_key, tab.texts, tab.last_change = key, snapshot['texts'], now
+            if response_detector.settled(snapshot, now - tab.last_change):
+                response = response_from_texts(tab.texts, response_detector.selectors)
+                logger.info(f"{tab.company}: answered in {elapsed:.1f}s")
+                return self._result(tab, response)
+        if elapsed > self.timeout:
+            response = response_from_texts(tab.texts or {}, response_detector.selectors)
+            if response:
+                return self._result(tab, response)
+            return self._fail(tab, pending, "timed out waiting for the answer")
+        return None
+
+    def run(self, companies: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield one result row per company as each tab finishes"""
+        self._open_tabs()
+        pending: Deque[Tuple[str, int]] = deque((company, 0) for company in companies)
+        while pending or any(tab.company for tab in self.tabs):
+            for tab in self.tabs:
+                if tab.state == "idle" and not pending:
+                    continue
+                try:
+                    self.driver.switch_to.window(tab.handle)
+                    result = self._step(tab, pending)
+                except Exception as e:
+                    logger.error(f"Error in tab for {tab.company}: {str(e)}")
+                    result = self._fail(tab, pending, str(e)) if tab.company else None
+                if result:
+                    yield result
+            time.sleep(self.poll_interval)
+
 def read_companies():
     """Read companies from CSV file"""
     companies = []
@@ -326,69 +473,57 @@ def read_companies():
         return []
     return companies
 
-def save_results(results):
-    """Save results to both CSV and JSON formats with error handling"""
-    try:
-        # Save to CSV
-        csv_filename = 'chatgpt_results.csv'
-        json_filename = 'chatgpt_results.json'
-        
-        # CSV handling
-        file_exists = os.path.isfile(csv_filename)
-        with open(csv_filename, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['Company', 'Prompt', 'Response', 'Timestamp'])
-            if not file_exists:
-                writer.writeheader()
-            if results:
-                writer.writerow(results[-1])
-        
-        # JSON handling
-        try:
-            if os.path.exists(json_filename):
-                with open(json_filename, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
-            else:
-                existing_data = []
-        except:
-            existing_data = []
-        
-        if results:
-            existing_data.append(results[-1])
-            
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(existing_data, f, indent=4, ensure_ascii=False)
-        
-        logger.info(f"Results saved to {csv_filename} and {json_filename}")
-        
-    except Exception as e:
-        logger.error(f"Error saving results: {str(e)}")
+def open_result_writer():
+    """One writer for the whole run: a CSV and a JSONL row per company, chatgpt_results.json at the end"""
+    return ResultWriter(
+        RESULTS_CSV,
+        fieldnames=['Company', 'Prompt', 'Response', 'Timestamp'],
+        jsonl_path=RESULTS_JSONL,
+        json_path=RESULTS_JSON,
+        flush_every=int(os.getenv('RESULTS_FLUSH_EVERY', '16')),
+        flush_interval=float(os.getenv('RESULTS_FLUSH_INTERVAL', '5'))
+    )
 
 def main():
+    parser = argparse.ArgumentParser(description="Ask ChatGPT for the CHRO of every company in top100.csv")
+    parser.add_argument('--tabs', type=int, default=int(os.getenv('OPENAI_TABS', '1')),
+                        help="conversations run side by side in one browser (1 = serial mode)")
+    args = parser.parse_args()
+    
     driver = None
+    writer = None
     try:
         driver = setup_driver()
         companies = read_companies()
-        results = []
         
         if not companies:
             logger.error("No companies found in CSV file")
             return
         
+        writer = open_result_writer()
+        
+        if args.tabs > 1:
+            runner = TabBatchRunner(driver, tabs=args.tabs)
+            for i, result in enumerate(runner.run(companies), 1):
+                logger.info(f"Processed {i}/{len(companies)}: {result['Company']}: {result['Response']}")
+                writer.write(result)
+            return
+        
         logger.info("Navigating to ChatGPT...")
-        driver.get("https://chat.openai.com/")
+        driver.get(CHAT_URL)
         time.sleep(random.uniform(4, 6))
         
         for i, company in enumerate(companies, 1):
             logger.info(f"Processing company {i}/{len(companies)}: {company}")
             
-            prompt = f"""Provide the full name of the Chief Human Resources Officer (CHRO) of {company}, based in India, as of February 23, 2025. Ensure the response pertains exclusively to {company} and no other entity or region. Respond with only the full name, nothing else. Also give the LinkedIn URL."""
+            prompt = build_prompt(company)
             
             max_retries = 3
             for attempt in range(max_retries):
                 if send_prompt(driver, prompt):
                     response = wait_for_response(driver)
                     
-                    results.append({
+                    writer.write({
                         'Company': company,
                         'Prompt': prompt,
                         'Response': response,
@@ -396,7 +531,6 @@ def main():
                     })
                     
                     logger.info(f"Response received: {response}")
-                    save_results(results)  # Save after each successful response
                     
                     # Random delay between companies
                     time.sleep(random.uniform(2, 4))
@@ -409,18 +543,20 @@ def main():
                         time.sleep(random.uniform(4, 6))
                     else:
                         logger.error(f"Failed all attempts for {company}")
-                        results.append({
+                        writer.write({
                             'Company': company,
                             'Prompt': prompt,
                             'Response': 'FAILED_ALL_ATTEMPTS',
                             'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                         })
-                        save_results(results)
             
     except Exception as e:
         logger.error(f"An error occurred in main: {str(e)}")
         
     finally:
+        # Flushes the last rows and writes chatgpt_results.json once
+        if writer:
+            writer.close()
         if driver:
             try:
                 driver.quit()
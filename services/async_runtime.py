@@ -0,0 +1,109 @@
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """One background event loop per process, owning long-lived async resources.
+
+    The loop runs forever on a daemon thread. Synchronous code (Gradio handlers,
+    Selenium workers) submits coroutines with :meth:`run` / :meth:`submit`.
+    The shared ``AsyncWebCrawler`` is bound to this loop, so anything that uses
+    it must run here; :meth:`run_here` moves a coroutine onto the loop when it
+    is awaited from another one.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._crawler = None
+        self._crawler_lock: Optional[asyncio.Lock] = None
+        self._linkedin_scraper = None
+        self._scraper_lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="async-runtime", daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+        return self._loop
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine on the runtime loop and return a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime loop and block for its result"""
+        return self.submit(coro).result(timeout)
+
+    async def run_here(self, coro: Awaitable) -> Any:
+        """Await ``coro`` on the runtime loop, whichever loop the caller is on"""
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    # --- shared resources ------------------------------------------------
+
+    async def get_crawler(self):
+        """Shared AsyncWebCrawler, started once on first use (must be awaited on the runtime loop)"""
+        if self._crawler_lock is None:
+            self._crawler_lock = asyncio.Lock()
+        async with self._crawler_lock:
+            if self._crawler is None:
+                from crawl4ai import AsyncWebCrawler
+                crawler = AsyncWebCrawler()
+                await crawler.__aenter__()
+                self._crawler = crawler
+                logger.info("Started shared AsyncWebCrawler")
+        return self._crawler
+
+    def get_linkedin_scraper(self):
+        """Shared LinkedInScraper instance"""
+        with self._scraper_lock:
+            if self._linkedin_scraper is None:
+                from services.linkedin_scraper import LinkedInScraper
+                self._linkedin_scraper = LinkedInScraper()
+        return self._linkedin_scraper
+
+    async def _close_resources(self):
+        if self._linkedin_scraper is not None:
+            self._linkedin_scraper.shutdown(wait=False)
+            self._linkedin_scraper = None
+        if self._crawler is not None:
+            try:
+                await self._crawler.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"Error closing shared crawler: {str(e)}")
+            self._crawler = None
+
+    def shutdown(self, timeout: float = 10.0):
+        """Close shared resources and stop the loop"""
+        if self._loop is None or not self._loop.is_running():
+            return
+        try:
+            self.submit(self._close_resources()).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error during async runtime shutdown: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+
+_runtime = AsyncRuntime()
+
+
+def get_async_runtime() -> AsyncRuntime:
+    """Process-wide async runtime"""
+    return _runtime
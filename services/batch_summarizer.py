@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.consensus import usable_name
+from services.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def pack_batches(items: Sequence[Any], cost: Callable[[Any], int], token_budget: int, max_items: int = 25) -> List[List[Any]]:
+    """Greedily pack items into batches whose total cost stays within ``token_budget``.
+
+    An item that is over budget on its own still gets a batch of one.
+    """
+    batches, current, used = [], [], 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (used + item_cost > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item_cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch_response(text: str, companies: Sequence[str]) -> Dict[str, Dict[str, Optional[str]]]:
+    """Validate a JSON array of ``{id, company, name, linkedin}`` objects from a batched prompt.
+
+    Items are matched to ``companies`` by their 1-based ``id`` (falling back
+    to the company name). Items without a usable name (empty, a sentence or a
+    template placeholder such as "null") are dropped, as are
+    ids and names that were not asked for and items whose ``company``
+    disagrees with the company their ``id`` points to, so callers can retry
+    only the companies missing from the result.
+    """
+    start, end = (text or '').find('['), (text or '').rfind(']') + 1
+    if start == -1 or end == 0:
+        logger.warning("Batched summary response contained no JSON array")
+        return {}
+    try:
+        items = json.loads(text[start:end])
+    except ValueError as e:
+        logger.warning(f"Batched summary response was not valid JSON: {str(e)}")
+        return {}
+
+    by_name = {' '.join(company.lower().split()): company for company in companies}
+    parsed: Dict[str, Dict[str, Optional[str]]] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        company = None
+        named = ' '.join(item['company'].lower().split()) if isinstance(item.get('company'), str) else None
+        if isinstance(item.get('id'), int) and 1 <= item['id'] <= len(companies):
+            company = companies[item['id'] - 1]
+            if named and named != ' '.join(company.lower().split()):
+                logger.warning(f"Batched summary item {item['id']} names {item['company']!r}, not {company!r}; dropping it")
+                continue
+        elif named:
+            company = by_name.get(named)
+        name = usable_name(item['name']) if isinstance(item.get('name'), str) else None
+        if company is None or company in parsed or name is None:
+            continue
+        linkedin = item.get('linkedin')
+        if not isinstance(linkedin, str) or 'linkedin.com' not in linkedin.lower():
+            linkedin = None
+        parsed[company] = {'name': name, 'linkedin': linkedin.strip() if linkedin else None}
+    return parsed
+
+
+class SummaryBatcher:
+    """Coalesce per-company summary requests from concurrent pipeline tasks into batched calls.
+
+    Each :meth:`summarize` call waits until the pending requests reach
+    ``token_budget`` or ``max_items``, or until ``linger_seconds`` pass.
+    Then ``summarize_batch([(company, results), ...])`` runs once on a worker
+    thread for the whole group; it must return a summary per company.
+    ``rate`` limits those batched calls, not individual companies.
+    """
+
+    def __init__(self,
+                 summarize_batch: Callable[[List[Tuple[str, Dict[str, Any]]]], Dict[str, str]],
+                 cost: Callable[[str, Dict[str, Any]], int],
+                 token_budget: int,
+                 max_items: int = 25,
+                 linger_seconds: float = 2.0,
+                 rate: float = 0.0):
+        self.summarize_batch = summarize_batch
+        self.cost = cost
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.linger_seconds = linger_seconds
+        self.bucket = TokenBucket(rate)
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.Task] = None
+
+    async def summarize(self, company: str, results: Dict[str, Any]) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((company, results, future))
+        self._pending_tokens += self.cost(company, results)
+        if len(self._pending) >= self.max_items or self._pending_tokens >= self.token_budget:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.linger_seconds)
+        self._timer = None
+        self._start_flush()
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if batch:
+            asyncio.create_task(self._flush(batch))
+
+    async def _flush(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        try:
+            await self.bucket.acquire()
+            loop = asyncio.get_running_loop()
+            summaries = await loop.run_in_executor(
+                None, self.summarize_batch, [(company, results) for company, results, _ in batch]
+            )
+            for company, _, future in batch:
+                if not future.done():
+                    future.set_result(summaries.get(company, f"Error generating summary: no result for {company}"))
+        except Exception as e:
+            logger.error(f"Error in batched summary of {len(batch)} companies: {str(e)}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
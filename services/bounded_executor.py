@@ -0,0 +1,144 @@
+import asyncio
+import functools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorShutdown(RuntimeError):
+    """Raised when work is submitted to an executor that is shutting down"""
+
+
+class LoopSafeSemaphore:
+    """Semaphore shared by every event loop (and thread) in the process.
+
+    ``asyncio.Semaphore`` belongs to one loop, so a limit built from it
+    applies per loop. Here waiters from any loop queue in FIFO order and a
+    released slot is handed to the next waiter through its own loop's
+    ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # A slot was handed to us as we were cancelled; pass it on
+            self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+                    return
+                except RuntimeError:
+                    # Its loop is closed; try the next waiter
+                    continue
+            self._value += 1
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+def _grant(waiter: asyncio.Future):
+    # A waiter cancelled meanwhile passes the slot on itself (see acquire)
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class BoundedExecutor:
+    """Dedicated thread pool for heavy blocking work (e.g. one Chrome per thread).
+
+    At most ``max_workers`` jobs run at once. Async callers beyond
+    ``max_workers + max_queue`` (counted across every event loop in the
+    process) wait on a shared semaphore instead of piling more work onto the
+    pool, so memory stays bounded.
+    ``queue_depth`` counts callers that are waiting for a worker.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._slots = LoopSafeSemaphore(self.max_workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'waiting': 0, 'running': 0}
+
+    def _update(self, **deltas: int):
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._stats['waiting']
+
+    def _call(self, started: threading.Event, fn: Callable, *args, **kwargs) -> Any:
+        started.set()
+        self._update(waiting=-1, running=1)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._update(running=-1)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run ``fn`` on the pool, awaiting a free slot first (backpressure)"""
+        if self._closed:
+            raise ExecutorShutdown(f"{self.name} executor is shut down")
+        self._update(submitted=1, waiting=1)
+        started = threading.Event()
+        try:
+            async with self._slots:
+                if self._closed:
+                    raise ExecutorShutdown(f"{self.name} executor is shut down")
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, functools.partial(self._call, started, fn, *args, **kwargs)
+                )
+            self._update(completed=1)
+            return result
+        except BaseException:
+            self._update(failed=1)
+            raise
+        finally:
+            # Cancelled or rejected before a worker picked it up
+            if not started.is_set():
+                self._update(waiting=-1)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'name': self.name, 'max_workers': self.max_workers, 'queue_depth': self._stats['waiting'], **self._stats}
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, drop queued jobs and let running ones finish"""
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info(f"{self.name} executor shut down")
@@ -0,0 +1,58 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Puts the whole prompt into a chat box in one step. Textareas get their value
+# through the native setter (so React sees the change); contenteditable editors
+# such as ProseMirror get an insertText command, which they treat as typing.
+INSERT_PROMPT_JS = """
+var el = document.querySelector(arguments[0]), text = arguments[1];
+if (!el) { return false; }
+el.focus();
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    var setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, text);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+} else {
+    document.execCommand('selectAll', false, null);
+    document.execCommand('insertText', false, text);
+}
+return (el.value !== undefined ? el.value : el.innerText).trim().length > 0;
+"""
+
+CLICK_IF_ENABLED_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el || el.disabled || el.getAttribute('aria-disabled') === 'true') { return false; }
+el.click();
+return true;
+"""
+
+# Starts a navigation without blocking the driver on the page load; the
+# marker lets COMPLETION_PROBE_JS tell the old page from the new one
+NAVIGATE_JS = """
+window.__pendingNavigation = true;
+window.location.assign(arguments[0]);
+"""
+
+
+def insert_prompt(driver, selector: str, prompt: str) -> bool:
+    """Insert ``prompt`` into the input matching the CSS ``selector`` with a single script call"""
+    try:
+        return bool(driver.execute_script(INSERT_PROMPT_JS, selector, prompt))
+    except Exception as e:
+        logger.error(f"Error inserting prompt: {str(e)}")
+        return False
+
+
+def click_if_enabled(driver, selector: str) -> bool:
+    """Click the element matching ``selector`` if it exists and is enabled; never waits"""
+    try:
+        return bool(driver.execute_script(CLICK_IF_ENABLED_JS, selector))
+    except Exception as e:
+        logger.error(f"Error clicking {selector}: {str(e)}")
+        return False
+
+
+def navigate_async(driver, url: str):
+    """Start loading ``url`` in the current tab and return immediately"""
+    driver.execute_script(NAVIGATE_JS, url)
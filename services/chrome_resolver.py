@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARY_CANDIDATES = [
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    'chrome',
+]
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'chro_finder', 'chrome_resolver.json')
+LATEST_RELEASE_URL = 'https://chromedriver.storage.googleapis.com/LATEST_RELEASE'
+LATEST_RELEASE_TTL = 24 * 60 * 60
+
+
+class ChromeResolver:
+    """Memoizes the installed Chrome major version and the matching chromedriver path.
+
+    Results are cached in-process and in a small JSON file on disk, keyed by the
+    browser binary's path and mtime, so a Chrome upgrade invalidates them
+    automatically. Once the cache is warm no subprocess or network call is made.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path or os.getenv('CHROME_RESOLVER_CACHE', DEFAULT_CACHE_PATH)
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, Dict]] = None
+
+    # --- disk cache ------------------------------------------------------
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._cache is None:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+        return self._cache
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not persist Chrome resolver cache: {str(e)}")
+
+    # --- binary detection ------------------------------------------------
+
+    def find_binary(self) -> Optional[str]:
+        """Return the absolute path of the first Chrome binary found, without spawning it"""
+        override = os.getenv('CHROME_BINARY')
+        candidates = [override] + CHROME_BINARY_CANDIDATES if override else CHROME_BINARY_CANDIDATES
+        for candidate in candidates:
+            path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+            if path and os.path.exists(path):
+                return os.path.realpath(path)
+        return None
+
+    def _binary_key(self, binary: str) -> str:
+        return f"{binary}:{os.stat(binary).st_mtime_ns}"
+
+    def _probe_version(self, binary: str) -> Optional[int]:
+        try:
+            output = subprocess.run([binary, '--version'], capture_output=True, timeout=10).stdout
+            match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', output.decode('UTF-8'))
+            return int(match.group(1)) if match else None
+        except Exception as e:
+            logger.warning(f"Chrome version probe failed for {binary}: {str(e)}")
+            return None
+
+    def _latest_release_version(self) -> Optional[int]:
+        entry = self._load().get('latest_release')
+        if entry and time.time() - entry.get('fetched_at', 0) < LATEST_RELEASE_TTL:
+            return entry['version']
+        try:
+            import requests
+            response = requests.get(LATEST_RELEASE_URL, timeout=10)
+            version = int(response.text.split('.')[0])
+        except Exception as e:
+            logger.warning(f"Failed to get latest ChromeDriver version: {str(e)}")
+            return None
+        self._cache['latest_release'] = {'version': version, 'fetched_at': time.time()}
+        self._save()
+        return version
+
+    # --- public API ------------------------------------------------------
+
+    def get_chrome_version(self, allow_network: bool = True) -> Optional[int]:
+        """Return the installed Chrome major version, probing it at most once per binary build"""
+        with self._lock:
+            cache = self._load()
+            binary = self.find_binary()
+            if binary:
+                key = self._binary_key(binary)
+                entry = cache.get(key, {})
+                if 'version' in entry:
+                    return entry['version']
+                version = self._probe_version(binary)
+                if version:
+                    logger.info(f"Detected Chrome version: {version}")
+                    cache[key] = {**entry, 'version': version}
+                    self._save()
+                    return version
+            if allow_network:
+                return self._latest_release_version()
+            return None
+
+    def get_driver_path(self) -> str:
+        """Return a chromedriver path matching the installed Chrome, installing it once if needed"""
+        with self._lock:
+            cache = self._load()
+            binary = self.find_binary()
+            key = self._binary_key(binary) if binary else 'unknown-binary'
+            entry = cache.get(key, {})
+            driver_path = entry.get('driver_path')
+            if driver_path and os.path.exists(driver_path):
+                return driver_path
+
+            from webdriver_manager.chrome import ChromeDriverManager
+            driver_path = ChromeDriverManager().install()
+            logger.info(f"Resolved chromedriver at {driver_path}")
+            cache[key] = {**entry, 'driver_path': driver_path}
+            self._save()
+            return driver_path
+
+
+_resolver = ChromeResolver()
+
+
+def get_chrome_version(default: Optional[int] = None, allow_network: bool = True) -> Optional[int]:
+    """Shared, cached Chrome major version lookup"""
+    return _resolver.get_chrome_version(allow_network=allow_network) or default
+
+
+def get_driver_path() -> str:
+    """Shared, cached chromedriver path lookup"""
+    return _resolver.get_driver_path()
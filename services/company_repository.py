@@ -0,0 +1,225 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = 'chro_finder.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_company_key ON runs(company_key);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp);
+
+CREATE TABLE IF NOT EXISTS source_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    response TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_source_results_run ON source_results(run_id);
+
+CREATE TABLE IF NOT EXISTS final_summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER REFERENCES runs(id) ON DELETE SET NULL,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    name TEXT,
+    linkedin_url TEXT,
+    summary TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_final_summaries_company_key ON final_summaries(company_key);
+CREATE INDEX IF NOT EXISTS idx_final_summaries_timestamp ON final_summaries(timestamp);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def normalize_company(company: str) -> str:
+    """Case- and whitespace-insensitive key used for company lookups"""
+    return ' '.join((company or '').lower().split())
+
+
+class CompanyRepository:
+    """SQLite store for search runs, per-source results and final summaries"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv('CHRO_DB_PATH', DEFAULT_DB_PATH)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Per-thread connection; commits on success and rolls back on error"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    # --- writes ----------------------------------------------------------
+
+    def record_run(self, company: str, source_results: Dict[str, Any], timestamp: Optional[str] = None) -> int:
+        """Store one search run with its per-source responses and return the run id"""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            run_id = conn.execute(
+                'INSERT INTO runs (company, company_key, timestamp) VALUES (?, ?, ?)',
+                (company, normalize_company(company), timestamp)
+            ).lastrowid
+            conn.executemany(
+                'INSERT INTO source_results (run_id, source, response, timestamp) VALUES (?, ?, ?, ?)',
+                [(run_id, source, str(response), timestamp) for source, response in source_results.items()]
+            )
+        return run_id
+
+    def add_final_summary(self,
+                          company: str,
+                          summary: str,
+                          name: str,
+                          linkedin_url: str,
+                          timestamp: Optional[str] = None,
+                          run_id: Optional[int] = None) -> int:
+        """Store a final summary and return its row id.
+
+        If the one-time final_summaries.json import already brought in this
+        exact summary (same company, timestamp and text, with no run attached),
+        that row is linked to ``run_id`` instead of being duplicated. Distinct
+        runs are never merged, even within the same second.
+        """
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        company_key = normalize_company(company)
+        with self._connect() as conn:
+            imported = conn.execute(
+                'SELECT id FROM final_summaries WHERE company_key = ? AND timestamp = ? AND summary = ? '
+                'AND run_id IS NULL ORDER BY id LIMIT 1',
+                (company_key, timestamp, summary)
+            ).fetchone()
+            if imported:
+                conn.execute(
+                    'UPDATE final_summaries SET run_id = ?, company = ?, name = ?, linkedin_url = ? WHERE id = ?',
+                    (run_id, company, name, linkedin_url, imported['id'])
+                )
+                return imported['id']
+            return conn.execute(
+                'INSERT INTO final_summaries (run_id, company, company_key, name, linkedin_url, summary, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (run_id, company, company_key, name, linkedin_url, summary, timestamp)
+            ).lastrowid
+
+    def add_final_summaries(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert summaries given as ``{company, name, linkedin_url, summary, timestamp}`` dicts"""
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO final_summaries (company, company_key, name, linkedin_url, summary, timestamp) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(row['company'], normalize_company(row['company']), row.get('name'), row.get('linkedin_url'),
+                  row.get('summary', ''), row['timestamp']) for row in rows]
+            )
+        return len(rows)
+
+    # --- reads -----------------------------------------------------------
+
+    def _summary_filter(self, search: Optional[str]):
+        if not search:
+            return '', ()
+        # Match % and _ in the search literally
+        escaped = search.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        pattern = f"%{escaped}%"
+        return "WHERE company_key LIKE ? ESCAPE '\\' OR lower(name) LIKE ? ESCAPE '\\'", (pattern, pattern)
+
+    def list_summaries(self, limit: Optional[int] = None, offset: int = 0, search: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return summary rows in insertion order, optionally filtered and paginated"""
+        where, params = self._summary_filter(search)
+        sql = f'SELECT id, company, name, linkedin_url, timestamp FROM final_summaries {where} ORDER BY id'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params = params + (limit, offset)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def count_summaries(self, search: Optional[str] = None) -> int:
+        where, params = self._summary_filter(search)
+        with self._connect() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM final_summaries {where}', params).fetchone()[0]
+
+    def get_summary(self, row_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch one summary row by id"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, company, name, linkedin_url, summary, timestamp FROM final_summaries WHERE id = ?',
+                (row_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def latest_summary(self, company: str) -> Optional[Dict[str, Any]]:
+        """Most recent summary for a company, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, company, name, linkedin_url, summary, timestamp FROM final_summaries '
+                'WHERE company_key = ? ORDER BY timestamp DESC, id DESC LIMIT 1',
+                (normalize_company(company),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def runs_for_company(self, company: str) -> List[Dict[str, Any]]:
+        """All runs for a company with their per-source responses, newest first"""
+        with self._connect() as conn:
+            runs = [dict(row) for row in conn.execute(
+                'SELECT id, company, timestamp FROM runs WHERE company_key = ? ORDER BY timestamp DESC, id DESC',
+                (normalize_company(company),)
+            )]
+            for run in runs:
+                run['sources'] = {
+                    row['source']: row['response'] for row in conn.execute(
+                        'SELECT source, response FROM source_results WHERE run_id = ?', (run['id'],)
+                    )
+                }
+        return runs
+
+    # --- meta ------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+
+_repository: Optional[CompanyRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_company_repository() -> CompanyRepository:
+    """Process-wide repository instance"""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = CompanyRepository()
+        return _repository
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from automation import extract_linkedin_url
+from services.models import SourceResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.75
+
+HONORIFICS = {'mr', 'mrs', 'ms', 'miss', 'dr', 'prof', 'shri', 'sri', 'smt', 'kumari', 'sir', 'dame'}
+ABSTAIN_MARKERS = (
+    'error', 'failed', 'not available', 'not found', 'no linkedin results', 'unknown', 'n/a',
+    'information not available', 'searching', 'waiting'
+)
+# Template text echoed back instead of an answer (e.g. Google's {"chro_name": "name", ...})
+PLACEHOLDER_NAMES = {'name', 'full name', 'chro name', 'chro of india name', 'null', 'none', 'not found', 'url or null'}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip diacritics, honorifics and punctuation: 'Dr. José  Pérez' -> 'jose perez'"""
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    tokens = re.sub(r'[^a-z\s]', ' ', text).split()
+    return ' '.join(token for token in tokens if token not in HONORIFICS)
+
+
+def name_key(name: str) -> Optional[Tuple[str, str]]:
+    """(first, last) tokens of a normalized name, so a dropped middle name still matches"""
+    tokens = normalize_name(name).split()
+    if not tokens:
+        return None
+    return tokens[0], tokens[-1]
+
+
+def canonical_linkedin(text: str) -> Optional[str]:
+    """Canonical https://www.linkedin.com/in/<slug> form of the first profile URL in ``text``"""
+    url = extract_linkedin_url(text)
+    if url == "Not available":
+        return None
+    slug = url.rstrip('/').rsplit('/', 1)[-1].lower()
+    return f"https://www.linkedin.com/in/{slug}"
+
+
+def _clean_line(line: str) -> str:
+    line = re.sub(r'[*_`#>\[\]]', '', line)
+    line = re.sub(r'^\s*(\d+[.)]|[-•])\s*', '', line)
+    line = re.sub(r'^(full\s+)?name\s*:\s*', '', line, flags=re.IGNORECASE)
+    return line.strip(' .,:;-')
+
+
+def _strip_honorifics(name: str) -> str:
+    return re.sub(r'^(?:(?:' + '|'.join(HONORIFICS) + r')\.?\s+)+', '', name, flags=re.IGNORECASE)
+
+
+def usable_name(name: Optional[str]) -> Optional[str]:
+    """Cleaned name, or None for sentences, abstentions and template placeholders"""
+    if not name:
+        return None
+    name = _clean_line(name)
+    # Sentences and paragraphs are not a bare name; leave those to the LLM
+    if not name or len(name.split()) > 5 or name.lower().startswith(ABSTAIN_MARKERS):
+        return None
+    if name.lower() in PLACEHOLDER_NAMES:
+        return None
+    return name
+
+
+def extract_candidate(result: Any) -> Tuple[Optional[str], Optional[str]]:
+    """Pull (name, canonical LinkedIn URL) out of one source's raw answer.
+
+    Understands the Google source's JSON, the LinkedIn source's
+    'Name: ...' block and the short free-text answers of the chat sources.
+    A source that errored or found nothing returns (None, None). A
+    SourceResult was parsed when it was produced, so its fields are reused.
+    """
+    if isinstance(result, SourceResult):
+        if not result.ok:
+            return None, None
+        return usable_name(result.name), canonical_linkedin(result.url) if result.url else None
+    text = result if isinstance(result, str) else json.dumps(result) if result else ''
+    if not text.strip() or text.strip().lower().startswith(ABSTAIN_MARKERS):
+        return None, None
+
+    linkedin = canonical_linkedin(text)
+    name = None
+    try:
+        data = json.loads(text[text.find('{'):text.rfind('}') + 1]) if '{' in text else None
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        name = data.get('chro_name') or data.get('name')
+        linkedin = canonical_linkedin(str(data.get('linkedin_url') or data.get('linkedin') or '')) or linkedin
+    else:
+        match = re.search(r'Name:\s*([^\n]+)', text)
+        if match:
+            name = match.group(1)
+        else:
+            lines = [_clean_line(line) for line in text.splitlines()]
+            lines = [line for line in lines if line and 'linkedin.com' not in line.lower() and 'http' not in line.lower()]
+            name = lines[0] if lines else None
+
+    return usable_name(name), linkedin
+
+
+class _ConsensusStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {'resolved_locally': 0, 'escalated': 0}
+
+    def add(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+_stats = _ConsensusStats()
+
+
+def resolve_consensus(source_results: Dict[str, Any], threshold: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Answer directly when enough sources agree, otherwise return None to escalate to the LLM.
+
+    The name score is the share of *all* sources (abstentions count against
+    it) whose normalized first/last name matches the most common one. It must
+    reach ``threshold`` (``CONSENSUS_THRESHOLD``, default 0.75 = 3 of 4).
+    The agreeing sources must not name two different LinkedIn profiles.
+    Returns ``{'name', 'linkedin', 'score', 'agreeing'}``.
+    """
+    threshold = threshold if threshold is not None else float(os.getenv('CONSENSUS_THRESHOLD', DEFAULT_THRESHOLD))
+    candidates = {source: extract_candidate(result) for source, result in source_results.items()}
+    keys = {source: name_key(name) for source, (name, _) in candidates.items() if name and name_key(name)}
+
+    if not keys or not candidates:
+        _stats.add('escalated')
+        return None
+
+    top_key, votes = Counter(keys.values()).most_common(1)[0]
+    score = votes / len(candidates)
+    agreeing: List[str] = [source for source, key in keys.items() if key == top_key]
+    slugs = {candidates[source][1] for source in agreeing if candidates[source][1]}
+
+    if score < threshold or len(slugs) > 1:
+        logger.info(f"No consensus (score {score:.2f}, {len(slugs)} LinkedIn profiles); escalating to LLM")
+        _stats.add('escalated')
+        return None
+
+    # Prefer the most common spelling among agreeing sources, title-cased if every source lowercased it
+    name = Counter(_strip_honorifics(candidates[source][0]) for source in agreeing).most_common(1)[0][0]
+    if name == name.lower():
+        name = name.title()
+    linkedin = slugs.pop() if slugs else None
+    _stats.add('resolved_locally')
+    logger.info(f"Consensus {score:.2f} from {', '.join(agreeing)}: {name} {linkedin or ''}")
+    return {'name': name, 'linkedin': linkedin, 'score': score, 'agreeing': agreeing}
+
+
+def get_consensus_stats() -> Dict[str, int]:
+    return _stats.snapshot()
@@ -0,0 +1,278 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPoolExhausted(Exception):
+    """Raised when no driver could be checked out before the timeout"""
+
+
+class _PooledDriver:
+    """Book-keeping wrapper around one live WebDriver"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.baseline_heap_mb: Optional[float] = None
+
+
+class DriverPool:
+    """Warm pool of pre-launched, pre-navigated Selenium sessions for one site.
+
+    Sessions are checked out for a single search and checked back in afterwards,
+    where they are reset on a background thread: by the optional ``reset``
+    callable (an in-page reset such as opening a new chat thread, returning
+    True on success) or else by reloading ``home_url``. A session is
+    recycled (quit and replaced) when it fails a health check, has served
+    ``max_uses`` searches, or its JS heap has grown by more than
+    ``max_heap_growth_mb`` since it was launched.
+    """
+
+    def __init__(self,
+                 name: str,
+                 factory: Callable[[], Any],
+                 home_url: str,
+                 size: int = 1,
+                 max_uses: int = 20,
+                 max_heap_growth_mb: float = 300.0,
+                 settle_seconds: float = 0.0,
+                 reset: Optional[Callable[[Any], bool]] = None):
+        self.name = name
+        self.factory = factory
+        self.home_url = home_url
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_heap_growth_mb = max_heap_growth_mb
+        self.settle_seconds = settle_seconds
+        self.reset = reset
+
+        self._idle: List[_PooledDriver] = []
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reset_executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"{name}-pool")
+        self._stats = {
+            'created': 0,
+            'recycled': 0,
+            'checkouts': 0,
+            'health_check_failures': 0,
+            'launch_failures': 0,
+            'soft_resets': 0,
+        }
+
+    # --- lifecycle -------------------------------------------------------
+
+    def _launch(self) -> _PooledDriver:
+        """Start a new browser and navigate it to the home page"""
+        driver = self.factory()
+        if not driver:
+            raise RuntimeError(f"{self.name} driver factory returned no driver")
+        pooled = _PooledDriver(driver)
+        self._navigate_home(pooled)
+        pooled.baseline_heap_mb = self._heap_mb(driver)
+        logger.info(f"{self.name} pool: launched new session")
+        return pooled
+
+    def _navigate_home(self, pooled: _PooledDriver):
+        pooled.driver.get(self.home_url)
+        if self.settle_seconds:
+            time.sleep(self.settle_seconds)
+
+    def _quit(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.warning(f"{self.name} pool: error quitting driver: {str(e)}")
+
+    def warm(self, background: bool = True):
+        """Pre-launch sessions until the pool holds ``size`` drivers"""
+        def _fill():
+            while True:
+                with self._cond:
+                    if self._closed or self._total >= self.size:
+                        return
+                    self._total += 1
+                try:
+                    pooled = self._launch()
+                except Exception as e:
+                    logger.error(f"{self.name} pool: warm-up launch failed: {str(e)}")
+                    with self._cond:
+                        self._total -= 1
+                        self._stats['launch_failures'] += 1
+                        self._cond.notify()
+                    return
+                with self._cond:
+                    self._stats['created'] += 1
+                    self._idle.append(pooled)
+                    self._cond.notify()
+
+        if background:
+            threading.Thread(target=_fill, name=f"{self.name}-pool-warm", daemon=True).start()
+        else:
+            _fill()
+
+    def close(self):
+        """Quit every idle session; checked-out sessions are quit on check-in"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        self._reset_executor.shutdown(wait=False)
+
+    # --- health ----------------------------------------------------------
+
+    def _heap_mb(self, driver) -> Optional[float]:
+        try:
+            used = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
+        try:
+            return pooled.driver.execute_script("return document.readyState") is not None
+        except Exception:
+            return False
+
+    def _should_recycle(self, pooled: _PooledDriver) -> bool:
+        if pooled.uses >= self.max_uses:
+            logger.info(f"{self.name} pool: recycling session after {pooled.uses} uses")
+            return True
+        heap = self._heap_mb(pooled.driver)
+        if heap is not None and pooled.baseline_heap_mb is not None:
+            if heap - pooled.baseline_heap_mb > self.max_heap_growth_mb:
+                logger.info(f"{self.name} pool: recycling session, JS heap grew to {heap:.0f} MB")
+                return True
+        return False
+
+    # --- checkout / checkin ----------------------------------------------
+
+    def checkout(self, timeout: float = 120.0):
+        """Return a ready driver, launching one if the pool has spare capacity"""
+        deadline = time.monotonic() + timeout
+        while True:
+            launch = False
+            with self._cond:
+                while not self._idle and self._total >= self.size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolExhausted(f"No {self.name} driver available after {timeout}s")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise DriverPoolExhausted(f"{self.name} pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                else:
+                    self._total += 1
+                    launch = True
+
+            if launch:
+                try:
+                    pooled = self._launch()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._stats['launch_failures'] += 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats['created'] += 1
+            elif not self._is_healthy(pooled):
+                logger.warning(f"{self.name} pool: discarding unhealthy session")
+                self._quit(pooled)
+                with self._cond:
+                    self._total -= 1
+                    self._stats['health_check_failures'] += 1
+                    self._cond.notify()
+                continue
+
+            pooled.uses += 1
+            with self._cond:
+                self._stats['checkouts'] += 1
+            return pooled
+
+    def checkin(self, pooled: _PooledDriver, healthy: bool = True):
+        """Hand a driver back; it is reset to the home page or recycled in the background"""
+        with self._cond:
+            closed = self._closed
+        if not closed:
+            try:
+                self._reset_executor.submit(self._reset_or_recycle, pooled, healthy)
+                return
+            except RuntimeError:
+                # close() shut the executor down after the check above
+                pass
+
+        # The pool is closed: nothing will reuse this session, so quit it here
+        self._quit(pooled)
+        with self._cond:
+            self._total -= 1
+            self._cond.notify_all()
+
+    def _reset_or_recycle(self, pooled: _PooledDriver, healthy: bool):
+        keep = healthy and not self._closed and not self._should_recycle(pooled)
+        if keep and self.reset:
+            try:
+                if self.reset(pooled.driver):
+                    with self._cond:
+                        self._stats['soft_resets'] += 1
+                        self._idle.append(pooled)
+                        self._cond.notify()
+                    return
+            except Exception as e:
+                logger.warning(f"{self.name} pool: soft reset failed: {str(e)}")
+
+        if keep:
+            try:
+                self._navigate_home(pooled)
+            except Exception as e:
+                logger.warning(f"{self.name} pool: reset navigation failed: {str(e)}")
+                keep = False
+
+        if keep:
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+            return
+
+        self._quit(pooled)
+        with self._cond:
+            self._total -= 1
+            self._stats['recycled'] += 1
+            self._cond.notify()
+        if not self._closed:
+            self.warm(background=False)
+
+    @contextmanager
+    def session(self, timeout: float = 120.0):
+        """Context manager yielding a driver; exceptions mark the session unhealthy"""
+        pooled = self.checkout(timeout)
+        healthy = True
+        try:
+            yield pooled.driver
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.checkin(pooled, healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters"""
+        with self._cond:
+            return {
+                'name': self.name,
+                'size': self.size,
+                'total': self._total,
+                'idle': len(self._idle),
+                'in_use': self._total - len(self._idle),
+                **self._stats,
+            }
@@ -1,16 +1,44 @@
 from google import genai
 from google.genai import types
+import asyncio
 import logging
-from typing import Dict, Any
+import random
+from typing import Dict, Any, Iterable, Optional
 import re
 
+from services.llm_cache import LLMResponseCache, default_cacheable, get_llm_cache
+
 logger = logging.getLogger(__name__)
 
+CHRO_SEARCH_PROMPT_TEMPLATE = (
+    "Who is the Chief Human Resource Officer (CHRO) of {company_name} India? "
+    "Respond with ONLY the person's full name, nothing else. "
+    "Do not include their title, position, or any other information. "
+    "Example response format: 'John Smith'"
+)
+
+# HTTP statuses worth retrying with backoff (rate limited / temporarily overloaded)
+RETRYABLE_STATUS_CODES = (429, 503)
+
+
+def _is_retryable(error: Exception) -> bool:
+    code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    message = str(error)
+    return '429' in message or 'RESOURCE_EXHAUSTED' in message
+
+
+def _has_response_text(value: Any) -> bool:
+    """Cache a grounded answer only if it has text; an empty one is retried on the next lookup"""
+    return isinstance(value, dict) and default_cacheable(value) and bool((value.get('response_text') or '').strip())
+
 class GeminiDirectSearcher:
-    def __init__(self, api_key: str):
-        """Initialize with API key"""
+    def __init__(self, api_key: str, cache: Optional[LLMResponseCache] = None):
+        """Initialize with API key and the shared LLM response cache"""
         self.api_key = api_key
         self.client = self._configure_gemini_client()
+        self.cache = cache or get_llm_cache()
 
     def _configure_gemini_client(self):
         """Configure and return a Gemini API client"""
@@ -58,6 +86,62 @@ class GeminiDirectSearcher:
         
         return text
 
+    def _grounded_config(self, threshold: float) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            tools=[self._create_search_tool(threshold)],
+            response_modalities=["TEXT"],
+        )
+
+    def _parse_grounded_response(self, response) -> Dict[str, Any]:
+        """Pull the cleaned name, raw text and grounding sources out of a Gemini response"""
+        # Initialize result with default values
+        result = {
+            'response_text': '',
+            'raw_response': '',
+            'sources': []
+        }
+        
+        # Extract response text if available
+        if (hasattr(response, 'candidates') and 
+            response.candidates and 
+            hasattr(response.candidates[0], 'content') and 
+            response.candidates[0].content.parts):
+            raw_text = response.candidates[0].content.parts[0].text
+            cleaned_name = self._extract_name(raw_text)
+            result['response_text'] = cleaned_name
+            result['raw_response'] = raw_text
+        
+        # Extract grounding metadata if available
+        if (hasattr(response, 'candidates') and 
+            response.candidates and 
+            hasattr(response.candidates[0], 'grounding_metadata') and 
+            response.candidates[0].grounding_metadata):
+            
+            metadata = response.candidates[0].grounding_metadata
+            
+            # Extract search suggestions if available
+            if (hasattr(metadata, 'search_entry_point') and 
+                metadata.search_entry_point and 
+                hasattr(metadata.search_entry_point, 'rendered_content')):
+                result['search_suggestions'] = metadata.search_entry_point.rendered_content
+            
+            # Extract sources if available
+            if (hasattr(metadata, 'grounding_chunks') and 
+                metadata.grounding_chunks is not None):
+                sources = []
+                for chunk in metadata.grounding_chunks:
+                    if (hasattr(chunk, 'web') and 
+                        chunk.web is not None and 
+                        hasattr(chunk.web, 'uri') and 
+                        hasattr(chunk.web, 'title')):
+                        sources.append({
+                            'uri': chunk.web.uri,
+                            'title': chunk.web.title
+                        })
+                result['sources'] = sources
+        
+        return result
+
     def _generate_grounded_response(self, prompt: str, model_id: str = "gemini-2.0-flash", threshold: float = 0.3) -> Dict[str, Any]:
         """
         Generate a response using Gemini with Google Search grounding
@@ -71,65 +155,72 @@ class GeminiDirectSearcher:
             dict: Response content and grounding metadata
         """
         try:
-            response = self.client.models.generate_content(
-                model=model_id,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    tools=[self._create_search_tool(threshold)],
-                    response_modalities=["TEXT"],
-                )
+            return self.cache.get_or_call(
+                model_id,
+                prompt,
+                lambda: self._parse_grounded_response(self.client.models.generate_content(
+                    model=model_id,
+                    contents=prompt,
+                    config=self._grounded_config(threshold)
+                )),
+                extra=f"grounded:{threshold}",
+                cacheable=_has_response_text
             )
-            
-            # Initialize result with default values
-            result = {
+        
+        except Exception as e:
+            logger.error(f"Error in generate_grounded_response: {str(e)}", exc_info=True)
+            return {
+                'error': str(e),
                 'response_text': '',
                 'raw_response': '',
                 'sources': []
             }
-            
-            # Extract response text if available
-            if (hasattr(response, 'candidates') and 
-                response.candidates and 
-                hasattr(response.candidates[0], 'content') and 
-                response.candidates[0].content.parts):
-                raw_text = response.candidates[0].content.parts[0].text
-                cleaned_name = self._extract_name(raw_text)
-                result['response_text'] = cleaned_name
-                result['raw_response'] = raw_text
-            
-            # Extract grounding metadata if available
-            if (hasattr(response, 'candidates') and 
-                response.candidates and 
-                hasattr(response.candidates[0], 'grounding_metadata') and 
-                response.candidates[0].grounding_metadata):
-                
-                metadata = response.candidates[0].grounding_metadata
-                
-                # Extract search suggestions if available
-                if (hasattr(metadata, 'search_entry_point') and 
-                    metadata.search_entry_point and 
-                    hasattr(metadata.search_entry_point, 'rendered_content')):
-                    result['search_suggestions'] = metadata.search_entry_point.rendered_content
-                
-                # Extract sources if available
-                if (hasattr(metadata, 'grounding_chunks') and 
-                    metadata.grounding_chunks is not None):
-                    sources = []
-                    for chunk in metadata.grounding_chunks:
-                        if (hasattr(chunk, 'web') and 
-                            chunk.web is not None and 
-                            hasattr(chunk.web, 'uri') and 
-                            hasattr(chunk.web, 'title')):
-                            sources.append({
-                                'uri': chunk.web.uri,
-                                'title': chunk.web.title
-                            })
-                    result['sources'] = sources
-            
-            return result
-        
+
+    async def _generate_content_async(self,
+                                      model_id: str,
+                                      contents: str,
+                                      config: Optional[types.GenerateContentConfig] = None,
+                                      timeout: float = 60.0,
+                                      max_retries: int = 5,
+                                      base_delay: float = 1.0):
+        """
+        Call the async Gemini client with a per-attempt timeout, retrying
+        429/503 responses with exponential backoff and jitter
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return await asyncio.wait_for(
+                    self.client.aio.models.generate_content(model=model_id, contents=contents, config=config),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Gemini request timed out after {timeout}s")
+            except Exception as e:
+                if attempt == max_retries or not _is_retryable(e):
+                    raise
+                delay = min(60.0, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.5)
+                logger.warning(f"Gemini rate limited, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+                await asyncio.sleep(delay)
+
+    async def _generate_grounded_response_async(self,
+                                                prompt: str,
+                                                model_id: str = "gemini-2.0-flash",
+                                                threshold: float = 0.3,
+                                                timeout: float = 60.0) -> Dict[str, Any]:
+        """Async variant of :meth:`_generate_grounded_response` that never blocks the event loop"""
+        async def fetch():
+            response = await self._generate_content_async(
+                model_id, prompt, config=self._grounded_config(threshold), timeout=timeout
+            )
+            return self._parse_grounded_response(response)
+
+        try:
+            # Same grounding config as the sync path, so both share cache entries
+            return await self.cache.aget_or_call(
+                model_id, prompt, fetch, extra=f"grounded:{threshold}", cacheable=_has_response_text
+            )
         except Exception as e:
-            logger.error(f"Error in generate_grounded_response: {str(e)}", exc_info=True)
+            logger.error(f"Error in generate_grounded_response: {str(e)}")
             return {
                 'error': str(e),
                 'response_text': '',
@@ -137,7 +228,11 @@ class GeminiDirectSearcher:
                 'sources': []
             }
 
-    async def search(self, company_name: str, model_id: str = "gemini-2.0-flash", threshold: float = 0.3) -> Dict[str, Any]:
+    async def search(self,
+                     company_name: str,
+                     model_id: str = "gemini-2.0-flash",
+                     threshold: float = 0.3,
+                     timeout: float = 60.0) -> Dict[str, Any]:
         """
         Search for CHRO/HR Head using Gemini's direct search
         
@@ -145,19 +240,15 @@ class GeminiDirectSearcher:
             company_name (str): Name of the company to search for
             model_id (str): Gemini model to use
             threshold (float): Search grounding threshold
+            timeout (float): Seconds allowed per API attempt
             
         Returns:
             Dict containing search results and metadata
         """
         try:
-            prompt = (
-                f"Who is the Chief Human Resource Officer (CHRO) of {company_name} India? "
-                "Respond with ONLY the person's full name, nothing else. "
-                "Do not include their title, position, or any other information. "
-                "Example response format: 'John Smith'"
-            )
+            prompt = CHRO_SEARCH_PROMPT_TEMPLATE.format(company_name=company_name)
             
-            result = self._generate_grounded_response(prompt, model_id, threshold)
+            result = await self._generate_grounded_response_async(prompt, model_id, threshold, timeout)
             
             if 'error' in result:
                 logger.error(f"Error in Gemini search: {result['error']}")
@@ -184,6 +275,35 @@ class GeminiDirectSearcher:
                 'sources': []
             } 
             
+    async def search_many(self,
+                          companies: Iterable[str],
+                          concurrency: int = 16,
+                          model_id: str = "gemini-2.0-flash",
+                          threshold: float = 0.3,
+                          timeout: float = 60.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Run grounded searches for many companies at once
+        
+        Args:
+            companies: Company names to look up
+            concurrency (int): Maximum requests in flight
+            model_id (str): Gemini model to use
+            threshold (float): Search grounding threshold
+            timeout (float): Seconds allowed per API attempt
+            
+        Returns:
+            Dict mapping each company to its :meth:`search` result
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        names = list(dict.fromkeys(companies))
+
+        async def bounded(company_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.search(company_name, model_id, threshold, timeout)
+
+        results = await asyncio.gather(*(bounded(name) for name in names))
+        return dict(zip(names, results))
+
     async def generate_summary(self, 
                         company_name: str, 
                         perplexity_result: str, 
@@ -248,14 +368,16 @@ Format as a clean, professional profile with bullet points and clear sections. E
             
             # Use a different method to generate content since we're not using search grounding
             try:
-                model = self.client.models.get(model_id)
-                response = model.generate_content(summary_prompt)
+                async def generate():
+                    response = await self._generate_content_async(model_id, summary_prompt)
+                    
+                    # Extract the summary text
+                    if hasattr(response, 'candidates') and response.candidates:
+                        if hasattr(response.candidates[0], 'content') and response.candidates[0].content.parts:
+                            return response.candidates[0].content.parts[0].text
+                    return ''
                 
-                # Extract the summary text
-                summary_text = ''
-                if hasattr(response, 'candidates') and response.candidates:
-                    if hasattr(response.candidates[0], 'content') and response.candidates[0].content.parts:
-                        summary_text = response.candidates[0].content.parts[0].text
+                summary_text = await self.cache.aget_or_call(model_id, summary_prompt, generate)
                 
                 logger.info(f"Generated summary for {company_name}")
                 
@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = ' \t\r\n'
+# Top-level values start a line; nested ones are indented or inline
+_RECORD_START = re.compile(r'\n[{\[]')
+
+
+class JSONStreamReader:
+    """Incremental reader for files of concatenated (possibly pretty-printed) JSON values.
+
+    ``final_summaries.json`` is written by appending ``json.dump(..., indent=4)``
+    objects one after another, so it is neither JSON nor JSON Lines. This reader
+    walks it with ``json.JSONDecoder.raw_decode``, remembers the byte offset of
+    the last complete value together with the file's size and mtime, and on
+    each :meth:`read` only decodes what was appended since. A trailing value
+    that is still being written is left for the next call. A top-level JSON
+    array (as produced by ``fix_final_summaries_file``) is flattened.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._decoder = json.JSONDecoder()
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._records: List[Any] = []
+        self._offset = 0
+        self._mtime_ns: Optional[int] = None
+        self._size = 0
+        self._head = b''
+
+    def read(self) -> List[Any]:
+        """Return every decoded value, parsing only bytes appended since the last call"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return []
+
+            if stat.st_mtime_ns == self._mtime_ns and stat.st_size == self._size:
+                return list(self._records)
+
+            with open(self.path, 'rb') as f:
+                # Truncated or rewritten in place (e.g. by fix_final_summaries_file): start over
+                head = f.read(len(self._head))
+                if stat.st_size < self._offset or head != self._head:
+                    logger.info(f"{self.path} was rewritten, re-reading from the start")
+                    self._reset()
+                f.seek(self._offset)
+                chunk = f.read()
+
+            text = chunk.decode('utf-8', errors='replace')
+            consumed = self._decode(text)
+            self._offset += len(text[:consumed].encode('utf-8'))
+            if len(self._head) < 64:
+                self._head = (self._head + chunk)[:min(64, self._offset)]
+            self._mtime_ns = stat.st_mtime_ns
+            self._size = stat.st_size
+            return list(self._records)
+
+    def _decode(self, text: str) -> int:
+        """Decode complete values from ``text`` and return how many characters were consumed"""
+        pos = 0
+        consumed = 0
+        end = len(text)
+        while True:
+            while pos < end and text[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= end:
+                return end
+
+            try:
+                value, pos = self._decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                # Either junk between values or a value still being written.
+                # Only resync at a top-level record (a '{' or '[' starting a
+                # line); otherwise stop here so a partial value is re-read whole
+                # next time instead of its nested objects being taken as records.
+                boundary = _RECORD_START.search(text, pos + 1)
+                if boundary is None:
+                    return consumed
+                pos = boundary.start() + 1
+                continue
+
+            if isinstance(value, list):
+                self._records.extend(value)
+            else:
+                self._records.append(value)
+            consumed = pos
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+
+_readers: Dict[str, JSONStreamReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_json_stream_reader(path: str) -> JSONStreamReader:
+    """Shared reader per absolute path so every caller benefits from the same cache"""
+    key = os.path.abspath(path)
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = _readers[key] = JSONStreamReader(key)
+        return reader
@@ -6,7 +6,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from services.chrome_resolver import get_driver_path
+from services.resource_blocker import get_resource_blocker
+from services.bounded_executor import BoundedExecutor
+from typing import Optional
+import os
+import threading
 import time
 import json
 import platform
@@ -16,9 +21,27 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SEARCH_PAGE_URL = "https://recruitmentgeek.com/tools/linkedin"
+# A search that shows neither results nor the no-results marker usually means throttling,
+# so failed attempts back off exponentially from this delay
+RETRY_BACKOFF_SECONDS = 5
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait after failed attempt ``attempt`` (1-based) before the next one"""
+    return RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+
 class LinkedInScraper:
-    def __init__(self):
+    def __init__(self, max_browsers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.resource_blocker = get_resource_blocker('linkedin')
         self.setup_chrome_options()
+        # Every job on this executor owns one Chrome, so its size caps concurrent browsers
+        self.max_browsers = max_browsers or int(os.getenv('LINKEDIN_MAX_BROWSERS', '2'))
+        self.executor = BoundedExecutor(
+            'linkedin-browser',
+            max_workers=self.max_browsers,
+            max_queue=max_queue if max_queue is not None else int(os.getenv('LINKEDIN_MAX_QUEUE', '8'))
+        )
 
     def setup_chrome_options(self):
         """Setup Chrome options for scraping"""
@@ -34,6 +57,8 @@ class LinkedInScraper:
         self.chrome_options.add_argument('--disable-popup-blocking')
         self.chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        if self.resource_blocker:
+            self.resource_blocker.configure_options(self.chrome_options)
 
     def get_webdriver(self):
         """Get appropriate WebDriver based on platform"""
@@ -44,24 +69,26 @@ class LinkedInScraper:
                 driver = webdriver.Chrome(service=service, options=self.chrome_options)
             else:
                 # For other platforms
-                service = Service(ChromeDriverManager().install())
+                service = Service(get_driver_path())
                 driver = webdriver.Chrome(service=service, options=self.chrome_options)
             
             driver.set_page_load_timeout(30)
+            if self.resource_blocker:
+                self.resource_blocker.apply(driver)
             return driver
         except Exception as e:
             logger.error(f"Error creating WebDriver: {str(e)}")
             raise
 
-    async def scrape_both_sources(self, company_name):
+    async def scrape_both_sources(self, company_name, search_query="HR Head", location="India"):
         """Scrape LinkedIn profiles and return the first valid result"""
         try:
             # Get LinkedIn results
             logger.info("Scraping LinkedIn via RecruitmentGeek...")
             linkedin_results = await self.extract_profiles(
-                search_query="HR Head",
+                search_query=search_query,
                 company_name=company_name,
-                location="India",
+                location=location,
                 max_results=5
             )
             logger.info(f"LinkedIn scraping completed. Found {len(linkedin_results)} results.")
@@ -165,84 +192,183 @@ class LinkedInScraper:
         logger.info(f"Starting profile extraction for {company_name} in {location}")
         
         try:
-            loop = asyncio.get_event_loop()
-            profiles = await loop.run_in_executor(
-                None, self._extract_profiles_sync, search_query, company_name, location, max_results
+            profiles = await self.executor.run(
+                self._extract_profiles_sync, search_query, company_name, location, max_results
             )
             return profiles[:max_results]
         except Exception as e:
             logger.error(f"Error in extract_profiles: {str(e)}")
             raise
 
+    async def stream_profiles(self, companies, search_query="HR Head", location="India", max_results=5):
+        """Extract profiles for many companies in one browser session, yielding each as it is parsed.
+
+        Yields ``{'company', 'profiles', 'error'}`` dicts in input order; ``error``
+        is None on success. One Chrome and one loaded search page serve the
+        whole list, so each company costs a single search round-trip.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for item in self._iter_profiles_sync(companies, search_query, location, max_results):
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                logger.error(f"Error in LinkedIn session: {str(e)}")
+
+        # Waits for a free browser slot; ``done`` is queued after the last item, or if the slot is refused
+        producer = asyncio.ensure_future(self.executor.run(produce))
+        producer.add_done_callback(lambda _: queue.put_nowait(done))
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            # Consumer stopped early: let the session finish its current search and close the browser
+            stop.set()
+        await producer
+
+    def _iter_profiles_sync(self, companies, search_query, location, max_results, max_retries=3):
+        """Run one search per company against a single reused search page"""
+        driver = None
+        try:
+            for company_name in companies:
+                full_search_query = f"{search_query} {company_name} {location}".strip()
+                error = None
+                for attempt in range(1, max_retries + 1):
+                    try:
+                        if driver is None:
+                            driver = self.get_webdriver()
+                            self._open_search_page(driver)
+                        profiles = self._run_search(driver, full_search_query, max_results)
+                        error = None
+                        break
+                    except Exception as e:
+                        error = str(e)
+                        logger.error(f"Error searching {company_name} (attempt {attempt}/{max_retries}): {error}")
+                        if attempt == max_retries:
+                            break
+                        delay = retry_delay(attempt)
+                        logger.info(f"Retrying {company_name} after {delay} seconds...")
+                        time.sleep(delay)
+                        # Start the next attempt from a fresh page, or a fresh browser if this one is gone
+                        try:
+                            self._open_search_page(driver)
+                        except Exception:
+                            self._quit(driver)
+                            driver = None
+                if error:
+                    yield {'company': company_name, 'profiles': [], 'error': error}
+                else:
+                    yield {'company': company_name, 'profiles': profiles, 'error': None}
+        finally:
+            self._quit(driver)
+
     def _extract_profiles_sync(self, search_query, company_name, location, max_results):
         """Synchronous part of profile extraction"""
         driver = None
         try:
             driver = self.get_webdriver()
-            all_profiles = []
             full_search_query = f"{search_query} {company_name} {location}".strip()
-            
-            base_url = "https://recruitmentgeek.com/tools/linkedin"
-            driver.get(base_url)
-            
-            wait = WebDriverWait(driver, 20)
+            self._open_search_page(driver)
             
             # Retry loop for search box
             max_retries = 3
             retries = 0
             while retries < max_retries:
                 try:
-                    search_box = wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "input.gsc-input"))
-                    )
-                    search_box.clear()
-                    search_box.send_keys(full_search_query)
-                    
-                    search_button = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "button.gsc-search-button"))
-                    )
-                    
-                    driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
-                    time.sleep(1)
-                    
-                    try:
-                        search_button.click()
-                    except:
-                        driver.execute_script("arguments[0].click();", search_button)
-                    
-                    time.sleep(5)
-                    break
-                    
+                    return self._run_search(driver, full_search_query, max_results)
                 except Exception as e:
                     retries += 1
                     logger.error(f"Error in search attempt {retries}/{max_retries}: {str(e)}")
                     if retries < max_retries:
-                        logger.info(f"Retrying after 5 seconds...")
-                        time.sleep(5)
+                        delay = retry_delay(retries)
+                        logger.info(f"Retrying after {delay} seconds...")
+                        time.sleep(delay)
                         continue
                     else:
                         logger.error("Max retries reached for search operation")
                         raise
             
-            results = driver.find_elements(By.CSS_SELECTOR, ".gsc-webResult")
-            
-            for result in results[:max_results]:
-                try:
-                    profile = self._extract_profile_data(result)
-                    if profile:
-                        all_profiles.append(profile)
-                except Exception as e:
-                    logger.error(f"Error extracting profile data: {str(e)}")
-                    continue
-            
-            return all_profiles
-            
         except Exception as e:
             logger.error(f"Error in _extract_profiles_sync: {str(e)}")
             raise
         finally:
-            if driver:
+            self._quit(driver)
+
+    def _open_search_page(self, driver):
+        driver.get(SEARCH_PAGE_URL)
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "input.gsc-input"))
+        )
+
+    def _run_search(self, driver, full_search_query, max_results):
+        """Reset the search box, submit a query and parse the refreshed results"""
+        wait = WebDriverWait(driver, 20)
+        previous = driver.find_elements(By.CSS_SELECTOR, ".gsc-webResult")
+        
+        search_box = wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "input.gsc-input"))
+        )
+        search_box.clear()
+        search_box.send_keys(full_search_query)
+        
+        search_button = wait.until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "button.gsc-search-button"))
+        )
+        
+        driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
+        
+        try:
+            search_button.click()
+        except:
+            driver.execute_script("arguments[0].click();", search_button)
+        
+        # Wait for the previous query's results to be replaced, then for the new ones to render
+        if previous:
+            try:
+                WebDriverWait(driver, 10).until(EC.staleness_of(previous[0]))
+            except Exception:
+                logger.warning(f"Previous results did not refresh for '{full_search_query}'")
+        WebDriverWait(driver, 15).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, ".gsc-webResult, .gs-no-results-result")
+        )
+        
+        all_profiles = []
+        for result in driver.find_elements(By.CSS_SELECTOR, ".gsc-webResult")[:max_results]:
+            try:
+                profile = self._extract_profile_data(result)
+                if profile:
+                    all_profiles.append(profile)
+            except Exception as e:
+                logger.error(f"Error extracting profile data: {str(e)}")
+                continue
+        
+        return all_profiles
+
+    def _quit(self, driver):
+        if driver:
+            if self.resource_blocker:
+                self.resource_blocker.collect(driver)
+            try:
                 driver.quit()
+            except Exception:
+                pass
+
+    def stats(self):
+        """Browser executor counters, including the number of callers waiting for a browser"""
+        return self.executor.stats()
+
+    def shutdown(self, wait: bool = True):
+        """Finish running extractions, drop queued ones and refuse new work"""
+        self.executor.shutdown(wait=wait)
 
     def _extract_profile_data(self, result):
         """Extract data from a single search result"""
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = 'llm_cache.db'
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so re-indented copies of a prompt share a cache entry"""
+    return ' '.join((prompt or '').split())
+
+
+def response_key(model_id: str, prompt: str, extra: str = '') -> str:
+    """Content address of a request: model id + normalized prompt (+ any config that changes the answer)"""
+    payload = '\0'.join((model_id, normalize_prompt(prompt), extra))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def default_cacheable(value: Any) -> bool:
+    """Skip empty answers and error payloads"""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, dict):
+        return not value.get('error')
+    return True
+
+
+class LLMResponseCache:
+    """Content-addressed cache for LLM responses with single-flight deduplication.
+
+    Responses are stored in SQLite under ``response_key(model_id, prompt)``
+    with a TTL and least-recently-used eviction beyond ``max_entries``.
+    Concurrent identical requests (from threads or event loops) share one
+    in-flight call: the first caller runs it and the others wait for its
+    result. Values must be JSON-serializable.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_hours: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path or os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.ttl = float(ttl_hours if ttl_hours is not None else os.getenv('LLM_CACHE_TTL_HOURS', '24')) * 3600
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv('LLM_CACHE_MAX_ENTRIES', '10000'))
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' model_id TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        self._conn.commit()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._conn.commit()
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self._stats['hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, model_id: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model_id, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)',
+                (key, model_id, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            overflow = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)', (overflow,)
+                )
+                self._stats['evictions'] += overflow
+            self._conn.commit()
+            self._stats['stores'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0],
+                'in_flight': len(self._inflight),
+                **self._stats
+            }
+
+    def _claim(self, key: str):
+        """Return (future, is_leader) for a key, registering a new in-flight call if none exists"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _settle(self, key: str, model_id: str, future: Future, value: Any = None,
+                error: Optional[BaseException] = None, cacheable: Callable[[Any], bool] = default_cacheable):
+        if error is None and cacheable(value):
+            self.put(key, model_id, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def get_or_call(self,
+                    model_id: str,
+                    prompt: str,
+                    fn: Callable[[], Any],
+                    extra: str = '',
+                    force_refresh: bool = False,
+                    cacheable: Callable[[Any], bool] = default_cacheable) -> Any:
+        """Return the cached response or run ``fn()`` once for all concurrent identical callers"""
+        key = response_key(model_id, prompt, extra)
+        if not force_refresh:
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+        future, leader = self._claim(key)
+        if not leader:
+            return future.result()
+        try:
+            value = fn()
+        except BaseException as e:
+            self._settle(key, model_id, future, error=e)
+            raise
+        self._settle(key, model_id, future, value, cacheable=cacheable)
+        return value
+
+    async def aget_or_call(self,
+                           model_id: str,
+                           prompt: str,
+                           fn: Callable[[], Awaitable[Any]],
+                           extra: str = '',
+                           force_refresh: bool = False,
+                           cacheable: Callable[[Any], bool] = default_cacheable) -> Any:
+        """Async :meth:`get_or_call`; ``fn`` is a zero-argument coroutine function"""
+        key = response_key(model_id, prompt, extra)
+        if not force_refresh:
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+        future, leader = self._claim(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._settle(key, model_id, future, error=e)
+            raise
+        self._settle(key, model_id, future, value, cacheable=cacheable)
+        return value
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide LLM response cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from services.models import ERROR_PREFIXES, SourceResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = 'lookup_cache.db'
+
+# Hours each source's answer stays fresh; override with LOOKUP_CACHE_TTL_<SOURCE> (hours)
+DEFAULT_TTLS_HOURS = {
+    'perplexity': 24,
+    'openai': 24,
+    'google': 24,
+    'jecrc': 72,
+    'summary': 24,
+}
+
+# Marks a serialized SourceResult inside a stored JSON value
+SOURCE_RESULT_TAG = '__source_result__'
+
+
+def normalize_company(company: str) -> str:
+    return ' '.join((company or '').lower().split())
+
+
+def prompt_hash(prompt_template: str) -> str:
+    """Short, stable fingerprint of a prompt template (or any prompt-defining text)"""
+    return hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()[:16]
+
+
+def is_cacheable(value: Any) -> bool:
+    """Only successful, non-empty answers are worth caching"""
+    if value is None:
+        return False
+    if isinstance(value, SourceResult):
+        return value.ok
+    if isinstance(value, str):
+        text = value.strip()
+        return bool(text) and not text.startswith(ERROR_PREFIXES)
+    return True
+
+
+def encode_value(value: Any) -> Any:
+    return {SOURCE_RESULT_TAG: value.to_dict()} if isinstance(value, SourceResult) else value
+
+
+def decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and SOURCE_RESULT_TAG in value:
+        return SourceResult.from_dict(value[SOURCE_RESULT_TAG])
+    return value
+
+
+class LookupCache:
+    """Persistent TTL + LRU cache for per-company lookup results.
+
+    Entries are keyed by (normalized company, source, prompt-template hash) so
+    editing a prompt naturally invalidates its answers. Each source has its own
+    TTL, and once more than ``max_entries`` rows exist the least recently used
+    ones are evicted. Values are stored as JSON in SQLite; a SourceResult
+    round-trips as itself.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttls_hours: Optional[Dict[str, float]] = None, max_entries: int = 5000):
+        self.path = path or os.getenv('LOOKUP_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.ttls = {}
+        for source, hours in {**DEFAULT_TTLS_HOURS, **(ttls_hours or {})}.items():
+            hours = float(os.getenv(f'LOOKUP_CACHE_TTL_{source.upper()}', hours))
+            self.ttls[source] = hours * 3600
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS lookups ('
+            ' company_key TEXT NOT NULL,'
+            ' source TEXT NOT NULL,'
+            ' prompt_hash TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL,'
+            ' PRIMARY KEY (company_key, source, prompt_hash))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_lookups_last_access ON lookups(last_access)')
+        self._conn.commit()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def _key(self, company: str, source: str, prompt_template: str):
+        return normalize_company(company), source, prompt_hash(prompt_template)
+
+    def get(self, company: str, source: str, prompt_template: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or older than the source's TTL"""
+        key = self._key(company, source, prompt_template)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created_at FROM lookups WHERE company_key = ? AND source = ? AND prompt_hash = ?', key
+            ).fetchone()
+            if row is None or now - row[1] > self.ttls.get(source, 0):
+                if row is not None:
+                    self._conn.execute('DELETE FROM lookups WHERE company_key = ? AND source = ? AND prompt_hash = ?', key)
+                    self._conn.commit()
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute(
+                'UPDATE lookups SET last_access = ? WHERE company_key = ? AND source = ? AND prompt_hash = ?', (now,) + key
+            )
+            self._conn.commit()
+            self._stats['hits'] += 1
+        logger.info(f"Lookup cache hit: {source} for {company}")
+        return decode_value(json.loads(row[0]))
+
+    def put(self, company: str, source: str, prompt_template: str, value: Any):
+        """Store a value and evict least recently used rows beyond ``max_entries``"""
+        key = self._key(company, source, prompt_template)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO lookups (company_key, source, prompt_hash, value, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)', key + (json.dumps(encode_value(value), ensure_ascii=False), now, now)
+            )
+            overflow = self._conn.execute('SELECT COUNT(*) FROM lookups').fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    'DELETE FROM lookups WHERE rowid IN (SELECT rowid FROM lookups ORDER BY last_access LIMIT ?)', (overflow,)
+                )
+                self._stats['evictions'] += overflow
+            self._conn.commit()
+            self._stats['stores'] += 1
+
+    def invalidate(self, company: str, source: Optional[str] = None):
+        """Drop cached answers for a company (optionally only one source)"""
+        with self._lock:
+            if source:
+                self._conn.execute('DELETE FROM lookups WHERE company_key = ? AND source = ?', (normalize_company(company), source))
+            else:
+                self._conn.execute('DELETE FROM lookups WHERE company_key = ?', (normalize_company(company),))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': self._conn.execute('SELECT COUNT(*) FROM lookups').fetchone()[0], **self._stats}
+
+    def cached(self, source: str, prompt_template: str, fn: Callable, forward_refresh: bool = False) -> Callable:
+        """Wrap a ``fn(company_name, ...)`` lookup (sync or async) with this cache.
+
+        The wrapper accepts an extra ``force_refresh`` keyword that skips the
+        read but still stores the fresh answer. With ``forward_refresh`` it is
+        also passed on to ``fn``, for lookups with caches of their own.
+        """
+        def call_kwargs(kwargs, force_refresh):
+            return {**kwargs, 'force_refresh': force_refresh} if forward_refresh else kwargs
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(company_name, *args, force_refresh=False, **kwargs):
+                if not force_refresh:
+                    hit = self.get(company_name, source, prompt_template)
+                    if hit is not None:
+                        return hit
+                value = await fn(company_name, *args, **call_kwargs(kwargs, force_refresh))
+                if is_cacheable(value):
+                    self.put(company_name, source, prompt_template, value)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(company_name, *args, force_refresh=False, **kwargs):
+            if not force_refresh:
+                hit = self.get(company_name, source, prompt_template)
+                if hit is not None:
+                    return hit
+            value = fn(company_name, *args, **call_kwargs(kwargs, force_refresh))
+            if is_cacheable(value):
+                self.put(company_name, source, prompt_template, value)
+            return value
+        return wrapper
+
+
+_cache: Optional[LookupCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_lookup_cache() -> LookupCache:
+    """Process-wide lookup cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LookupCache()
+        return _cache
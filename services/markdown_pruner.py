@@ -0,0 +1,126 @@
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 2000
+
+HR_TITLE_PATTERN = re.compile(
+    r'\b(chro|chief human resources?( officer)?|chief people officer|chief talent officer|'
+    r'head\s*(of|-|–)?\s*(hr|human resources|people)|hr head|hr director|director\s*(of|-|–)?\s*(hr|human resources)|'
+    r'(vp|vice president|svp|evp)\s*(of|-|–|,)?\s*(hr|human resources|people)|human resources)\b',
+    re.IGNORECASE
+)
+LINKEDIN_PROFILE_PATTERN = re.compile(r'linkedin\.com/in/', re.IGNORECASE)
+COMPANY_SUFFIXES = re.compile(
+    r'\b(limited|ltd|pvt|private|inc|incorporated|corporation|corp|co|llp|plc|india|the)\b\.?', re.IGNORECASE
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+
+def company_core(company: str) -> str:
+    """Company name without legal suffixes, lowercased: 'Infosys Limited' -> 'infosys'"""
+    core = COMPANY_SUFFIXES.sub(' ', company or '')
+    return ' '.join(re.sub(r'[^\w&\s]', ' ', core).lower().split())
+
+
+def _split_blocks(markdown: str) -> List[str]:
+    return [block.strip() for block in re.split(r'\n\s*\n', markdown) if block.strip()]
+
+
+def _score(block: str, company: str) -> int:
+    lowered = ' '.join(block.lower().split())
+    score = 0
+    if LINKEDIN_PROFILE_PATTERN.search(block):
+        score += 2
+    if HR_TITLE_PATTERN.search(block):
+        score += 2
+    if company and company in lowered:
+        score += 1
+    return score
+
+
+class _PruningStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {'calls': 0, 'original_tokens': 0, 'pruned_tokens': 0, 'tokens_saved': 0}
+
+    def record(self, stats: Dict[str, Any]):
+        with self._lock:
+            self._totals['calls'] += 1
+            for key in ('original_tokens', 'pruned_tokens', 'tokens_saved'):
+                self._totals[key] += stats[key]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+
+_stats = _PruningStats()
+
+
+def prune_search_markdown(markdown: str,
+                          company: str,
+                          token_budget: Optional[int] = None,
+                          anchor: str = 'Advanced Search') -> Tuple[str, Dict[str, Any]]:
+    """Keep only the search-result blocks relevant to a CHRO lookup.
+
+    The crawl is cut at ``anchor`` (Google's results start after the
+    "Advanced Search" link), split into blank-line separated blocks, and only
+    blocks mentioning the company, an HR title or a ``linkedin.com/in/`` URL
+    are kept. If they exceed ``token_budget`` (``PROMPT_TOKEN_BUDGET``,
+    default 2000), the strongest matches win; original order is preserved.
+
+    Returns ``(pruned_markdown, stats)``; the stats are also added to the
+    process-wide totals from :func:`get_pruning_stats`.
+    """
+    budget = token_budget or int(os.getenv('PROMPT_TOKEN_BUDGET', DEFAULT_TOKEN_BUDGET))
+    content = markdown or ''
+    start_idx = content.find(anchor)
+    if start_idx != -1:
+        content = content[start_idx:]
+
+    blocks = _split_blocks(content)
+    core = company_core(company)
+    scored = [(index, _score(block, core)) for index, block in enumerate(blocks)]
+    relevant = sorted((item for item in scored if item[1] > 0), key=lambda item: (-item[1], item[0]))
+
+    kept, used = [], 0
+    for index, _ in relevant:
+        cost = estimate_tokens(blocks[index]) + 1
+        if used + cost > budget:
+            continue
+        kept.append(index)
+        used += cost
+
+    if kept:
+        pruned = '\n\n'.join(blocks[index] for index in sorted(kept))
+    else:
+        # Nothing recognisably relevant: fall back to the head of the results, within budget
+        pruned = content[:budget * 4]
+
+    stats = {
+        'original_tokens': estimate_tokens(markdown or ''),
+        'pruned_tokens': estimate_tokens(pruned),
+        'blocks_total': len(blocks),
+        'blocks_kept': len(kept),
+    }
+    stats['tokens_saved'] = max(0, stats['original_tokens'] - stats['pruned_tokens'])
+    _stats.record(stats)
+    logger.info(
+        f"Pruned search markdown for {company}: {stats['original_tokens']} -> {stats['pruned_tokens']} tokens "
+        f"({stats['blocks_kept']}/{stats['blocks_total']} blocks kept)"
+    )
+    return pruned, stats
+
+
+def get_pruning_stats() -> Dict[str, int]:
+    """Totals across every pruning call in this process"""
+    return _stats.snapshot()
@@ -0,0 +1,154 @@
+import re
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Raw answers starting with one of these are failures, not results
+ERROR_PREFIXES = ('Error', 'Failed', '❌', 'No LinkedIn results', 'LinkedIn Scraper module not available')
+
+SUMMARY_FORMAT = "Name: {name}\nLinkedIn: {linkedin}"
+
+
+def _slotted(cls):
+    """Rebuild a dataclass with ``__slots__`` (what ``dataclass(slots=True)`` does on Python 3.10+)"""
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items() if key not in names + ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
+@dataclass
+class SourceResult:
+    """One source's answer for one company, parsed once where it is produced.
+
+    ``text`` is the raw answer shown in the UI and sent to the summary
+    prompt; ``name``/``url``/``title``/``location`` are the structured
+    fields. ``latency`` is in seconds and ``error`` is set when the source
+    failed or has not answered yet.
+    """
+    source: str
+    text: str = ''
+    name: Optional[str] = None
+    url: Optional[str] = None
+    title: Optional[str] = None
+    location: Optional[str] = None
+    latency: Optional[float] = None
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.text.strip())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SourceResult":
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+    @classmethod
+    def from_text(cls, source: str, text: Any, latency: Optional[float] = None) -> "SourceResult":
+        """Parse a source's raw text answer into a result"""
+        # Imported here: consensus imports this module
+        from services.consensus import extract_candidate
+
+        text = text if isinstance(text, str) else str(text or '')
+        if not text.strip() or text.strip().startswith(ERROR_PREFIXES):
+            return cls(source=source, text=text, latency=latency, error=text.strip() or 'Empty response')
+
+        name, url = extract_candidate(text)
+        title = re.search(r'^Title:\s*(.*)$', text, re.MULTILINE)
+        location = re.search(r'^Location:\s*(.*)$', text, re.MULTILINE)
+        return cls(
+            source=source,
+            text=text,
+            name=name,
+            url=url,
+            title=title.group(1).strip() or None if title else None,
+            location=location.group(1).strip() or None if location else None,
+            latency=latency
+        )
+
+    @classmethod
+    def coerce(cls, source: str, value: Any, latency: Optional[float] = None) -> "SourceResult":
+        """Accept a SourceResult, a serialized one or raw text"""
+        if isinstance(value, cls):
+            if latency is not None:
+                value.latency = latency
+            return value
+        if isinstance(value, dict) and 'source' in value and 'text' in value:
+            result = cls.from_dict(value)
+            result.latency = latency if latency is not None else result.latency
+            return result
+        return cls.from_text(source, value, latency)
+
+    @classmethod
+    def pending(cls, source: str, message: str = "Not available (search still running)") -> "SourceResult":
+        return cls(source=source, text=message, error='pending')
+
+
+@_slotted
+@dataclass
+class Summary:
+    """Final answer for a company: who the CHRO is and how it was decided"""
+    company: str
+    text: str
+    name: Optional[str] = None
+    linkedin: Optional[str] = None
+    resolved_by: str = 'llm'
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        return self.text
+
+    @classmethod
+    def from_fields(cls, company: str, name: str, linkedin: Optional[str], resolved_by: str) -> "Summary":
+        text = SUMMARY_FORMAT.format(name=name, linkedin=linkedin or 'Not available')
+        return cls(company=company, text=text, name=name, linkedin=linkedin, resolved_by=resolved_by)
+
+    @classmethod
+    def from_text(cls, company: str, text: str, resolved_by: str = 'llm') -> "Summary":
+        """Parse a free-text 'Name: ...\\nLinkedIn: ...' LLM summary"""
+        from automation import parse_final_summary
+
+        name, linkedin = parse_final_summary(text)
+        return cls(
+            company=company,
+            text=text,
+            name=None if name == "Not available" else name,
+            linkedin=None if linkedin == "Not available" else linkedin,
+            resolved_by=resolved_by
+        )
+
+
+def results_record(company_name: str, perplexity: Any, openai: Any, google: Any, jecrc: Any) -> Dict[str, Any]:
+    """Results-log entry for one search run, in the chro_results.json schema plus per-source latency"""
+    sources = ('perplexity', 'openai', 'google', 'jecrc')
+    perplexity, openai, google, jecrc = results = [
+        SourceResult.coerce(source, value) for source, value in zip(sources, (perplexity, openai, google, jecrc))
+    ]
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'timestamp': timestamp,
+        'company': company_name,
+        'perplexity_result': {'Response': perplexity.text, 'Timestamp': timestamp},
+        'openai_result': {'Response': openai.text, 'Timestamp': timestamp},
+        'google_result': {
+            'chro_name': google.name or google.text,
+            'linkedin_url': google.url or "Not found"
+        },
+        'linkedin_head_result': {
+            'head_info': {
+                'name': jecrc.name or "Information Not Available",
+                'title': jecrc.title or "",
+                'url': jecrc.url or "",
+                'location': jecrc.location or ""
+            }
+        },
+        'latency': {result.source: result.latency for result in results}
+    }
@@ -0,0 +1,174 @@
+import logging
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from services.chat_input import click_if_enabled, insert_prompt
+from services.response_detector import ResponseDetector
+
+logger = logging.getLogger(__name__)
+
+HOME_URL = "https://www.perplexity.ai/"
+INPUT_SELECTOR = "textarea"
+SUBMIT_SELECTOR = "button[aria-label='Submit']"
+
+# One element per answer in the thread; answers are read from <p> tags inside them
+ANSWER_BLOCK_SELECTORS = [
+    "//div[contains(@class, 'prose')]",
+    "//div[contains(@class, 'markdown-content')]",
+    "//div[contains(@class, 'response')]",
+    "//div[contains(@class, 'answer-content')]",
+]
+BUSY_SELECTORS = ["//div[contains(@class, 'animate-pulse')]"]
+
+COUNT_ANSWERS_JS = """
+return arguments[0].map(function (sel) {
+    return document.evaluate('count(' + sel + ')', document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+});
+"""
+
+# Clicks the sidebar "New Thread" control; the app switches threads client-side, without a page load
+NEW_THREAD_JS = """
+var candidates = document.querySelectorAll('[data-testid="sidebar-new-thread"], button, a');
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    var label = ((el.getAttribute('aria-label') || '') + ' ' + (el.innerText || '')).toLowerCase();
+    if (el.matches('[data-testid="sidebar-new-thread"]') || label.indexOf('new thread') !== -1) {
+        el.click();
+        return true;
+    }
+}
+return false;
+"""
+
+
+def count_answers(driver) -> List[int]:
+    """Number of answer blocks currently on the page, per selector in ANSWER_BLOCK_SELECTORS"""
+    try:
+        return [int(count) for count in driver.execute_script(COUNT_ANSWERS_JS, ANSWER_BLOCK_SELECTORS)]
+    except Exception as e:
+        logger.warning(f"Could not count Perplexity answers: {str(e)}")
+        return [0] * len(ANSWER_BLOCK_SELECTORS)
+
+
+def newest_answer_detector(answers_before: Optional[List[int]] = None) -> ResponseDetector:
+    """Detector that only reads answer blocks added after ``answers_before`` was counted.
+
+    Earlier answers in the same thread are never matched, and the scan
+    covers only the new blocks however long the thread gets.
+    """
+    answers_before = answers_before or [0] * len(ANSWER_BLOCK_SELECTORS)
+    return ResponseDetector(
+        selectors=[f"({block})[position() > {before}]//p" for block, before in zip(ANSWER_BLOCK_SELECTORS, answers_before)],
+        busy_selectors=BUSY_SELECTORS,
+    )
+
+
+def _wait_for(condition, timeout: float, poll: float = 0.2) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        time.sleep(poll)
+    return False
+
+
+def input_ready(driver) -> bool:
+    return bool(driver.execute_script("return !!document.querySelector(arguments[0])", INPUT_SELECTOR))
+
+
+def start_new_thread(driver, timeout: float = 10) -> bool:
+    """Open an empty thread in the current page; False if the page has to be reloaded instead"""
+    try:
+        if not driver.execute_script(NEW_THREAD_JS):
+            return False
+    except Exception as e:
+        logger.warning(f"New thread shortcut failed: {str(e)}")
+        return False
+    return _wait_for(lambda: not any(count_answers(driver)) and input_ready(driver), timeout)
+
+
+def submit_prompt(driver, prompt: str, timeout: float = 10) -> bool:
+    """Insert the prompt in one script call and submit it as soon as the button enables"""
+    if not _wait_for(lambda: insert_prompt(driver, INPUT_SELECTOR, prompt), timeout):
+        return False
+    return _wait_for(lambda: click_if_enabled(driver, SUBMIT_SELECTOR), timeout, poll=0.1)
+
+
+class PerplexitySession:
+    """One logged-in Perplexity page reused for a whole batch of questions.
+
+    The home page is loaded once. Up to ``followups_per_thread`` further
+    questions (``PERPLEXITY_FOLLOWUPS``, default 0) are asked as follow-ups
+    in the same thread. After that the session moves to a fresh thread
+    through the "New Thread" control. It reloads the home page only when
+    that control is unavailable or a question fails. Each answer is read
+    from the blocks added after its question was sent.
+    """
+
+    def __init__(self, driver, home_url: str = HOME_URL, followups_per_thread: Optional[int] = None):
+        self.driver = driver
+        self.home_url = home_url
+        self.followups_per_thread = followups_per_thread if followups_per_thread is not None else \
+            int(os.getenv('PERPLEXITY_FOLLOWUPS', '0'))
+        self.asked_in_thread = 0
+        self.stats = {'questions': 0, 'new_threads': 0, 'reloads': 0}
+
+    def open(self, timeout: float = 30) -> bool:
+        """Load the home page and wait for the input instead of a fixed sleep"""
+        self.driver.get(self.home_url)
+        self.asked_in_thread = 0
+        self.stats['reloads'] += 1
+        return _wait_for(lambda: input_ready(self.driver), timeout)
+
+    def _ensure_thread(self):
+        if self.asked_in_thread <= self.followups_per_thread:
+            return
+        if start_new_thread(self.driver):
+            self.asked_in_thread = 0
+            self.stats['new_threads'] += 1
+        else:
+            logger.info("New thread shortcut unavailable, reloading Perplexity")
+            self.open()
+
+    def ask(self, prompt: str, timeout: float = 60) -> Optional[str]:
+        """Submit ``prompt`` and return the text of the newest answer (None if it could not be sent)"""
+        self._ensure_thread()
+        answers_before = count_answers(self.driver)
+        if not submit_prompt(self.driver, prompt):
+            # Move to a fresh thread before the next question
+            self.asked_in_thread = self.followups_per_thread + 1
+            return None
+        self.asked_in_thread += 1
+        self.stats['questions'] += 1
+
+        detector = newest_answer_detector(answers_before)
+        detection = detector.wait(self.driver, timeout)
+        if detection and detection.get('selector'):
+            return "\n".join(detection['texts'][detection['selector']]).strip()
+        return self._fallback_answer()
+
+    def _fallback_answer(self) -> str:
+        """Text of the whole <main> area when no answer block matched; screenshot the page if that is empty too"""
+        try:
+            text = self.driver.execute_script("var m = document.querySelector('main'); return m ? m.innerText : '';") or ''
+        except Exception:
+            text = ''
+        if text.strip():
+            logger.warning("No answer block found, using the <main> text instead")
+            return text.strip()
+        try:
+            screenshot_path = f"perplexity_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            self.driver.save_screenshot(screenshot_path)
+            logger.warning(f"No response found. Screenshot saved to {screenshot_path}")
+        except Exception:
+            pass
+        return ""
+
+    def reset(self):
+        """Recover from a failed question with a full reload"""
+        self.open()
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    :meth:`acquire` waits until a token is available. A non-positive rate
+    disables limiting. The bucket may be built outside any event loop; each
+    running loop gets its own lock on first use.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self._locks_guard = threading.Lock()
+
+    def _lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._locks_guard:
+            lock = self._locks.get(loop)
+            if lock is None:
+                lock = asyncio.Lock()
+                self._locks[loop] = lock
+            return lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+        async with self._lock():
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for quota / throttling failures (HTTP 429, RESOURCE_EXHAUSTED, 'rate limit')"""
+    message = str(error).lower()
+    return '429' in message or 'exhausted' in message or 'rate limit' in message
+
+
+class AIMDRateController(TokenBucket):
+    """Token bucket whose rate adapts to the backend (additive increase, multiplicative decrease).
+
+    Every success adds ``increase / rate`` requests per second, so the rate
+    grows by about ``increase`` per second's worth of successful calls, up to
+    ``max_rate``. A throttle (429 / quota exhausted) multiplies the rate by
+    ``decrease`` (not below ``min_rate``) and empties the bucket so every
+    waiting caller pauses. Throttles reported within ``cooldown`` seconds of
+    the last decrease come from calls already in flight and are ignored.
+    """
+
+    def __init__(self,
+                 name: str,
+                 rate: float,
+                 min_rate: float = 0.05,
+                 max_rate: Optional[float] = None,
+                 increase: float = 0.1,
+                 decrease: float = 0.5,
+                 cooldown: float = 5.0):
+        super().__init__(rate, capacity=1.0)
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._last_decrease = float('-inf')
+        self._stats = {'successes': 0, 'throttles': 0, 'decreases': 0}
+
+    def on_success(self):
+        self._stats['successes'] += 1
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.increase / max(self.rate, 1.0))
+
+    def on_throttle(self):
+        self._stats['throttles'] += 1
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._refill()
+        self._last_decrease = now
+        self._stats['decreases'] += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0.0
+        logger.warning(f"{self.name} throttled, rate lowered to {self.rate:.2f}/s")
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], retries: int = 0) -> Any:
+        """Run ``fn()`` once a token is free and feed the outcome back into the rate.
+
+        A rate-limit error lowers the rate and is retried up to ``retries``
+        times; each retry waits for a token at the new rate instead of a fixed sleep.
+        """
+        for attempt in range(retries + 1):
+            await self.acquire()
+            try:
+                result = await fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                self.on_throttle()
+                if attempt == retries:
+                    raise
+                logger.info(f"{self.name} rate limited, retry {attempt + 1}/{retries}")
+                continue
+            self.on_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {'name': self.name, 'rate': round(self.rate, 3), **self._stats}
@@ -0,0 +1,205 @@
+import fnmatch
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# URL globs (CDP Network.setBlockedURLs syntax) for each blockable resource type
+TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico', '*.bmp'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.wav', '*.m3u8', '*.m4s'],
+}
+
+TRACKER_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*connect.facebook.net*',
+    '*hotjar.com*',
+    '*segment.io*',
+    '*cdn.segment.com*',
+    '*amplitude.com*',
+    '*mixpanel.com*',
+    '*intercom.io*',
+    '*intercomcdn.com*',
+    '*clarity.ms*',
+    '*browser-intake-datadoghq.com*',
+]
+
+# Rough median transfer sizes (bytes) used to estimate what a blocked request would have cost
+ESTIMATED_BYTES = {'image': 25_000, 'font': 35_000, 'media': 400_000, 'tracker': 30_000}
+
+DEFAULT_BLOCKED = ('image', 'font', 'media', 'tracker')
+
+# Per-site allowlists: resource types or URL globs that must still load for the answer to render
+SITE_ALLOWLISTS = {
+    'openai': ['*.svg'],
+    'perplexity': ['*.svg'],
+    'linkedin': [],
+    # The browser agent reasons over screenshots, so images stay on
+    'browser_agent': ['image'],
+}
+
+
+def _classify(url: str, resource_type: Optional[str] = None) -> Optional[str]:
+    """Map a request to one of the blockable categories, or None"""
+    lowered = url.lower()
+    if any(fnmatch.fnmatch(lowered, pattern) for pattern in TRACKER_PATTERNS):
+        return 'tracker'
+    if resource_type in TYPE_PATTERNS:
+        return resource_type
+    path = lowered.split('?', 1)[0].split('#', 1)[0]
+    for category, patterns in TYPE_PATTERNS.items():
+        if any(fnmatch.fnmatch(path, pattern) for pattern in patterns):
+            return category
+    return None
+
+
+class ResourceBlocker:
+    """Resource-blocking profile for one scraping site.
+
+    Blocks images, fonts, media and analytics/ad trackers except what the
+    site's allowlist keeps. Selenium drivers are covered through CDP
+    ``Network.setBlockedURLs`` (see :meth:`apply`); Playwright contexts
+    through a route handler (see :meth:`install_route`). Blocked requests are
+    counted per category and turned into an estimate of bytes saved.
+
+    Counting Selenium blocks needs Chrome's performance log, which buffers
+    every network event for the whole session, so it only happens with
+    ``collect_stats`` (default: ``RESOURCE_BLOCKING_STATS``, off). Playwright
+    blocks are always counted; the route handler sees them anyway.
+    """
+
+    def __init__(self,
+                 site: str,
+                 blocked: Iterable[str] = DEFAULT_BLOCKED,
+                 allow: Optional[Iterable[str]] = None,
+                 collect_stats: Optional[bool] = None):
+        self.site = site
+        self.collect_stats = stats_enabled() if collect_stats is None else collect_stats
+        self.allow = set(SITE_ALLOWLISTS.get(site, []) if allow is None else allow)
+        self.blocked = {category for category in blocked if category not in self.allow}
+        self._lock = threading.Lock()
+        self._stats = {'pages': 0, 'requests_blocked': 0, 'estimated_bytes_saved': 0}
+        self._by_type: Dict[str, int] = {}
+
+    @property
+    def url_patterns(self) -> List[str]:
+        """CDP block list; setBlockedURLs matches the full URL, so extensions also get a ``?*`` variant"""
+        patterns = []
+        for category in sorted(self.blocked):
+            if category == 'tracker':
+                patterns.extend(TRACKER_PATTERNS)
+                continue
+            for pattern in TYPE_PATTERNS.get(category, []):
+                # e.g. logo.png?v=3
+                patterns.extend([pattern, pattern + '?*'])
+        return [pattern for pattern in patterns if pattern.split('?', 1)[0] not in self.allow]
+
+    def should_block(self, url: str, resource_type: Optional[str] = None) -> Optional[str]:
+        """Return the blocked category for a request, or None if it may load"""
+        lowered = url.lower()
+        if any(fnmatch.fnmatch(lowered.split('?', 1)[0], pattern) for pattern in self.allow if '*' in pattern):
+            return None
+        category = _classify(url, resource_type)
+        return category if category in self.blocked else None
+
+    def record(self, category: str, count: int = 1):
+        with self._lock:
+            self._stats['requests_blocked'] += count
+            self._stats['estimated_bytes_saved'] += ESTIMATED_BYTES.get(category, 0) * count
+            self._by_type[category] = self._by_type.get(category, 0) + count
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {'site': self.site, **self._stats, 'by_type': dict(self._by_type)}
+
+    # --- Selenium ---------------------------------------------------------
+
+    def configure_options(self, options):
+        """Enable the performance log so blocked requests can be counted (only with ``collect_stats``)"""
+        if self.collect_stats:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return options
+
+    def apply(self, driver):
+        """Install the block list on a live Selenium/undetected-chromedriver session"""
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.url_patterns})
+            logger.info(f"Resource blocking enabled for {self.site}: {len(self.url_patterns)} patterns")
+        except Exception as e:
+            logger.warning(f"Could not enable resource blocking for {self.site}: {str(e)}")
+        return driver
+
+    def collect(self, driver):
+        """Drain the driver's performance log and count requests the block list stopped"""
+        if not self.collect_stats:
+            return
+        try:
+            entries = driver.get_log('performance')
+        except Exception:
+            return
+        urls = {}
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.requestWillBeSent':
+                urls[params.get('requestId')] = (params.get('request', {}).get('url', ''), params.get('type', '').lower())
+            elif message.get('method') == 'Page.frameNavigated' and not params.get('frame', {}).get('parentId'):
+                with self._lock:
+                    self._stats['pages'] += 1
+            elif message.get('method') == 'Network.loadingFailed' and params.get('blockedReason') == 'inspector':
+                url, resource_type = urls.get(params.get('requestId'), ('', params.get('type', '').lower()))
+                self.record(_classify(url, resource_type) or 'other')
+
+    # --- Playwright ---------------------------------------------------------
+
+    async def install_route(self, context):
+        """Abort blocked requests on every page of a Playwright browser context"""
+        async def handle(route):
+            request = route.request
+            category = self.should_block(request.url, request.resource_type)
+            if category:
+                self.record(category)
+                await route.abort('blockedbyclient')
+            else:
+                await route.continue_()
+
+        await context.route('**/*', handle)
+        logger.info(f"Resource blocking route installed for {self.site}")
+
+
+def blocking_enabled() -> bool:
+    return os.getenv('RESOURCE_BLOCKING', 'true').lower() not in ('0', 'false', 'no')
+
+
+def stats_enabled() -> bool:
+    return os.getenv('RESOURCE_BLOCKING_STATS', 'false').lower() in ('1', 'true', 'yes')
+
+
+_blockers: Dict[str, ResourceBlocker] = {}
+_blockers_lock = threading.Lock()
+
+
+def get_resource_blocker(site: str) -> Optional[ResourceBlocker]:
+    """Shared blocker for a site, or None when RESOURCE_BLOCKING is turned off"""
+    if not blocking_enabled():
+        return None
+    with _blockers_lock:
+        if site not in _blockers:
+            _blockers[site] = ResourceBlocker(site)
+        return _blockers[site]
+
+
+def get_resource_blocking_stats() -> List[Dict[str, object]]:
+    with _blockers_lock:
+        return [blocker.stats() for blocker in _blockers.values()]
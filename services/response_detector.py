@@ -0,0 +1,186 @@
+import logging
+import time
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Selector matching shared by the in-page scripts below (expects ``selectors`` in scope)
+_DOM_HELPERS_JS = """
+function nodes(sel) {
+    try {
+        if (sel.charAt(0) === '/' || sel.charAt(0) === '(') {
+            var found = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var out = [];
+            for (var i = 0; i < found.snapshotLength; i++) { out.push(found.snapshotItem(i)); }
+            return out;
+        }
+        return Array.prototype.slice.call(document.querySelectorAll(sel));
+    } catch (e) {
+        return [];
+    }
+}
+
+function present(list) {
+    for (var i = 0; i < list.length; i++) { if (nodes(list[i]).length) { return true; } }
+    return false;
+}
+
+function snapshot() {
+    var texts = {}, winner = null;
+    for (var i = 0; i < selectors.length; i++) {
+        texts[selectors[i]] = nodes(selectors[i]).map(function (n) {
+            return (n.innerText || n.textContent || '').trim();
+        }).filter(Boolean);
+        if (winner === null && texts[selectors[i]].length) { winner = selectors[i]; }
+    }
+    return {selector: winner, texts: texts};
+}
+"""
+
+# Runs inside the page via execute_async_script. Every candidate selector is
+# evaluated on each tick (a selector "wins" as soon as it yields text), a
+# MutationObserver re-checks whenever the DOM changes, and the promise resolves
+# once the texts have not changed for ``quietMs`` and no busy marker is present.
+COMPLETION_OBSERVER_JS = """
+var selectors = arguments[0], busySelectors = arguments[1], doneSelectors = arguments[2];
+var quietMs = arguments[3], timeoutMs = arguments[4];
+var callback = arguments[arguments.length - 1];
+var started = Date.now();
+""" + _DOM_HELPERS_JS + """
+var last = null, lastKey = null, lastChange = Date.now(), finished = false, pending = null;
+var observer, ticker, deadline;
+
+function finish(reason) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(ticker);
+    clearTimeout(deadline);
+    var result = last || snapshot();
+    result.reason = reason;
+    result.elapsed = (Date.now() - started) / 1000;
+    callback(result);
+}
+
+function check() {
+    pending = null;
+    if (finished) { return; }
+    var snap = snapshot();
+    var key = JSON.stringify(snap.texts);
+    if (key !== lastKey) {
+        lastKey = key;
+        last = snap;
+        lastChange = Date.now();
+    }
+    if (last.selector === null || present(busySelectors)) { return; }
+    if (doneSelectors.length && present(doneSelectors)) { finish('done'); return; }
+    if (Date.now() - lastChange >= quietMs) { finish('quiet'); }
+}
+
+function schedule() {
+    if (pending === null) { pending = setTimeout(check, 50); }
+}
+
+observer = new MutationObserver(schedule);
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+// The quiet window elapses without mutations, so keep ticking as well
+ticker = setInterval(check, Math.max(100, Math.floor(quietMs / 3)));
+deadline = setTimeout(function () { finish('timeout'); }, timeoutMs);
+check();
+"""
+
+# One-shot, synchronous variant for callers that multiplex several tabs on one
+# driver and cannot park it inside execute_async_script. ``stale`` is true
+# while the page that started a navigation is still showing.
+COMPLETION_PROBE_JS = """
+var selectors = arguments[0], busySelectors = arguments[1], doneSelectors = arguments[2];
+""" + _DOM_HELPERS_JS + """
+var snap = snapshot();
+snap.busy = present(busySelectors);
+snap.done = present(doneSelectors);
+snap.stale = !!window.__pendingNavigation;
+snap.loaded = document.readyState === 'complete';
+return snap;
+"""
+
+
+class ResponseDetector:
+    """Detect when a chat UI has finished writing its answer.
+
+    A MutationObserver is injected into the page and all candidate
+    ``selectors`` are raced on every DOM change. The wait ends as soon as the
+    matched text has been stable for ``quiet_ms`` with none of the
+    ``busy_selectors`` (spinners, stop buttons) on the page, or immediately
+    when one of the ``done_selectors`` (e.g. a copy button) appears.
+    """
+
+    def __init__(self,
+                 selectors: Sequence[str],
+                 busy_selectors: Sequence[str] = (),
+                 done_selectors: Sequence[str] = (),
+                 quiet_ms: int = 1500):
+        self.selectors = list(selectors)
+        self.busy_selectors = list(busy_selectors)
+        self.done_selectors = list(done_selectors)
+        self.quiet_ms = quiet_ms
+
+    def wait(self, driver, timeout: float = 60) -> Optional[Dict[str, Any]]:
+        """Block until the answer settles.
+
+        Returns ``{'selector', 'texts', 'reason', 'elapsed'}`` where ``texts``
+        maps every candidate selector to the texts it matched, ``selector`` is
+        the first candidate that matched anything and ``reason`` is one of
+        ``'done'``, ``'quiet'`` or ``'timeout'``. Returns None if the script
+        could not run.
+        """
+        try:
+            previous_timeout = driver.timeouts.script
+        except Exception:
+            previous_timeout = None
+
+        start = time.monotonic()
+        try:
+            # Leave headroom so the in-page deadline fires before Selenium's
+            driver.set_script_timeout(timeout + 5)
+            result = driver.execute_async_script(
+                COMPLETION_OBSERVER_JS,
+                self.selectors,
+                self.busy_selectors,
+                self.done_selectors,
+                self.quiet_ms,
+                int(timeout * 1000)
+            )
+        except Exception as e:
+            logger.error(f"Response detection failed: {str(e)}")
+            return None
+        finally:
+            if previous_timeout is not None:
+                try:
+                    driver.set_script_timeout(previous_timeout)
+                except Exception:
+                    pass
+
+        logger.info(
+            f"Response settled ({result.get('reason')}) via {result.get('selector')} "
+            f"in {time.monotonic() - start:.1f}s"
+        )
+        return result
+
+    def probe(self, driver) -> Optional[Dict[str, Any]]:
+        """Snapshot the page once without waiting.
+
+        Returns ``{'selector', 'texts', 'busy', 'done', 'stale', 'loaded'}``;
+        the caller decides when the answer has settled (see :meth:`settled`).
+        Returns None if the script could not run.
+        """
+        try:
+            return driver.execute_script(COMPLETION_PROBE_JS, self.selectors, self.busy_selectors, self.done_selectors)
+        except Exception as e:
+            logger.error(f"Response probe failed: {str(e)}")
+            return None
+
+    def settled(self, snapshot: Dict[str, Any], quiet_for: float) -> bool:
+        """Whether a probe snapshot counts as a finished answer, given how long its texts have been unchanged"""
+        if snapshot.get('selector') is None or snapshot.get('busy'):
+            return False
+        return bool(snapshot.get('done')) or quiet_for * 1000 >= self.quiet_ms
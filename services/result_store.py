@@ -0,0 +1,387 @@
+import argparse
+import atexit
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, so only one process may write a log
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_PATH = 'chro_results.jsonl'
+LEGACY_RESULTS_PATH = 'chro_results.json'
+
+_OFFSET = struct.Struct('<Q')
+
+
+class ResultStore:
+    """Append-only JSONL log of search results with a binary offset index.
+
+    Each record is one JSON line in ``path``; ``path + '.idx'`` holds the byte
+    offset of every record as a little-endian uint64, so appends and random
+    reads are O(1). Writes are flushed immediately and fsync'd in batches of
+    ``fsync_every`` records or every ``fsync_interval`` seconds. The interval
+    is only checked when a record is appended, so it bounds the gap between
+    busy appends; the last records before a quiet period stay un-fsync'd until
+    the next append, :meth:`flush` or :meth:`close`. On open, a torn trailing
+    line left by a crash is truncated and the index repaired.
+
+    Several processes may append to the same log (ultimate.py, google.py and
+    gemini_integration.py all share ``chro_results.jsonl``): every write holds
+    an exclusive ``flock`` on ``path + '.lock'`` and takes its offset from the
+    file size under that lock, and a log compacted or cleared by another
+    process is reopened before the next append. Without ``fcntl`` (Windows)
+    the store supports a single writing process only.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS_PATH, fsync_every: int = 16, fsync_interval: float = 1.0):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.lock_path = path + '.lock'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._offsets: List[int] = []
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._log = None
+        self._index = None
+        self._lock_file = None
+        self._lock_depth = 0
+        self._open()
+        atexit.register(self.close)
+
+    # --- open / recovery -------------------------------------------------
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(self.lock_path, 'ab')
+        with self._locked():
+            open(self.path, 'ab').close()
+            self._recover()
+            self._log = open(self.path, 'ab')
+            self._index = open(self.index_path, 'ab')
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive cross-process lock around a write to the log or index (re-entrant)"""
+        with self._lock:
+            if fcntl is None or self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Pick up records and rewrites made by other processes (call while locked)"""
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._log.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self._log.close()
+            self._index.close()
+            open(self.path, 'ab').close()
+            self._recover()
+            self._log = open(self.path, 'ab')
+            self._index = open(self.index_path, 'ab')
+            return
+        indexed = os.fstat(self._index.fileno()).st_size // _OFFSET.size
+        if indexed != len(self._offsets):
+            self._offsets = self._read_index()[:indexed]
+
+    def _read_index(self) -> List[int]:
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % _OFFSET.size
+        return [offset for (offset,) in _OFFSET.iter_unpack(data[:usable])]
+
+    def _recover(self):
+        """Trust the index up to the last offset inside the log, rescan the rest and drop a torn tail"""
+        log_size = os.path.getsize(self.path)
+        offsets = self._read_index()
+        index_dirty = False
+
+        # Offsets must be increasing and point inside the log
+        valid = []
+        for offset in offsets:
+            if offset >= log_size or (valid and offset <= valid[-1]):
+                index_dirty = True
+                break
+            valid.append(offset)
+
+        # Re-validate the last indexed record and scan everything after it
+        scan_from = valid.pop() if valid else 0
+        good_end = scan_from
+        with open(self.path, 'rb') as f:
+            f.seek(scan_from)
+            position = scan_from
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                valid.append(position)
+                position += len(line)
+                good_end = position
+
+        if good_end < log_size:
+            logger.warning(f"Truncating torn tail of {self.path}: {log_size - good_end} bytes")
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+                os.fsync(f.fileno())
+
+        if index_dirty or valid != offsets:
+            self._write_index(valid)
+        self._offsets = valid
+
+    def _write_index(self, offsets: List[int]):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(_OFFSET.pack(offset) for offset in offsets))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    # --- writes ----------------------------------------------------------
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Append one record and return its position in the log"""
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._locked():
+            self._catch_up()
+            offset = os.fstat(self._log.fileno()).st_size
+            self._log.write(line)
+            self._log.flush()
+            self._index.write(_OFFSET.pack(offset))
+            self._index.flush()
+            self._offsets.append(offset)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+            return len(self._offsets) - 1
+
+    def sync(self):
+        """fsync the log and index"""
+        with self._lock:
+            if self._log is None or not self._unsynced:
+                return
+            os.fsync(self._log.fileno())
+            os.fsync(self._index.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def flush(self):
+        """Make every appended record durable now (call before going idle)"""
+        self.sync()
+
+    def close(self):
+        """fsync any pending records and close the log"""
+        with self._lock:
+            if self._log is None:
+                return
+            self.sync()
+            self._log.close()
+            self._index.close()
+            self._lock_file.close()
+            self._log = self._index = self._lock_file = None
+
+    def clear(self):
+        """Drop every record"""
+        with self._locked():
+            self._log.truncate(0)
+            self._index.truncate(0)
+            self._log.seek(0)
+            self._index.seek(0)
+            self._offsets = []
+            self._unsynced = 1
+            self.sync()
+
+    # --- reads -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get(self, position: int) -> Dict[str, Any]:
+        """Read a single record by position using the offset index"""
+        with self._lock:
+            offset = self._offsets[position]
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            count = len(self._offsets)
+        with open(self.path, 'rb') as f:
+            for _ in range(count):
+                yield json.loads(f.readline())
+
+    # --- maintenance -----------------------------------------------------
+
+    def compact(self, key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> int:
+        """Rewrite the log atomically, keeping only the latest record per ``key``.
+
+        Without ``key`` the log is simply rewritten (dropping nothing). Returns
+        the number of records kept.
+        """
+        with self._locked():
+            self._catch_up()
+            self.sync()
+            if key is None:
+                records = list(self)
+            else:
+                latest: Dict[Any, Dict[str, Any]] = {}
+                for record in self:
+                    k = key(record)
+                    latest.pop(k, None)
+                    latest[k] = record
+                records = list(latest.values())
+
+            tmp_path = self.path + '.compact'
+            offsets = []
+            with open(tmp_path, 'wb') as f:
+                for record in records:
+                    offsets.append(f.tell())
+                    f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._log.close()
+            self._index.close()
+            os.replace(tmp_path, self.path)
+            self._write_index(offsets)
+            self._log = open(self.path, 'ab')
+            self._index = open(self.index_path, 'ab')
+            self._offsets = offsets
+            logger.info(f"Compacted {self.path} to {len(offsets)} records")
+            return len(offsets)
+
+    def export_json(self, json_path: str, indent: Optional[int] = 2) -> int:
+        """Atomically write every record to ``json_path`` as one JSON array.
+
+        Records are streamed from the log one at a time, so memory stays flat
+        however large the log is. Returns the number of records written.
+        """
+        with self._locked():
+            self._catch_up()
+            self.sync()
+            tmp_path = json_path + '.tmp'
+            count = 0
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('[')
+                for record in self:
+                    # Same layout json.dump(records, indent=indent) would produce
+                    item = json.dumps([record], indent=indent, ensure_ascii=False)[1:-1].strip('\n')
+                    f.write((',' if count else '') + ('\n' if indent is not None else ' ' if count else '') + item)
+                    count += 1
+                f.write(('\n' if count and indent is not None else '') + ']')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, json_path)
+        logger.info(f"Exported {count} records from {self.path} to {json_path}")
+        return count
+
+    def migrate_from_json(self, json_path: str = LEGACY_RESULTS_PATH) -> int:
+        """One-shot import of a legacy JSON-array results file.
+
+        The source file is renamed to ``<json_path>.migrated`` afterwards so the
+        import never runs twice. The whole import holds the cross-process lock,
+        so when several processes start together only the first one imports.
+        Returns the number of records imported.
+        """
+        with self._locked():
+            if not os.path.exists(json_path):
+                return 0
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                return 0
+            except ValueError as e:
+                logger.error(f"Cannot migrate {json_path}: {str(e)}")
+                return 0
+            if not isinstance(data, list):
+                data = [data]
+
+            for record in data:
+                self.append(record)
+            self.sync()
+            try:
+                os.replace(json_path, json_path + '.migrated')
+            except FileNotFoundError:
+                # Another writer without the lock (e.g. Windows) already moved it
+                logger.warning(f"{json_path} disappeared before it could be marked migrated")
+        logger.info(f"Migrated {len(data)} records from {json_path} to {self.path}")
+        return len(data)
+
+
+_stores: Dict[str, ResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_result_store(path: str = DEFAULT_RESULTS_PATH, legacy_path: Optional[str] = LEGACY_RESULTS_PATH) -> ResultStore:
+    """Return the process-wide store for ``path``, migrating ``legacy_path`` on first use"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ResultStore(path)
+            if legacy_path:
+                store.migrate_from_json(legacy_path)
+            _stores[key] = store
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the append-only CHRO results log")
+    parser.add_argument('command', choices=['compact', 'migrate', 'export', 'stats'])
+    parser.add_argument('--path', default=DEFAULT_RESULTS_PATH, help="JSONL results log")
+    parser.add_argument('--legacy', default=LEGACY_RESULTS_PATH, help="legacy JSON array file to migrate")
+    parser.add_argument('--output', default=None, help="JSON array file written by export")
+    parser.add_argument('--dedupe-by', default=None, help="keep only the latest record per value of this field when compacting")
+    args = parser.parse_args()
+
+    store = ResultStore(args.path)
+    if args.command == 'compact':
+        key = (lambda record: record.get(args.dedupe_by)) if args.dedupe_by else None
+        kept = store.compact(key)
+        print(f"Compacted {args.path}: {kept} records")
+    elif args.command == 'export':
+        output = args.output or os.path.splitext(args.path)[0] + '.json'
+        exported = store.export_json(output)
+        print(f"Exported {exported} records to {output}")
+    elif args.command == 'migrate':
+        migrated = store.migrate_from_json(args.legacy)
+        print(f"Migrated {migrated} records from {args.legacy}")
+    else:
+        print(f"{args.path}: {len(store)} records, {os.path.getsize(args.path)} bytes")
+    store.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
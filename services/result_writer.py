@@ -0,0 +1,84 @@
+import csv
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from services.result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+
+class ResultWriter:
+    """Stream result rows to CSV and JSONL, one row per call, and write the JSON array once on close.
+
+    Rows are appended to ``csv_path`` and (optionally) to a ResultStore log
+    at ``jsonl_path``. Both are flushed to disk every ``flush_every`` rows or
+    ``flush_interval`` seconds, whichever comes first. :meth:`close` writes
+    ``json_path`` from the JSONL log, so per-row cost stays constant no
+    matter how many rows came before. An existing ``json_path`` array seeds
+    an empty JSONL log, which keeps results from earlier runs.
+    """
+
+    def __init__(self,
+                 csv_path: str,
+                 fieldnames: Sequence[str],
+                 jsonl_path: Optional[str] = None,
+                 json_path: Optional[str] = None,
+                 flush_every: int = 16,
+                 flush_interval: float = 1.0):
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.rows = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+        write_header = not os.path.isfile(csv_path) or os.path.getsize(csv_path) == 0
+        self._csv_file = open(csv_path, 'a', newline='', encoding='utf-8')
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=list(fieldnames), extrasaction='ignore')
+        if write_header:
+            self._csv.writeheader()
+
+        self.store = None
+        if jsonl_path:
+            self.store = ResultStore(jsonl_path, fsync_every=flush_every, fsync_interval=flush_interval)
+            if not len(self.store) and json_path:
+                self.store.migrate_from_json(json_path)
+
+    def write(self, row: Dict[str, Any]):
+        """Append exactly one row to every output"""
+        self._csv.writerow(row)
+        if self.store is not None:
+            self.store.append(row)
+        self.rows += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._csv_file.flush()
+        os.fsync(self._csv_file.fileno())
+        if self.store is not None:
+            self.store.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush everything and materialize the JSON array (if configured)"""
+        if self._csv_file.closed:
+            return
+        self.flush()
+        self._csv_file.close()
+        if self.store is not None:
+            if self.json_path:
+                self.store.export_json(self.json_path, indent=4)
+            self.store.close()
+        logger.info(f"Wrote {self.rows} rows to {self.csv_path}" + (f" and {self.json_path}" if self.json_path else ""))
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
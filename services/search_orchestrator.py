@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from services.models import SourceResult
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = "summary"
+
+
+class SearchOrchestrator:
+    """Fan a company lookup out to every search source at once.
+
+    Coroutine sources run as asyncio tasks, blocking (Selenium) sources run on a
+    bounded thread pool, and results are yielded in completion order. Once
+    ``quorum`` sources have answered successfully (or every source has
+    finished), the optional ``summarize`` callable is started in the
+    background while the remaining sources keep streaming. The optional
+    ``on_complete`` callable runs once every source and the summary are done,
+    so the run can be persisted with all of its results.
+    """
+
+    def __init__(self,
+                 sources: Dict[str, Callable],
+                 max_workers: int = 2,
+                 quorum: Optional[int] = None,
+                 runtime=None):
+        self.sources = sources
+        self.quorum = min(quorum or len(sources), len(sources))
+        # Optional AsyncRuntime; when set, fan-outs run on its shared loop instead of a throwaway one
+        self.runtime = runtime
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-source")
+
+    def summary_ready(self, results: Dict[str, SourceResult]) -> bool:
+        """Whether the summary may start: ``quorum`` sources succeeded (failures do not count) or all have finished"""
+        answered = sum(1 for result in results.values() if result.ok)
+        return answered >= self.quorum or len(results) == len(self.sources)
+
+    async def _run_source(self, name: str, company_name: str, source_kwargs: Dict[str, Any]) -> Tuple[str, SourceResult]:
+        """Run a single source as a SourceResult timed by this call; exceptions become failed results"""
+        fn = self.sources[name]
+        start = time.monotonic()
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                result = await fn(company_name, **source_kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, functools.partial(fn, company_name, **source_kwargs))
+        except Exception as e:
+            logger.error(f"Error in {name} search: {str(e)}")
+            result = SourceResult(source=name, text=f"Error in {name} search: {str(e)}", error=str(e))
+        latency = time.monotonic() - start
+        logger.info(f"{name} search finished in {latency:.1f}s")
+        return name, SourceResult.coerce(name, result, latency)
+
+    async def _run_summary(self, summarize: Callable, company_name: str, results: Dict[str, Any]) -> Tuple[str, Any]:
+        """Run the (blocking) summary callable off the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            summary = await loop.run_in_executor(None, summarize, company_name, results)
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            summary = f"Error generating summary: {str(e)}"
+        return SUMMARY_KEY, summary
+
+    async def _run_complete(self, on_complete: Callable, company_name: str, results: Dict[str, Any], summary: Any):
+        """Run the (blocking) completion callable off the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, on_complete, company_name, results, summary)
+        except Exception as e:
+            logger.error(f"Error completing search run for {company_name}: {str(e)}")
+
+    async def stream(self,
+                     company_name: str,
+                     summarize: Optional[Callable] = None,
+                     source_kwargs: Optional[Dict[str, Any]] = None,
+                     on_complete: Optional[Callable] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ``(source_name, result)`` pairs as they complete, then ``(SUMMARY_KEY, summary)``.
+
+        ``source_kwargs`` are passed as keyword arguments to every source call.
+        ``on_complete(company_name, results, summary)`` is called after the
+        last pair, with every source's final result.
+        """
+        source_kwargs = source_kwargs or {}
+        pending = {asyncio.create_task(self._run_source(name, company_name, source_kwargs)) for name in self.sources}
+        results: Dict[str, Any] = {}
+        summary_task = None
+        summary = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, result = task.result()
+                if task is summary_task:
+                    summary = result
+                else:
+                    results[name] = result
+                yield name, result
+
+                if summarize and summary_task is None and self.summary_ready(results):
+                    answered = sum(1 for r in results.values() if r.ok)
+                    logger.info(f"{answered} of {len(self.sources)} sources answered for {company_name}, starting summary")
+                    summary_task = asyncio.create_task(self._run_summary(summarize, company_name, dict(results)))
+                    pending.add(summary_task)
+
+        if on_complete:
+            await self._run_complete(on_complete, company_name, results, summary)
+
+    def iter_results(self,
+                     company_name: str,
+                     summarize: Optional[Callable] = None,
+                     source_kwargs: Optional[Dict[str, Any]] = None,
+                     on_complete: Optional[Callable] = None) -> Iterator[Tuple[str, Any]]:
+        """Synchronous view of :meth:`stream` for generator callers such as Gradio handlers"""
+        events: "queue.Queue" = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for item in self.stream(company_name, summarize, source_kwargs, on_complete):
+                    events.put(item)
+            except Exception as e:
+                logger.error(f"Error in search fan-out for {company_name}: {str(e)}")
+            finally:
+                events.put(done)
+
+        if self.runtime is not None:
+            self.runtime.submit(pump())
+        else:
+            threading.Thread(target=asyncio.run, args=(pump(),), daemon=True).start()
+
+        while True:
+            item = events.get()
+            if item is done:
+                break
+            yield item
+
+    def shutdown(self, wait: bool = True):
+        """Release the Selenium worker threads"""
+        self._executor.shutdown(wait=wait)
@@ -14,6 +14,8 @@ from browser_use.browser.context import BrowserContext, BrowserContextConfig
 from playwright.async_api import Browser as PlaywrightBrowser
 from playwright.async_api import BrowserContext as PlaywrightBrowserContext
 
+from services.resource_blocker import get_resource_blocker
+
 from .config import BrowserPersistenceConfig
 from ..exceptions import (
     PromptException,
@@ -58,6 +60,11 @@ class CustomBrowserContext(BrowserContext):
                     record_video_size=self.config.browser_window_size,
                 )
 
+            # Abort fonts, media and trackers before they are fetched (images stay on for the agent's screenshots)
+            resource_blocker = get_resource_blocker("browser_agent")
+            if resource_blocker:
+                await resource_blocker.install_route(context)
+
             if self.config.trace_path:
                 await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
@@ -0,0 +1,34 @@
+import asyncio
+import json
+
+from services.batch_summarizer import SummaryBatcher, parse_batch_response
+
+
+def test_batcher_built_outside_the_loop_serves_later_runs():
+    calls = []
+
+    def summarize_batch(batch):
+        calls.append([company for company, _ in batch])
+        return {company: f"Summary of {company}" for company, _ in batch}
+
+    batcher = SummaryBatcher(summarize_batch, cost=lambda company, results: 1,
+                             token_budget=2, max_items=2, linger_seconds=0.01, rate=1000.0)
+
+    async def run(companies):
+        return await asyncio.gather(*(batcher.summarize(company, {}) for company in companies))
+
+    assert asyncio.run(run(['A', 'B', 'C', 'D'])) == [f"Summary of {c}" for c in 'ABCD']
+    assert asyncio.run(run(['E', 'F', 'G', 'H'])) == [f"Summary of {c}" for c in 'EFGH']
+    assert sorted(sum(calls, [])) == list('ABCDEFGH')
+
+
+def test_parse_batch_response_drops_placeholder_names():
+    text = json.dumps([
+        {"id": 1, "company": "Acme", "name": "Priya Sharma", "linkedin": "https://www.linkedin.com/in/priya"},
+        {"id": 2, "company": "Globex", "name": "null", "linkedin": "null"},
+        {"id": 3, "company": "Initech", "name": "Full Name", "linkedin": "LinkedIn URL or null"},
+    ])
+
+    parsed = parse_batch_response(text, ['Acme', 'Globex', 'Initech'])
+
+    assert parsed == {'Acme': {'name': 'Priya Sharma', 'linkedin': 'https://www.linkedin.com/in/priya'}}
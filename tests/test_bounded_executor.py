@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+from services.bounded_executor import BoundedExecutor, LoopSafeSemaphore
+
+
+def test_semaphore_limit_is_shared_across_event_loops():
+    slots = LoopSafeSemaphore(2)
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    async def hold():
+        async with slots:
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    async def run():
+        await asyncio.gather(*(hold() for _ in range(5)))
+
+    # Three threads, each with its own loop, contend for the same two slots
+    threads = [threading.Thread(target=asyncio.run, args=(run(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    assert active[0] == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    slots = LoopSafeSemaphore(1)
+
+    async def run():
+        await slots.acquire()
+        waiter = asyncio.create_task(slots.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        slots.release()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.wait_for(slots.acquire(), timeout=1)
+
+    asyncio.run(run())
+
+
+def test_executor_runs_jobs_from_several_loops():
+    executor = BoundedExecutor('test', max_workers=1, max_queue=1)
+
+    async def run():
+        return await asyncio.gather(*(executor.run(time.sleep, 0.001) for _ in range(4)))
+
+    threads = [threading.Thread(target=asyncio.run, args=(run(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert executor.stats()['completed'] == 8
+    assert executor.queue_depth == 0
+    executor.shutdown()
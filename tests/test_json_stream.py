@@ -0,0 +1,32 @@
+import json
+
+from services.json_stream import JSONStreamReader
+
+
+def append(path, text):
+    with open(path, 'a') as f:
+        f.write(text)
+
+
+def test_torn_tail_with_nested_object_is_read_once_complete(tmp_path):
+    path = tmp_path / 'final_summaries.json'
+    for name in ('A', 'B'):
+        append(path, json.dumps({'Company': name}, indent=4) + '\n')
+    record = json.dumps({'Company': 'C', 'x': {'a': 1}, 'y': [{'b': 2}]}, indent=4) + '\n'
+    torn = record.index('"y"')
+    append(path, record[:torn])
+
+    reader = JSONStreamReader(str(path))
+    assert [r.get('Company') for r in reader.read()] == ['A', 'B']
+
+    append(path, record[torn:])
+    records = reader.read()
+    assert [r.get('Company') for r in records] == ['A', 'B', 'C']
+    assert records[-1]['x'] == {'a': 1}
+
+
+def test_junk_between_records_is_skipped(tmp_path):
+    path = tmp_path / 'final_summaries.json'
+    append(path, json.dumps({'Company': 'A'}, indent=4) + '\n{"Company": "brok\n')
+    append(path, json.dumps({'Company': 'B'}, indent=4) + '\n')
+    assert [r['Company'] for r in JSONStreamReader(str(path)).read()] == ['A', 'B']
@@ -0,0 +1,25 @@
+import asyncio
+
+from services.llm_cache import LLMResponseCache
+from services.lookup_cache import LookupCache
+
+
+def test_forced_lookup_regenerates_llm_answer(tmp_path):
+    lookups = LookupCache(path=str(tmp_path / 'lookups.db'))
+    llm = LLMResponseCache(path=str(tmp_path / 'llm.db'))
+    calls = []
+
+    async def search(company_name, force_refresh=False):
+        async def generate():
+            calls.append(company_name)
+            return f"Answer {len(calls)}"
+        return await llm.aget_or_call('model', f"prompt for {company_name}", generate, force_refresh=force_refresh)
+
+    cached_search = lookups.cached('google', 'template {company_name}', search, forward_refresh=True)
+
+    assert asyncio.run(cached_search('Acme')) == "Answer 1"
+    assert asyncio.run(cached_search('Acme')) == "Answer 1"
+    assert calls == ['Acme']
+
+    assert asyncio.run(cached_search('Acme', force_refresh=True)) == "Answer 2"
+    assert calls == ['Acme', 'Acme']
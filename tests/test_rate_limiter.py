@@ -0,0 +1,29 @@
+import asyncio
+
+from services.rate_limiter import AIMDRateController, TokenBucket
+
+
+def test_token_bucket_is_usable_from_later_event_loops():
+    bucket = TokenBucket(rate=1000.0, capacity=1.0)
+
+    async def contend():
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+
+    # Built outside any loop, then used under two separate asyncio.run calls
+    asyncio.run(contend())
+    asyncio.run(contend())
+
+
+def test_rate_controller_call_from_concurrent_tasks():
+    controller = AIMDRateController('test', rate=1000.0)
+
+    async def work(i):
+        await asyncio.sleep(0)
+        return i
+
+    async def run():
+        return await asyncio.gather(*(controller.call(lambda i=i: work(i)) for i in range(5)))
+
+    assert asyncio.run(run()) == list(range(5))
+    assert asyncio.run(run()) == list(range(5))
+    assert controller.stats()['successes'] == 10
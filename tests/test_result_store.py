@@ -0,0 +1,36 @@
+import json
+import threading
+
+from services.result_store import ResultStore
+
+
+def test_concurrent_migrations_import_legacy_file_once(tmp_path):
+    legacy = tmp_path / 'chro_results.json'
+    legacy.write_text(json.dumps([{'company': f"Company {i}"} for i in range(50)]), encoding='utf-8')
+    log_path = str(tmp_path / 'chro_results.jsonl')
+    # Two stores on one log stand in for two processes starting together
+    stores = [ResultStore(log_path), ResultStore(log_path)]
+    barrier = threading.Barrier(len(stores))
+    imported, errors = [], []
+
+    def migrate(store):
+        barrier.wait()
+        try:
+            imported.append(store.migrate_from_json(str(legacy)))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=migrate, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(imported) == [0, 50]
+    reader = ResultStore(log_path)
+    companies = [record['company'] for record in reader]
+    assert companies == [f"Company {i}" for i in range(50)]
+    assert not legacy.exists()
+    for store in stores + [reader]:
+        store.close()
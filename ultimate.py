@@ -1,8 +1,9 @@
 import os
 import time
-import asyncio
 import logging
 import json
+import html
+from functools import lru_cache
 import gradio as gr
 from selenium import webdriver
 from dotenv import load_dotenv
@@ -11,11 +12,16 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import google.generativeai as genai
-from crawl4ai import AsyncWebCrawler
 from datetime import datetime
-from automation import extract_company_data, get_formatted_company_data, get_formatted_company_markdown
+from automation import (
+    extract_company_data,
+    get_formatted_company_data,
+    get_formatted_company_markdown,
+    get_company_count,
+    get_company_summary,
+    record_final_summary
+)
 import subprocess
 
 # Configure logging
@@ -38,6 +44,86 @@ except ImportError:
     logger.error("LinkedIn Scraper module not found. JECRC method will not work.")
     LinkedInScraper = None
 
+from services.search_orchestrator import SearchOrchestrator, SUMMARY_KEY
+from services.driver_pool import DriverPool, DriverPoolExhausted
+from services.chrome_resolver import get_chrome_version, get_driver_path
+from services.result_store import get_result_store
+from services.json_stream import get_json_stream_reader
+from services.lookup_cache import get_lookup_cache, is_cacheable
+from services.async_runtime import get_async_runtime
+from services.response_detector import ResponseDetector
+from services.perplexity_session import HOME_URL as PERPLEXITY_HOME_URL, count_answers, newest_answer_detector, start_new_thread, submit_prompt
+from services.resource_blocker import get_resource_blocker, get_resource_blocking_stats
+from services.llm_cache import get_llm_cache
+from services.markdown_pruner import prune_search_markdown, get_pruning_stats, estimate_tokens
+from services.batch_summarizer import pack_batches, parse_batch_response
+from services.consensus import resolve_consensus, get_consensus_stats
+from services.models import SourceResult, Summary, results_record
+
+# Background loop shared by every async search; owns the crawler and LinkedIn scraper
+async_runtime = get_async_runtime()
+
+# === Prompt templates ===
+# Templates are also hashed into lookup-cache keys, so editing one invalidates its cached answers
+CHRO_PROMPT_TEMPLATE = """Provide the full name of the Chief Human Resources Officer (CHRO) of {company_name}, based in India, as of February 23, 2025. Ensure the response pertains exclusively to {company_name} and no other entity or region. Respond with only the full name, nothing else. Also give the LinkedIn URL."""
+
+GOOGLE_EXTRACTION_PROMPT_TEMPLATE = """
+            Based on the following search results about {company_name}'s CHRO, provide only:
+            1. CHRO of India Name
+            2. LinkedIn URL (if available)
+            
+            Return ONLY a valid JSON object in this exact format, nothing else:
+            {{
+                "company": "{company_name}",
+                "chro_name": "name",
+                "linkedin_url": "url or null"
+            }}
+            
+            Search results:
+            {content}
+            """
+
+JECRC_SEARCH_QUERY = "HR Head"
+JECRC_LOCATION = "India"
+# Built from the search actually sent to LinkedIn, so changing either part invalidates cached answers
+JECRC_QUERY_TEMPLATE = f"{JECRC_SEARCH_QUERY} {{company_name}} {JECRC_LOCATION}"
+
+SUMMARY_PROMPT_TEMPLATE = """Act as a professional HR data analyst. I have gathered information about the CHRO (Chief Human Resources Officer) of {company_name} from four different sources. Here is the verified data:
+
+{formatted_data}
+
+Based on these sources, I need you to provide ONLY:
+1. The full name of the current CHRO
+2. Their LinkedIn URL
+
+Format your response as:
+Name: [Full Name]
+LinkedIn: [URL]
+
+If the information from the sources is conflicting, provide the name and URL that appears most reliable based on source consistency.
+"""
+
+BATCH_SUMMARY_PROMPT_TEMPLATE = """Act as a professional HR data analyst. Below is evidence about the CHRO (Chief Human Resources Officer) of {count} companies, each gathered from four different sources.
+
+{companies_block}
+
+For EVERY company above, decide the full name of the current CHRO and their LinkedIn URL. If the sources conflict, pick the name and URL that appear most reliable based on source consistency.
+
+Return ONLY a valid JSON array with exactly one object per company, nothing else:
+[
+    {{"id": 1, "company": "company name", "name": "Full Name", "linkedin": "LinkedIn URL or null"}}
+]
+"""
+
+GOOGLE_MODEL_ID = 'gemini-2.0-flash'
+SUMMARY_MODEL_ID = 'gemini-1.5-flash'
+
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "6000"))
+SUMMARY_BATCH_MAX_COMPANIES = int(os.getenv("SUMMARY_BATCH_MAX_COMPANIES", "25"))
+
+# Identical (model, prompt) requests are answered from disk and concurrent duplicates share one call
+llm_cache = get_llm_cache()
+
 # Function to view LinkedIn profile with debugging
 def view_linkedin_profile(linkedin_url):
     # More robust URL validation and cleanup
@@ -111,49 +197,22 @@ def run_terminal_command_for_linkedin(linkedin_url):
         logger.error(f"Error running terminal command for LinkedIn profile: {str(e)}")
         return f"❌ Error running terminal command: {str(e)}"
 
+# === Resource blocking ===
+openai_blocker = get_resource_blocker('openai')
+perplexity_blocker = get_resource_blocker('perplexity')
+
+def enable_resource_blocking(driver, blocker):
+    """Install a site's block list on a freshly launched driver (no-op when blocking is off)"""
+    if driver is not None and blocker:
+        blocker.apply(driver)
+    return driver
+
 # === OpenAI (ChatGPT) Implementation ===
 def setup_openai_driver():
     """Setup and return the Chrome driver for OpenAI (ChatGPT) with enhanced anti-detection"""
     try:
-        # First try to detect Chrome version
-        try:
-            import subprocess
-            import re
-            
-            # Try multiple commands to detect Chrome version
-            commands = [
-                ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version'],
-                ['google-chrome', '--version'],
-                ['chromium', '--version'],
-                ['chrome', '--version']
-            ]
-            
-            chrome_version = None
-            for cmd in commands:
-                try:
-                    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    stdout, _ = process.communicate()
-                    version_str = stdout.decode('UTF-8').lower()
-                    if 'chrome' in version_str:
-                        # Extract version number using regex
-                        match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', version_str)
-                        if match:
-                            chrome_version = int(match.group(1))  # Major version number
-                            logger.info(f"Detected Chrome version: {chrome_version}")
-                            break
-                except:
-                    continue
-                    
-            if not chrome_version:
-                # Fallback to manual version check
-                import requests
-                response = requests.get('https://chromedriver.storage.googleapis.com/LATEST_RELEASE')
-                chrome_version = int(response.text.split('.')[0])
-                logger.info(f"Using latest ChromeDriver version: {chrome_version}")
-                
-        except Exception as e:
-            logger.warning(f"Could not detect Chrome version: {str(e)}")
-            chrome_version = None
+        # Cached lookup: probes the binary once per Chrome build, no network once warm
+        chrome_version = get_chrome_version()
 
         # Enhanced undetected-chromedriver options
         options = uc.ChromeOptions()
@@ -190,6 +249,10 @@ def setup_openai_driver():
         height = random.randint(800, 1080)
         options.add_argument(f'--window-size={width},{height}')
 
+        # Skip images, fonts, media and trackers; only the answer text is scraped
+        if openai_blocker:
+            openai_blocker.configure_options(options)
+
         # Try multiple approaches to initialize the driver
         driver = None
         exceptions = []
@@ -204,7 +267,7 @@ def setup_openai_driver():
                     suppress_welcome=True
                 )
                 logger.info("Successfully initialized undetected-chromedriver with version")
-                return driver
+                return enable_resource_blocking(driver, openai_blocker)
             except Exception as e:
                 exceptions.append(f"Version-specific undetected-chromedriver failed: {str(e)}")
 
@@ -217,27 +280,28 @@ def setup_openai_driver():
                     suppress_welcome=True
                 )
                 logger.info("Successfully initialized undetected-chromedriver without version")
-                return driver
+                return enable_resource_blocking(driver, openai_blocker)
             except Exception as e:
                 exceptions.append(f"Generic undetected-chromedriver failed: {str(e)}")
 
-        # Approach 3: Try selenium with ChromeDriverManager
+        # Approach 3: Try selenium with the cached chromedriver path
         if not driver:
             try:
                 from selenium import webdriver
                 from selenium.webdriver.chrome.service import Service
-                from webdriver_manager.chrome import ChromeDriverManager
                 
                 chrome_options = webdriver.ChromeOptions()
                 for arg in options.arguments:
                     chrome_options.add_argument(arg)
+                if openai_blocker:
+                    openai_blocker.configure_options(chrome_options)
                 
                 # Add additional selenium-specific options
                 chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
                 chrome_options.add_experimental_option('useAutomationExtension', False)
                 chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
                 
-                service = Service(ChromeDriverManager().install())
+                service = Service(get_driver_path())
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 
                 # Execute CDP commands to make selenium more stealthy
@@ -251,7 +315,7 @@ def setup_openai_driver():
                 })
                 
                 logger.info("Successfully initialized selenium WebDriver")
-                return driver
+                return enable_resource_blocking(driver, openai_blocker)
             except Exception as e:
                 exceptions.append(f"Selenium WebDriver failed: {str(e)}")
 
@@ -262,43 +326,36 @@ def setup_openai_driver():
         logger.error(f"Error in setup_openai_driver: {str(e)}")
         return None
 
+# Completion detectors: all selectors are raced inside the page and the wait ends
+# once the answer has stopped changing, instead of fixed sleeps and serial timeouts
+openai_response_detector = ResponseDetector(
+    selectors=[
+        "//div[contains(@class, 'markdown prose')]//p",
+        "//div[@data-message-author-role='assistant']//div[contains(@class, 'markdown')]//p",
+        "//div[contains(@class, 'prose')]//p/a",
+    ],
+    busy_selectors=["//button[@data-testid='stop-button']"],
+    done_selectors=["//button[@data-testid='copy-turn-action-button']"],
+)
+
 def openai_wait_for_response(driver, timeout=60):
     """Wait for and extract the response from ChatGPT"""
     try:
-        wait = WebDriverWait(driver, timeout)
-        
-        # Wait for the response to complete
-        try:
-            wait.until(
-                EC.presence_of_element_located((By.XPATH, "//button[@data-testid='copy-turn-action-button']"))
-            )
-        except:
-            pass
-        
-        response_selectors = [
-            "//div[contains(@class, 'markdown prose')]//p",
-            "//div[@data-message-author-role='assistant']//div[contains(@class, 'markdown')]//p",
-            "//div[contains(@class, 'prose')]//p/a",
-        ]
+        detection = openai_response_detector.wait(driver, timeout)
+        if not detection:
+            return ""
         
         name = ""
         url = ""
         
-        for selector in response_selectors:
-            try:
-                elements = driver.find_elements(By.XPATH, selector)
-                if elements:
-                    for elem in elements:
-                        text = elem.text.strip()
-                        if text:
-                            if 'linkedin.com' in text.lower():
-                                url = text
-                            else:
-                                name = text
-                    if name and url:
-                        break
-            except:
-                continue
+        for selector in openai_response_detector.selectors:
+            for text in detection['texts'].get(selector, []):
+                if 'linkedin.com' in text.lower():
+                    url = text
+                else:
+                    name = text
+            if name and url:
+                break
         
         response_text = f"{name}\n{url}" if name or url else ""
         
@@ -311,8 +368,6 @@ def openai_wait_for_response(driver, timeout=60):
 def openai_send_prompt(driver, prompt):
     """Send prompt to ChatGPT"""
     try:
-        time.sleep(1)
-        
         wait = WebDriverWait(driver, 20)
         
         textarea = wait.until(
@@ -339,41 +394,34 @@ def search_with_openai(company_name, progress=None):
     if progress:
         progress(0.1, "Initializing OpenAI (ChatGPT) search...")
     
-    driver = setup_openai_driver()
-    if not driver:
-        return "Failed to initialize OpenAI driver"
-    
     try:
-        if progress:
-            progress(0.3, "Navigating to ChatGPT...")
-        
-        driver.get("https://chat.openai.com/")
-        time.sleep(5)
-        
-        if progress:
-            progress(0.5, "Sending prompt to ChatGPT...")
-        
-        prompt = f"""Provide the full name of the Chief Human Resources Officer (CHRO) of {company_name}, based in India, as of February 23, 2025. Ensure the response pertains exclusively to {company_name} and no other entity or region. Respond with only the full name, nothing else. Also give the LinkedIn URL."""
-        
-        if openai_send_prompt(driver, prompt):
+        with openai_driver_pool.session() as driver:
             if progress:
-                progress(0.7, "Waiting for ChatGPT response...")
+                progress(0.5, "Sending prompt to ChatGPT...")
             
-            response = openai_wait_for_response(driver)
+            prompt = CHRO_PROMPT_TEMPLATE.format(company_name=company_name)
             
-            if progress:
-                progress(1.0, "OpenAI search complete!")
+            if openai_send_prompt(driver, prompt):
+                if progress:
+                    progress(0.7, "Waiting for ChatGPT response...")
                 
-            return response
-        else:
-            return f"Failed to send prompt to ChatGPT for {company_name}"
+                response = openai_wait_for_response(driver)
+                if openai_blocker:
+                    openai_blocker.collect(driver)
+                
+                if progress:
+                    progress(1.0, "OpenAI search complete!")
+                    
+                return response
+            else:
+                return f"Failed to send prompt to ChatGPT for {company_name}"
             
+    except DriverPoolExhausted as e:
+        logger.error(f"OpenAI driver pool exhausted: {str(e)}")
+        return "Failed to initialize OpenAI driver"
     except Exception as e:
         logger.error(f"Error in OpenAI search: {str(e)}")
         return f"Error in OpenAI search: {str(e)}"
-        
-    finally:
-        driver.quit()
 
 # === Google (Gemini) Implementation ===
 def extract_json_from_text(text):
@@ -388,123 +436,115 @@ def extract_json_from_text(text):
         pass
     return text
 
-async def search_with_google_async(company_name, progress_callback=None):
-    """Search for CHRO using Google (Gemini)"""
+async def search_with_google_async(company_name, progress_callback=None, force_refresh=False):
+    """Search for CHRO using Google (Gemini) on the shared runtime loop"""
+    return await async_runtime.run_here(_search_with_google(company_name, progress_callback, force_refresh))
+
+async def _search_with_google(company_name, progress_callback=None, force_refresh=False):
+    """Search for CHRO using Google (Gemini); must run on the runtime loop that owns the crawler.
+
+    ``force_refresh`` skips the cached Gemini extraction as well.
+    """
     try:
         if progress_callback:
             progress_callback(0.1, "Initializing Google (Gemini) search...")
         
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        model = genai.GenerativeModel(GOOGLE_MODEL_ID)
         
         if progress_callback:
             progress_callback(0.3, "Setting up web crawler...")
         
-        async with AsyncWebCrawler() as crawler:
-            if progress_callback:
-                progress_callback(0.5, "Performing Google search...")
-            
-            search_query = f"who is the CHRO of {company_name} India linkedin"
-            result = await crawler.arun(url=f"https://www.google.com/search?q={'+'.join(search_query.split())}")
-            
-            # Extract relevant section
-            content = result.markdown
-            start_idx = content.find("Advanced Search")
-            if start_idx != -1:
-                content = content[start_idx:]
-            
-            if progress_callback:
-                progress_callback(0.7, "Processing with Gemini...")
-            
-            # Process with Gemini
-            prompt = f"""
-            Based on the following search results about {company_name}'s CHRO, provide only:
-            1. CHRO of India Name
-            2. LinkedIn URL (if available)
-            
-            Return ONLY a valid JSON object in this exact format, nothing else:
-            {{
-                "company": "{company_name}",
-                "chro_name": "name",
-                "linkedin_url": "url or null"
-            }}
-            
-            Search results:
-            {content}
-            """
-            
-            response = model.generate_content(prompt)
-            result_text = extract_json_from_text(response.text)
+        # Shared crawler: the headless browser is started once per process
+        crawler = await async_runtime.get_crawler()
+        
+        if progress_callback:
+            progress_callback(0.5, "Performing Google search...")
+        
+        search_query = f"who is the CHRO of {company_name} India linkedin"
+        result = await crawler.arun(url=f"https://www.google.com/search?q={'+'.join(search_query.split())}")
+        
+        # Keep only result blocks about the company, HR titles or LinkedIn profiles
+        content, _ = prune_search_markdown(result.markdown, company_name)
+        
+        if progress_callback:
+            progress_callback(0.7, "Processing with Gemini...")
+        
+        # Process with Gemini
+        prompt = GOOGLE_EXTRACTION_PROMPT_TEMPLATE.format(company_name=company_name, content=content)
+        
+        # Async call so the shared loop is never blocked on the API round-trip
+        async def generate():
+            response = await model.generate_content_async(prompt)
+            return response.text
+        
+        response_text = await llm_cache.aget_or_call(GOOGLE_MODEL_ID, prompt, generate, force_refresh=force_refresh)
+        result_text = extract_json_from_text(response_text)
+        
+        if progress_callback:
+            progress_callback(1.0, "Google search complete!")
             
-            if progress_callback:
-                progress_callback(1.0, "Google search complete!")
-                
-            return result_text
+        return result_text
             
     except Exception as e:
         logger.error(f"Error in Google search: {str(e)}")
         return f"Error in Google search: {str(e)}"
 
-def search_with_google(company_name, progress=None):
+def search_with_google(company_name, progress=None, force_refresh=False):
     """Wrapper for async Google search function"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(search_with_google_async(company_name, progress))
-    loop.close()
-    return result
+    return async_runtime.run(search_with_google_async(company_name, progress, force_refresh))
 
 # === JECRC (LinkedIn) Implementation ===
 async def search_with_jecrc_async(company_name, progress_callback=None):
-    """Search for CHRO using JECRC (LinkedIn)"""
+    """Search for CHRO using JECRC (LinkedIn); the profile fields are returned as a SourceResult"""
     if not LinkedInScraper:
-        return "LinkedIn Scraper module not available"
+        return SourceResult(source="jecrc", text="LinkedIn Scraper module not available", error="LinkedIn Scraper module not available")
     
     try:
         if progress_callback:
             progress_callback(0.1, "Initializing JECRC (LinkedIn) search...")
         
-        linkedin_scraper = LinkedInScraper()
+        linkedin_scraper = async_runtime.get_linkedin_scraper()
         
         if progress_callback:
             progress_callback(0.4, f"Searching LinkedIn for {company_name} CHRO...")
         
         # Scrape LinkedIn
-        linkedin_results = await linkedin_scraper.scrape_both_sources(company_name)
+        linkedin_results = await linkedin_scraper.scrape_both_sources(
+            company_name, search_query=JECRC_SEARCH_QUERY, location=JECRC_LOCATION
+        )
         
         if progress_callback:
             progress_callback(0.8, "Processing LinkedIn results...")
         
         if linkedin_results and linkedin_results.get('linkedin_results'):
             linkedin_profile = linkedin_results['linkedin_results'][0]
-            
-            result = {
-                "company": company_name,
-                "head_info": {
-                    "name": linkedin_profile.get('name', '').replace(f" - {company_name}", "") if linkedin_profile else "Information Not Available",
-                    "url": linkedin_profile.get('url', '') if linkedin_profile else "",
-                    "title": linkedin_profile.get('title', '') if linkedin_profile else "",
-                    "location": linkedin_profile.get('location', '') if linkedin_profile else "",
-                    "snippet": linkedin_profile.get('snippet', '') if linkedin_profile else ""
-                }
-            }
+            name = linkedin_profile.get('name', '').replace(f" - {company_name}", "") or "Information Not Available"
+            title = linkedin_profile.get('title', '')
+            url = linkedin_profile.get('url', '')
+            location = linkedin_profile.get('location', '')
             
             if progress_callback:
                 progress_callback(1.0, "JECRC search complete!")
-                
-            return f"Name: {result['head_info']['name']}\nTitle: {result['head_info']['title']}\nURL: {result['head_info']['url']}\nLocation: {result['head_info']['location']}"
+            
+            return SourceResult(
+                source="jecrc",
+                text=f"Name: {name}\nTitle: {title}\nURL: {url}\nLocation: {location}",
+                name=name,
+                url=url or None,
+                title=title or None,
+                location=location or None
+            )
         else:
-            return f"No LinkedIn results found for {company_name}"
+            message = f"No LinkedIn results found for {company_name}"
+            return SourceResult(source="jecrc", text=message, error=message)
             
     except Exception as e:
         logger.error(f"Error in JECRC search: {str(e)}")
-        return f"Error in JECRC search: {str(e)}"
+        return SourceResult(source="jecrc", text=f"Error in JECRC search: {str(e)}", error=str(e))
 
 def search_with_jecrc(company_name, progress=None):
     """Wrapper for async JECRC search function"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(search_with_jecrc_async(company_name, progress))
-    loop.close()
-    return result
+    return async_runtime.run(search_with_jecrc_async(company_name, progress))
 
 # === Perplexity Implementation ===
 def setup_perplexity_driver():
@@ -518,68 +558,38 @@ def setup_perplexity_driver():
     
     user_agent = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36'
     options.add_argument(f'user-agent={user_agent}')
+    if perplexity_blocker:
+        perplexity_blocker.configure_options(options)
     
     try:
-        # Try to detect Chrome version
-        try:
-            import subprocess
-            process = subprocess.Popen(
-                ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version'],
-                stdout=subprocess.PIPE
-            )
-            version = process.communicate()[0].decode('UTF-8').replace('Google Chrome ', '').strip()
-            chrome_version = int(version.split('.')[0])
-        except:
-            chrome_version = 133  # Default to latest version if can't detect
+        chrome_version = get_chrome_version(default=133, allow_network=False)
             
         driver = uc.Chrome(
             options=options,
             version_main=chrome_version
         )
         driver.set_page_load_timeout(30)
-        return driver
+        return enable_resource_blocking(driver, perplexity_blocker)
     except Exception as e:
         logger.error(f"Error initializing Perplexity driver with version: {str(e)}")
         try:
-            return uc.Chrome(options=options)
+            return enable_resource_blocking(uc.Chrome(options=options), perplexity_blocker)
         except Exception as fallback_error:
             logger.error(f"Perplexity driver fallback also failed: {str(fallback_error)}")
             return None
 
-def perplexity_wait_for_response(driver, timeout=60):
-    """Wait for and extract the response from Perplexity"""
+def perplexity_wait_for_response(driver, timeout=60, answers_before=None):
+    """Wait for and extract the response from Perplexity.
+
+    ``answers_before`` (from count_answers, taken before the prompt was sent)
+    limits detection to the newest answer when the session is reused.
+    """
     try:
-        wait = WebDriverWait(driver, timeout)
-        
-        # Wait for the loading indicator to disappear
-        try:
-            wait_loading = WebDriverWait(driver, 30)
-            wait_loading.until_not(
-                EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'animate-pulse')]"))
-            )
-        except Exception as e:
-            logger.warning(f"Loading indicator not found or didn't disappear: {str(e)}")
-        
-        # Try different selectors for the response
-        response_selectors = [
-            "//div[contains(@class, 'prose')]//p",
-            "//div[contains(@class, 'markdown-content')]//p",
-            "//div[contains(@class, 'response')]//p",
-            "//div[contains(@class, 'answer-content')]//p"
-        ]
+        detection = newest_answer_detector(answers_before).wait(driver, timeout)
         
         response_text = ""
-        for selector in response_selectors:
-            try:
-                wait_response = WebDriverWait(driver, 15)
-                elements = wait_response.until(
-                    EC.presence_of_all_elements_located((By.XPATH, selector))
-                )
-                response_text = "\n".join([elem.text for elem in elements if elem.text.strip()])
-                if response_text:
-                    break
-            except:
-                continue
+        if detection and detection.get('selector'):
+            response_text = "\n".join(detection['texts'][detection['selector']])
         
         # If no text found, try a more general approach
         if not response_text:
@@ -609,8 +619,10 @@ def perplexity_wait_for_response(driver, timeout=60):
 def perplexity_send_prompt(driver, prompt):
     """Send prompt to Perplexity"""
     try:
-        time.sleep(2)
-        
+        # Single-script insert and submit; fall back to typing into the textarea
+        if submit_prompt(driver, prompt):
+            return True
+
         wait = WebDriverWait(driver, 20)
         
         # Try multiple selectors for the textarea
@@ -666,90 +678,76 @@ def search_with_perplexity(company_name, progress=None):
     if progress:
         progress(0.1, "Initializing Perplexity search...")
     
-    driver = setup_perplexity_driver()
-    if not driver:
-        return "Failed to initialize Perplexity driver"
-    
     try:
-        if progress:
-            progress(0.3, "Navigating to Perplexity...")
-        
-        driver.get("https://www.perplexity.ai/")
-        time.sleep(5)
-        
-        if progress:
-            progress(0.5, "Sending prompt to Perplexity...")
-        
-        prompt = f"""Provide the full name of the Chief Human Resources Officer (CHRO) of {company_name}, based in India, as of February 23, 2025. Ensure the response pertains exclusively to {company_name} and no other entity or region. Respond with only the full name, nothing else. Also give the LinkedIn URL."""
-        
-        if perplexity_send_prompt(driver, prompt):
+        with perplexity_driver_pool.session() as driver:
             if progress:
-                progress(0.7, "Waiting for Perplexity response...")
+                progress(0.5, "Sending prompt to Perplexity...")
             
-            response = perplexity_wait_for_response(driver)
-            
-            if progress:
-                progress(1.0, "Perplexity search complete!")
+            prompt = CHRO_PROMPT_TEMPLATE.format(company_name=company_name)
+            answers_before = count_answers(driver)
+
+            if perplexity_send_prompt(driver, prompt):
+                if progress:
+                    progress(0.7, "Waiting for Perplexity response...")
+
+                response = perplexity_wait_for_response(driver, answers_before=answers_before)
+                if perplexity_blocker:
+                    perplexity_blocker.collect(driver)
                 
-            return response
-        else:
-            return f"Failed to send prompt to Perplexity for {company_name}"
+                if progress:
+                    progress(1.0, "Perplexity search complete!")
+                    
+                return response
+            else:
+                return f"Failed to send prompt to Perplexity for {company_name}"
             
+    except DriverPoolExhausted as e:
+        logger.error(f"Perplexity driver pool exhausted: {str(e)}")
+        return "Failed to initialize Perplexity driver"
     except Exception as e:
         logger.error(f"Error in Perplexity search: {str(e)}")
         return f"Error in Perplexity search: {str(e)}"
-        
-    finally:
-        driver.quit()
+
+# === Warm driver pools ===
+# Sessions are launched once, parked on the site's home page and reused across searches
+openai_driver_pool = DriverPool(
+    name="openai",
+    factory=setup_openai_driver,
+    home_url="https://chat.openai.com/",
+    size=int(os.getenv("OPENAI_POOL_SIZE", "1")),
+    max_uses=int(os.getenv("DRIVER_POOL_MAX_USES", "20")),
+    max_heap_growth_mb=float(os.getenv("DRIVER_POOL_MAX_HEAP_GROWTH_MB", "300")),
+    settle_seconds=5
+)
+
+perplexity_driver_pool = DriverPool(
+    name="perplexity",
+    factory=setup_perplexity_driver,
+    home_url=PERPLEXITY_HOME_URL,
+    size=int(os.getenv("PERPLEXITY_POOL_SIZE", "1")),
+    max_uses=int(os.getenv("DRIVER_POOL_MAX_USES", "20")),
+    max_heap_growth_mb=float(os.getenv("DRIVER_POOL_MAX_HEAP_GROWTH_MB", "300")),
+    settle_seconds=5,
+    # Returned sessions open a new thread in-page instead of reloading the site
+    reset=start_new_thread
+)
+
+def get_driver_pool_stats():
+    """Return counters for every warm driver pool and the resource blockers behind them"""
+    return {
+        'pools': [openai_driver_pool.stats(), perplexity_driver_pool.stats()],
+        'linkedin_browsers': async_runtime.get_linkedin_scraper().stats() if LinkedInScraper else None,
+        'resource_blocking': get_resource_blocking_stats()
+    }
 
 # === New Functions for Storage and Summary ===
 def store_results(company_name, perplexity_result, openai_result, google_result, linkedin_head_result):
-    """Store the results in a JSON file"""
+    """Store the results in the append-only results log"""
     try:
-        data = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'company': company_name,
-            'perplexity_result': {
-                'Response': perplexity_result,
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            'openai_result': {
-                'Response': openai_result,
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            'google_result': {
-                'chro_name': google_result.split("\n")[0] if "\n" in google_result else google_result,
-                'linkedin_url': google_result.split("\n")[1] if "\n" in google_result and len(google_result.split("\n")) > 1 else "Not found"
-            },
-            'linkedin_head_result': {
-                'head_info': {
-                    'name': linkedin_head_result.split("Name: ")[1].split("\n")[0] if "Name: " in linkedin_head_result else "Information Not Available",
-                    'title': linkedin_head_result.split("Title: ")[1].split("\n")[0] if "Title: " in linkedin_head_result else "",
-                    'url': linkedin_head_result.split("URL: ")[1].split("\n")[0] if "URL: " in linkedin_head_result else "",
-                    'location': linkedin_head_result.split("Location: ")[1].split("\n")[0] if "Location: " in linkedin_head_result else ""
-                }
-            }
-        }
+        data = results_record(company_name, perplexity_result, openai_result, google_result, linkedin_head_result)
         
-        filename = 'chro_results.json'
-        # Read existing data if file exists
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                try:
-                    existing_data = json.load(f)
-                    if not isinstance(existing_data, list):
-                        existing_data = [existing_data]
-                except:
-                    existing_data = []
-        else:
-            existing_data = []
-            
-        # Add new data
-        existing_data.append(data)
-        
-        # Write back to file
-        with open(filename, 'w') as f:
-            json.dump(existing_data, f, indent=4)
+        # O(1) append to the JSONL results log (legacy chro_results.json is migrated on first use)
+        get_result_store().append(data)
             
         return True
     except Exception as e:
@@ -758,14 +756,13 @@ def store_results(company_name, perplexity_result, openai_result, google_result,
 
 def format_data_for_prompt(company_name, perplexity_result, openai_result, google_result, linkedin_result):
     """Format the data in a clear way for summary generation"""
-    # Format Google result
-    google_name = google_result.split("\n")[0] if "\n" in google_result else google_result
-    google_linkedin = google_result.split("\n")[1] if "\n" in google_result and len(google_result.split("\n")) > 1 else "No URL available"
-    google_info = f"{google_name} - LinkedIn: {google_linkedin}" if google_linkedin else google_name
+    google = SourceResult.coerce("google", google_result)
     
-    # Format LinkedIn result
-    linkedin_parts = linkedin_result.split("\n")
-    linkedin_head_str = linkedin_result
+    # Google answers in JSON; its parsed fields read better in the prompt
+    if google.name:
+        google_info = f"{google.name} - LinkedIn: {google.url or 'No URL available'}"
+    else:
+        google_info = google.text
     
     # Format the data
     formatted_data = f"""
@@ -775,71 +772,120 @@ Source 2 (OpenAI): {openai_result}
 
 Source 3 (Google Search): {google_info}
 
-Source 4 (LinkedIn Head Search): {linkedin_head_str}
+Source 4 (LinkedIn Head Search): {linkedin_result}
 """
     return formatted_data
 
-def get_final_summary(company_name, perplexity_result, openai_result, google_result, linkedin_result, progress=None):
+def consensus_summary(company_name, perplexity_result, openai_result, google_result, linkedin_result):
+    """Summary resolved from the sources alone when they agree (see services.consensus), else None"""
+    consensus = resolve_consensus({
+        'perplexity': perplexity_result,
+        'openai': openai_result,
+        'google': google_result,
+        'jecrc': linkedin_result
+    })
+    if not consensus:
+        return None
+    return Summary.from_fields(company_name, consensus['name'], consensus['linkedin'], resolved_by='consensus')
+
+def save_final_summary(summary, perplexity_result, openai_result, google_result, linkedin_result):
+    """Append a Summary to final_summaries.json and index it for the Company Database tab"""
+    company_name = summary.company
+    result = {
+        'Company': company_name,
+        'Final_Summary': summary.text,
+        'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    # Store in a separate file
+    try:
+        with open('final_summaries.json', 'a') as f:
+            json.dump(result, f, indent=4)
+            f.write('\n')
+    except Exception as e:
+        logger.error(f"Error storing final summary: {str(e)}")
+    
+    # Index the run and summary for the Company Database tab
+    record_final_summary(
+        company_name,
+        summary.text,
+        result['Timestamp'],
+        source_results={
+            'perplexity': perplexity_result,
+            'openai': openai_result,
+            'google': google_result,
+            'jecrc': linkedin_result
+        },
+        name=summary.name or "Not available",
+        linkedin_url=summary.linkedin or "Not available"
+    )
+
+def resolve_summary(company_name, perplexity_result, openai_result, google_result, linkedin_result, progress=None,
+                    force_refresh=False, consensus_checked=False):
+    """Decide the final Summary for one company without storing anything; raises if Gemini fails.
+
+    ``consensus_checked`` means the caller already ran consensus and it escalated,
+    so it is not run (or counted in the consensus stats) a second time.
+    """
+    # Answer locally when the sources already agree; only conflicts go to Gemini
+    summary = None if consensus_checked else consensus_summary(
+        company_name, perplexity_result, openai_result, google_result, linkedin_result
+    )
+    if summary:
+        if progress:
+            progress(1.0, "Sources agree, summary resolved locally!")
+        return summary
+    
+    # Format data for the prompt
+    formatted_data = format_data_for_prompt(company_name, perplexity_result, openai_result, google_result, linkedin_result)
+    
+    if progress:
+        progress(0.1, "Initializing Gemini 1.5 Flash for final summary...")
+    
+    # Use Gemini 1.5 Flash model
+    model = genai.GenerativeModel(SUMMARY_MODEL_ID)
+    
+    if progress:
+        progress(0.5, "Sending summary request to Gemini...")
+    
+    summary_prompt = SUMMARY_PROMPT_TEMPLATE.format(company_name=company_name, formatted_data=formatted_data)
+    
+    # Generate content with Gemini (cached by model + prompt)
+    final_summary = llm_cache.get_or_call(
+        SUMMARY_MODEL_ID, summary_prompt, lambda: model.generate_content(summary_prompt).text, force_refresh=force_refresh
+    )
+    
+    if progress:
+        progress(1.0, "Summary generation complete!")
+    
+    return Summary.from_text(company_name, final_summary)
+
+def get_final_summary(company_name, perplexity_result, openai_result, google_result, linkedin_result, progress=None,
+                      force_refresh=False, consensus_checked=False):
     """Generate a final summary using Gemini 1.5 Flash"""
     try:
+        # Parse each source once; everything below works on the structured results
+        perplexity_result, openai_result, google_result, linkedin_result = (
+            SourceResult.coerce(source, value) for source, value in zip(
+                ("perplexity", "openai", "google", "jecrc"),
+                (perplexity_result, openai_result, google_result, linkedin_result)
+            )
+        )
+        
         # Store results first
         store_results(company_name, perplexity_result, openai_result, google_result, linkedin_result)
         
-        # Format data for the prompt
-        formatted_data = format_data_for_prompt(company_name, perplexity_result, openai_result, google_result, linkedin_result)
-        
-        if progress:
-            progress(0.1, "Initializing Gemini 1.5 Flash for final summary...")
-        
         try:
-            # Use Gemini 1.5 Flash model
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            if progress:
-                progress(0.5, "Sending summary request to Gemini...")
-            
-            summary_prompt = f"""Act as a professional HR data analyst. I have gathered information about the CHRO (Chief Human Resources Officer) of {company_name} from four different sources. Here is the verified data:
-
-{formatted_data}
-
-Based on these sources, I need you to provide ONLY:
-1. The full name of the current CHRO
-2. Their LinkedIn URL
-
-Format your response as:
-Name: [Full Name]
-LinkedIn: [URL]
-
-If the information from the sources is conflicting, provide the name and URL that appears most reliable based on source consistency.
-"""
-            
-            # Generate content with Gemini
-            response = model.generate_content(summary_prompt)
-            final_summary = response.text
-            
-            if progress:
-                progress(1.0, "Summary generation complete!")
-            
-            # Store the final summary
-            result = {
-                'Company': company_name,
-                'Final_Summary': final_summary,
-                'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Store in a separate file
-            try:
-                with open('final_summaries.json', 'a') as f:
-                    json.dump(result, f, indent=4)
-                    f.write('\n')
-            except Exception as e:
-                logger.error(f"Error storing final summary: {str(e)}")
-            
-            return final_summary
-                
+            summary = resolve_summary(
+                company_name, perplexity_result, openai_result, google_result, linkedin_result, progress, force_refresh,
+                consensus_checked
+            )
         except Exception as e:
             logger.error(f"Error in summary generation: {str(e)}")
             return f"Error generating summary: {str(e)}"
+        
+        save_final_summary(summary, perplexity_result, openai_result, google_result, linkedin_result)
+        return summary.text
             
     except Exception as e:
         logger.error(f"Error in get_final_summary: {str(e)}")
@@ -852,19 +898,8 @@ def load_final_summaries():
         if not os.path.exists('final_summaries.json'):
             return "No final summaries found. Generate summaries first."
         
-        with open('final_summaries.json', 'r') as f:
-            content = f.read()
-            
-        # Split by newlines since each JSON object is on a separate line
-        json_objects = [line.strip() for line in content.split('\n') if line.strip()]
-        
-        results = []
-        for json_obj in json_objects:
-            try:
-                data = json.loads(json_obj)
-                results.append(data)
-            except json.JSONDecodeError:
-                continue
+        # Objects are pretty-printed across several lines, so decode them as a stream
+        results = [data for data in get_json_stream_reader('final_summaries.json').read() if isinstance(data, dict)]
         
         if not results:
             return "No valid summaries found in final_summaries.json"
@@ -885,210 +920,398 @@ def load_final_summaries():
         return f"Error loading final summaries: {str(e)}"
 
 # === Gradio Interface ===
-def search_chro(company_name, progress=gr.Progress()):
-    """Main function to search for CHRO using all four methods in specified order"""
-    # Initialize results dictionary with status messages
-    results = {
-        "perplexity": "🔍 Starting Perplexity search...",
-        "openai": "⏳ Waiting...",
-        "google": "⏳ Waiting...",
-        "jecrc": "⏳ Waiting...",
-        "summary": "⏳ Waiting for all searches to complete..."
-    }
-    
-    # First update to display initial state
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
-    
-    # Add a small delay for UI to update
-    time.sleep(1)
-    
-    # 1. Search with Perplexity (First)
-    progress(0, "Starting Perplexity search...")
-    results["perplexity"] = "🔍 Searching with Perplexity..."
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
-    
-    # Perform the search
-    perplexity_result = search_with_perplexity(company_name, lambda p, m: progress(p * 0.2, m))
-    
-    # Update with Perplexity result and prepare for next search
-    results["perplexity"] = perplexity_result
-    results["openai"] = "🔍 Starting OpenAI search..."
-    progress(0.2, "Perplexity search complete!")
-    
-    # Add a delay to ensure UI updates and user can see the result
-    time.sleep(2)
-    
-    # Update UI with Perplexity results
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
-    
-    # Add a small delay before starting next search
-    time.sleep(1)
-    
-    # 2. Search with OpenAI (ChatGPT) (Second)
-    progress(0.2, "Starting OpenAI (ChatGPT) search...")
-    results["openai"] = "🔍 Searching with OpenAI..."
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
-    
-    # Perform the search
-    openai_result = search_with_openai(company_name, lambda p, m: progress(0.2 + p * 0.2, m))
-    
-    # Update with OpenAI result and prepare for next search
-    results["openai"] = openai_result
-    results["google"] = "🔍 Starting Google search..."
-    progress(0.4, "OpenAI search complete!")
-    
-    # Add a delay to ensure UI updates and user can see the result
-    time.sleep(2)
+SOURCE_LABELS = {
+    "perplexity": "Perplexity",
+    "openai": "OpenAI (ChatGPT)",
+    "google": "Google (Gemini)",
+    "jecrc": "JECRC (LinkedIn)",
+}
+
+# Every source sits behind the persistent lookup cache, keyed by company, source and prompt template
+lookup_cache = get_lookup_cache()
+
+# Selenium sources share a bounded pool; async sources run as tasks on the fan-out loop
+search_orchestrator = SearchOrchestrator(
+    sources={
+        "perplexity": lookup_cache.cached("perplexity", CHRO_PROMPT_TEMPLATE, search_with_perplexity),
+        "openai": lookup_cache.cached("openai", CHRO_PROMPT_TEMPLATE, search_with_openai),
+        "google": lookup_cache.cached(
+            "google", GOOGLE_EXTRACTION_PROMPT_TEMPLATE, search_with_google_async, forward_refresh=True
+        ),
+        "jecrc": lookup_cache.cached("jecrc", JECRC_QUERY_TEMPLATE, search_with_jecrc_async),
+    },
+    max_workers=int(os.getenv("SEARCH_SELENIUM_WORKERS", "2")),
+    quorum=int(os.getenv("SEARCH_SUMMARY_QUORUM", "3")),
+    runtime=async_runtime,
+)
+
+def summarize_results(company_name, results, force_refresh=False, persist=True, consensus_checked=False):
+    """Run get_final_summary over whatever source results are in when the quorum is met.
+
+    With ``persist=False`` nothing is stored and a freshly resolved Summary is
+    returned, for persist_run to save once every source has finished.
+    """
+    source_results = _source_results(results)
     
-    # Update UI with OpenAI results
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
+    # The summary depends on its inputs as well as the template, so both go into the cache key
+    summary_key = SUMMARY_PROMPT_TEMPLATE + format_data_for_prompt(company_name, *source_results)
+    if not force_refresh:
+        cached_summary = lookup_cache.get(company_name, "summary", summary_key)
+        if cached_summary is not None:
+            return cached_summary
     
-    # Add a small delay before starting next search
-    time.sleep(1)
+    if persist:
+        summary = get_final_summary(
+            company_name, *source_results, force_refresh=force_refresh, consensus_checked=consensus_checked
+        )
+    else:
+        try:
+            summary = resolve_summary(
+                company_name, *source_results, force_refresh=force_refresh, consensus_checked=consensus_checked
+            )
+        except Exception as e:
+            logger.error(f"Error in summary generation: {str(e)}")
+            return f"Error generating summary: {str(e)}"
+    if is_cacheable(summary):
+        lookup_cache.put(company_name, "summary", summary_key, str(summary))
+    return summary
+
+def persist_run(company_name, results, summary):
+    """Store a streamed search once every source has finished, with the summary started at quorum"""
+    source_results = _source_results(results)
+    store_results(company_name, *source_results)
+    # Cached summaries were saved by the run that produced them; errors are never saved
+    if isinstance(summary, Summary):
+        save_final_summary(summary, *source_results)
+
+def _source_results(results):
+    """SourceResults in prompt order; sources that have not answered yet are marked pending"""
+    return [
+        SourceResult.coerce(name, results[name]) if name in results else SourceResult.pending(name)
+        for name in ("perplexity", "openai", "google", "jecrc")
+    ]
+
+def summary_cost(company_name, results):
+    """Estimated prompt tokens one company adds to a batched summary request"""
+    return estimate_tokens(format_data_for_prompt(company_name, *_source_results(results)))
+
+def summarize_results_batch(batch, force_refresh=False):
+    """Summarize many companies with as few Gemini calls as possible.
+
+    ``batch`` is a list of ``(company_name, results)`` pairs. Companies are
+    packed into prompts up to SUMMARY_BATCH_TOKEN_BUDGET tokens, and each
+    returns one item in a JSON array. Companies whose item is missing or
+    invalid fall back to a per-company summarize_results call.
+    """
+    summaries = {}
+    misses = []
+    for company_name, results in batch:
+        source_results = _source_results(results)
+        summary_key = SUMMARY_PROMPT_TEMPLATE + format_data_for_prompt(company_name, *source_results)
+        cached_summary = None if force_refresh else lookup_cache.get(company_name, "summary", summary_key)
+        if cached_summary is not None:
+            summaries[company_name] = cached_summary
+            continue
+        
+        # Companies whose sources agree never enter a prompt
+        summary = consensus_summary(company_name, *source_results)
+        if summary:
+            store_results(company_name, *source_results)
+            save_final_summary(summary, *source_results)
+            lookup_cache.put(company_name, "summary", summary_key, summary.text)
+            summaries[company_name] = summary.text
+        else:
+            misses.append((company_name, results, summary_key))
     
-    # 3. Search with Google (Gemini) (Third)
-    progress(0.4, "Starting Google (Gemini) search...")
-    results["google"] = "🔍 Searching with Google..."
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
+    model = genai.GenerativeModel(SUMMARY_MODEL_ID)
+    chunks = pack_batches(
+        misses,
+        lambda item: summary_cost(item[0], item[1]),
+        token_budget=SUMMARY_BATCH_TOKEN_BUDGET,
+        max_items=SUMMARY_BATCH_MAX_COMPANIES
     )
+    for chunk in chunks:
+        companies = [company_name for company_name, _, _ in chunk]
+        companies_block = "\n".join(
+            f"### id {index}: {company_name}\n{format_data_for_prompt(company_name, *_source_results(results)).strip()}\n"
+            for index, (company_name, results, _) in enumerate(chunk, 1)
+        )
+        prompt = BATCH_SUMMARY_PROMPT_TEMPLATE.format(count=len(chunk), companies_block=companies_block)
+        
+        try:
+            # Cache only complete answers so a truncated or mismatched array is not replayed on retry
+            response_text = llm_cache.get_or_call(
+                SUMMARY_MODEL_ID, prompt, lambda: model.generate_content(prompt).text, force_refresh=force_refresh,
+                cacheable=lambda text: len(parse_batch_response(text, companies)) == len(companies)
+            )
+            parsed = parse_batch_response(response_text, companies)
+        except Exception as e:
+            logger.error(f"Error in batched summary for {len(chunk)} companies: {str(e)}")
+            parsed = {}
+        logger.info(f"Batched summary: {len(parsed)}/{len(chunk)} companies answered in one request")
+        
+        for company_name, results, summary_key in chunk:
+            if company_name not in parsed:
+                # Consensus already escalated this company above
+                summaries[company_name] = summarize_results(
+                    company_name, results, force_refresh=force_refresh, consensus_checked=True
+                )
+                continue
+            item = parsed[company_name]
+            summary = Summary.from_fields(company_name, item['name'], item['linkedin'], resolved_by='batch')
+            source_results = _source_results(results)
+            store_results(company_name, *source_results)
+            save_final_summary(summary, *source_results)
+            lookup_cache.put(company_name, "summary", summary_key, summary.text)
+            summaries[company_name] = summary.text
     
-    # Perform the search
-    google_result = search_with_google(company_name, lambda p, m: progress(0.4 + p * 0.2, m))
-    
-    # Update with Google result and prepare for next search
-    results["google"] = google_result
-    results["jecrc"] = "🔍 Starting JECRC search..."
-    progress(0.6, "Google search complete!")
-    
-    # Add a delay to ensure UI updates and user can see the result
-    time.sleep(2)
-    
-    # Update UI with Google results
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
+    return summaries
+
+def get_lookup_cache_stats():
+    """Return lookup cache, LLM response cache, prompt pruning and consensus counters"""
+    return {
+        'lookups': lookup_cache.stats(),
+        'llm_responses': llm_cache.stats(),
+        'prompt_pruning': get_pruning_stats(),
+        'consensus': get_consensus_stats()
+    }
+
+def search_chro(company_name, force_refresh=False, progress=gr.Progress()):
+    """Main function to search for CHRO using all four methods concurrently"""
+    results = {name: f"🔍 Searching with {label}..." for name, label in SOURCE_LABELS.items()}
+    results["summary"] = "⏳ Waiting for search results..."
+    total_steps = len(SOURCE_LABELS) + 1
+    completed = 0
+    source_results = {}
+
+    def snapshot():
+        return (
+            results["perplexity"],
+            results["openai"],
+            results["google"],
+            results["jecrc"],
+            results["summary"]
+        )
+
+    progress(0, "Starting all searches...")
+    yield snapshot()
+
+    # Stream each source into its output box as soon as it finishes
+    results_stream = search_orchestrator.iter_results(
+        company_name,
+        summarize=lambda company, source_results: summarize_results(company, source_results, force_refresh, persist=False),
+        source_kwargs={"force_refresh": force_refresh},
+        on_complete=persist_run
     )
-    
-    # Add a small delay before starting next search
-    time.sleep(1)
-    
-    # 4. Search with JECRC (LinkedIn) (Last)
-    progress(0.6, "Starting JECRC (LinkedIn) search...")
-    results["jecrc"] = "🔍 Searching with JECRC..."
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
+    for name, result in results_stream:
+        results[name] = str(result)
+        completed += 1
+
+        if name == SUMMARY_KEY:
+            progress(completed / total_steps, "✅ Gemini 1.5 Flash summary complete!")
+        else:
+            progress(completed / total_steps, f"{SOURCE_LABELS[name]} search complete!")
+            source_results[name] = result
+            # Same rule the orchestrator uses to start the summary, so failed sources do not count
+            if results["summary"].startswith("⏳") and search_orchestrator.summary_ready(source_results):
+                results["summary"] = "🔍 Analyzing results and creating summary with Gemini 1.5 Flash..."
+
+        yield snapshot()
+
+# === Company Database rendering ===
+COMPANY_PAGE_SIZE = int(os.getenv("COMPANY_PAGE_SIZE", "20"))
+
+COMPANY_DATABASE_CSS = """
+    <style>
+        .company-container {
+            max-width: 100%;
+            margin: 0 auto;
+        }
+        .company-header {
+            background-color: #2c3e50;
+            color: white;
+            padding: 15px 20px;
+            border-radius: 8px 8px 0 0;
+            font-size: 24px;
+            font-weight: bold;
+            margin-bottom: 20px;
+            text-align: center;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }
+        .company-card {
+            border-radius: 8px;
+            margin-bottom: 20px;
+            overflow: hidden;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+            transition: transform 0.3s ease, box-shadow 0.3s ease;
+            background-color: #ffffff;
+            border: 1px solid #e0e0e0;
+        }
+        .company-card:hover {
+            transform: translateY(-5px);
+            box-shadow: 0 6px 20px rgba(0,0,0,0.15);
+        }
+        .company-info {
+            padding: 20px;
+            background: linear-gradient(135deg, #f8f9fa, #e9ecef);
+        }
+        .company-info p {
+            margin: 10px 0;
+            font-size: 16px;
+            line-height: 1.5;
+        }
+        .company-info strong {
+            color: #2c3e50;
+            font-weight: bold;
+        }
+        .company-action {
+            padding: 15px;
+            display: flex;
+            justify-content: space-between;
+            background-color: #f1f3f5;
+            border-top: 1px solid #e0e0e0;
+        }
+        .company-url {
+            font-weight: bold;
+            color: #3498db;
+            word-break: break-all;
+            margin-bottom: 10px;
+            display: block;
+        }
+        .view-profile-btn {
+            background-color: #4CAF50;
+            color: white;
+            padding: 10px 15px;
+            border: none;
+            border-radius: 4px;
+            cursor: pointer;
+            font-weight: bold;
+            transition: background-color 0.3s ease;
+            width: 48%;
+        }
+        .terminal-cmd-btn {
+            background-color: #2196F3;
+            color: white;
+            padding: 10px 15px;
+            border: none;
+            border-radius: 4px;
+            cursor: pointer;
+            font-weight: bold;
+            transition: background-color 0.3s ease;
+            width: 48%;
+        }
+        .view-profile-btn:hover {
+            background-color: #388E3C;
+        }
+        .terminal-cmd-btn:hover {
+            background-color: #0b7dda;
+        }
+        .company-link a {
+            color: #3498db;
+            text-decoration: none;
+            font-weight: bold;
+        }
+        .company-link a:hover {
+            text-decoration: underline;
+        }
+        .company-page-info {
+            text-align: center;
+            color: #555;
+            margin-bottom: 15px;
+        }
+    </style>
+"""
+
+def company_action_js(action, row_id):
+    """Inline handler that pushes '<action>:<row id>' through the single hidden event channel"""
+    return (
+        "var box = document.querySelector('#company-action-payload textarea');"
+        "box.value = '" + action + ":" + str(row_id) + "';"
+        "box.dispatchEvent(new Event('input', {bubbles: true}));"
+        "setTimeout(function () { document.querySelector('#company-action-trigger').click(); }, 50);"
     )
+
+@lru_cache(maxsize=4096)
+def render_company_card(row_id, company, name, linkedin_url, timestamp):
+    """Render one company card; cached on the full record so unchanged rows are never rebuilt"""
+    parts = [
+        '<div class="company-card">',
+        '<div class="company-info">',
+        '<p><strong>Company:</strong> ', html.escape(company or 'Unknown'), '</p>',
+        '<p><strong>CHRO:</strong> ', html.escape(name or 'Not available'), '</p>',
+    ]
     
-    # Perform the search
-    jecrc_result = search_with_jecrc(company_name, lambda p, m: progress(0.6 + p * 0.2, m))
-    
-    # Update with JECRC result and prepare for summary
-    results["jecrc"] = jecrc_result
-    results["summary"] = "🔍 Generating comprehensive summary..."
-    progress(0.8, "JECRC search complete!")
-    
-    # Add a delay to ensure UI updates and user can see the result
-    time.sleep(2)
+    has_url = linkedin_url and linkedin_url != "Not available"
+    if has_url:
+        safe_url = html.escape(linkedin_url, quote=True)
+        parts += [
+            '<p class="company-link"><strong>LinkedIn:</strong> ',
+            '<a href="', safe_url, '" target="_blank">', safe_url, '</a></p>',
+        ]
+    else:
+        parts.append('<p><strong>LinkedIn:</strong> Not available</p>')
     
-    # Update UI with all search results before summary generation
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
+    parts += ['<p><strong>Timestamp:</strong> ', html.escape(timestamp or 'Unknown'), '</p></div>']
     
-    # Add a small delay before starting summary
-    time.sleep(1)
+    if has_url:
+        parts += [
+            '<div class="company-action">',
+            '<button class="view-profile-btn" onclick="', company_action_js('view', row_id), '">View in Browser</button>',
+            '<button class="terminal-cmd-btn" onclick="', company_action_js('terminal', row_id), '">Run Terminal Command</button>',
+            '</div>',
+        ]
     
-    # 5. Generate final summary
-    progress(0.8, "Generating comprehensive summary...")
-    results["summary"] = "🔍 Analyzing all results and creating summary with Gemini 1.5 Flash..."
-    yield (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
+    parts.append('</div>')
+    return ''.join(parts)
+
+def update_company_database(search="", page=1):
+    """Render a single page of the company database and return (html, page)"""
+    search = (search or "").strip() or None
+    total = get_company_count(search)
+    total_pages = max(1, -(-total // COMPANY_PAGE_SIZE))
+    page = min(max(1, int(page or 1)), total_pages)
     
-    # Generate the summary
-    summary_result = get_final_summary(
-        company_name, 
-        results["perplexity"], 
-        results["openai"], 
-        results["google"], 
-        results["jecrc"],
-        lambda p, m: progress(0.8 + p * 0.2, m)
-    )
+    data = get_formatted_company_data(search=search, limit=COMPANY_PAGE_SIZE, offset=(page - 1) * COMPANY_PAGE_SIZE)
+    if not data or not isinstance(data, list):
+        return "No company data available. Generate summaries first.", page
     
-    # Update with final summary
-    results["summary"] = summary_result
-    progress(1.0, "✅ Gemini 1.5 Flash summary complete!")
+    cards = [
+        render_company_card(item['id'], item.get('company'), item.get('name'), item.get('linkedin_url'), item.get('timestamp'))
+        for item in data
+    ]
+    html_output = ''.join([
+        COMPANY_DATABASE_CSS,
+        '<div class="company-container">',
+        '<div class="company-header">Company CHRO Database</div>',
+        '<div class="company-page-info">Page ', str(page), ' of ', str(total_pages), ' &middot; ', str(total), ' companies</div>',
+        *cards,
+        '</div>',
+    ])
+    return html_output, page
+
+def handle_company_action(payload):
+    """Dispatch a '<action>:<row id>' event from a company card button"""
+    action, _, row_id = (payload or "").partition(":")
+    if not row_id.isdigit():
+        return "Invalid company action."
     
-    # Add a delay to ensure UI updates with the summary
-    time.sleep(1)
+    row = get_company_summary(int(row_id))
+    if not row:
+        return f"Company row {row_id} not found."
     
-    # Final update with all results and summary
-    return (
-        results["perplexity"],
-        results["openai"],
-        results["google"],
-        results["jecrc"],
-        results["summary"]
-    )
+    if action == "terminal":
+        return run_terminal_command_for_linkedin(row.get('linkedin_url'))
+    return view_linkedin_profile(row.get('linkedin_url'))
 
 # Create the Gradio interface with tabs
-with gr.Blocks(title="Ultimate CHRO Finder with Gemini 1.5 Flash") as demo:
+with gr.Blocks(title="Ultimate CHRO Finder with Gemini 1.5 Flash", css=".company-event-channel {display: none !important;}") as demo:
     gr.Markdown("# Ultimate CHRO Finder with Gemini 1.5 Flash")
     gr.Markdown("Enter a company name to find its Chief Human Resources Officer (CHRO) using multiple search methods. A structured summary will be generated using Gemini 1.5 Flash.")
     
     with gr.Tabs():
         with gr.Tab("Search"):
             company_input = gr.Textbox(label="Company Name", placeholder="Enter company name...")
+            force_refresh_input = gr.Checkbox(label="Force refresh (ignore cached results)", value=False)
             search_button = gr.Button("Search")
             
             with gr.Row():
@@ -1103,240 +1326,71 @@ with gr.Blocks(title="Ultimate CHRO Finder with Gemini 1.5 Flash") as demo:
             
             search_button.click(
                 fn=search_chro,
-                inputs=company_input,
+                inputs=[company_input, force_refresh_input],
                 outputs=[perplexity_output, openai_output, google_output, jecrc_output, summary_output]
             )
+            
+            with gr.Accordion("Browser Pool Stats", open=False):
+                pool_stats_output = gr.JSON()
+                pool_stats_button = gr.Button("Refresh Pool Stats")
+                pool_stats_button.click(fn=get_driver_pool_stats, inputs=[], outputs=pool_stats_output)
+            
+            with gr.Accordion("Lookup Cache Stats", open=False):
+                cache_stats_output = gr.JSON()
+                cache_stats_button = gr.Button("Refresh Cache Stats")
+                cache_stats_button.click(fn=get_lookup_cache_stats, inputs=[], outputs=cache_stats_output)
         
         with gr.Tab("Company Database"):
             status_box = gr.Textbox(label="Status", visible=True)
-            refresh_db_button = gr.Button("Refresh Company Database")
             
-            # Create a container to display all company data
-            company_html = gr.HTML()
+            with gr.Row():
+                company_search = gr.Textbox(label="Search", placeholder="Filter by company or CHRO name...")
+                company_page = gr.Number(label="Page", value=1, precision=0, minimum=1)
             
-            # Function to update the company database display
-            def update_company_database():
-                data = get_formatted_company_data()
-                
-                if not data or not isinstance(data, list):
-                    return "No company data available. Generate summaries first."
-                
-                # Build an HTML representation of the data with improved styling
-                html_output = """
-                <style>
-                    .company-container {
-                        max-width: 100%;
-                        margin: 0 auto;
-                    }
-                    .company-header {
-                        background-color: #2c3e50;
-                        color: white;
-                        padding: 15px 20px;
-                        border-radius: 8px 8px 0 0;
-                        font-size: 24px;
-                        font-weight: bold;
-                        margin-bottom: 20px;
-                        text-align: center;
-                        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                    }
-                    .company-card {
-                        border-radius: 8px;
-                        margin-bottom: 20px;
-                        overflow: hidden;
-                        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-                        transition: transform 0.3s ease, box-shadow 0.3s ease;
-                        background-color: #ffffff;
-                        border: 1px solid #e0e0e0;
-                    }
-                    .company-card:hover {
-                        transform: translateY(-5px);
-                        box-shadow: 0 6px 20px rgba(0,0,0,0.15);
-                    }
-                    .company-info {
-                        padding: 20px;
-                        background: linear-gradient(135deg, #f8f9fa, #e9ecef);
-                    }
-                    .company-info p {
-                        margin: 10px 0;
-                        font-size: 16px;
-                        line-height: 1.5;
-                    }
-                    .company-info strong {
-                        color: #2c3e50;
-                        font-weight: bold;
-                    }
-                    .company-action {
-                        padding: 15px;
-                        display: flex;
-                        justify-content: space-between;
-                        background-color: #f1f3f5;
-                        border-top: 1px solid #e0e0e0;
-                    }
-                    .company-url {
-                        font-weight: bold;
-                        color: #3498db;
-                        word-break: break-all;
-                        margin-bottom: 10px;
-                        display: block;
-                    }
-                    .view-profile-btn {
-                        background-color: #4CAF50;
-                        color: white;
-                        padding: 10px 15px;
-                        border: none;
-                        border-radius: 4px;
-                        cursor: pointer;
-                        font-weight: bold;
-                        transition: background-color 0.3s ease;
-                        width: 48%;
-                    }
-                    .terminal-cmd-btn {
-                        background-color: #2196F3;
-                        color: white;
-                        padding: 10px 15px;
-                        border: none;
-                        border-radius: 4px;
-                        cursor: pointer;
-                        font-weight: bold;
-                        transition: background-color 0.3s ease;
-                        width: 48%;
-                    }
-                    .view-profile-btn:hover {
-                        background-color: #388E3C;
-                    }
-                    .terminal-cmd-btn:hover {
-                        background-color: #0b7dda;
-                    }
-                    .company-link a {
-                        color: #3498db;
-                        text-decoration: none;
-                        font-weight: bold;
-                    }
-                    .company-link a:hover {
-                        text-decoration: underline;
-                    }
-                </style>
-                <div class="company-container">
-                    <div class="company-header">Company CHRO Database</div>
-                """
-                
-                for i, item in enumerate(data):
-                    company = item.get('company', 'Unknown')
-                    name = item.get('name', 'Not available')
-                    linkedin_url = item.get('linkedin_url', 'Not available')
-                    timestamp = item.get('timestamp', 'Unknown')
-                    
-                    # Create the company card using string concatenation instead of f-strings
-                    card_header = (
-                        '<div class="company-card">'
-                        '<div class="company-info">'
-                        '<p><strong>Company:</strong> ' + company + '</p>'
-                        '<p><strong>CHRO:</strong> ' + name + '</p>'
-                    )
-                    html_output += card_header
-                    
-                    # More visible and clear display of LinkedIn URL
-                    if linkedin_url != "Not available":
-                        # Store the LinkedIn URL directly in a data attribute for easier access
-                        # Avoid f-strings for this part too
-                        url_html = (
-                            '<p class="company-link"><strong>LinkedIn:</strong> '
-                            '<a href="' + linkedin_url + '" target="_blank" id="linkedin-display-' + str(i) + '" '
-                            'data-url="' + linkedin_url + '">' + linkedin_url + '</a>'
-                            '</p>'
-                        )
-                        html_output += url_html
-                    else:
-                        html_output += '<p><strong>LinkedIn:</strong> Not available</p>'
-                        
-                    # Add timestamp using regular string concatenation
-                    timestamp_html = '<p><strong>Timestamp:</strong> ' + timestamp + '</p></div>'
-                    html_output += timestamp_html
-                    
-                    if linkedin_url != "Not available":
-                        # Avoid f-strings entirely for JavaScript portions
-                        # Use regular string concatenation for the HTML with JavaScript
-                        js_safe_url = linkedin_url.replace("'", "\\'")
-                        
-                        btn_html = (
-                            '<div class="company-action">'
-                            '<button class="view-profile-btn" '
-                            'onclick="'
-                            'var linkedinUrl = \'' + js_safe_url + '\';'
-                            'console.log(\'Setting LinkedIn URL:\', linkedinUrl);'
-                            'document.getElementById(\'linkedin-url-' + str(i) + '\').value = linkedinUrl;'
-                            'document.getElementById(\'view-profile-' + str(i) + '\').click();">'
-                            'View in Browser'
-                            '</button>'
-                            '<button class="terminal-cmd-btn" '
-                            'onclick="'
-                            'var linkedinUrl = \'' + js_safe_url + '\';'
-                            'console.log(\'Setting Terminal LinkedIn URL:\', linkedinUrl);'
-                            'document.getElementById(\'linkedin-url-terminal-' + str(i) + '\').value = linkedinUrl;'
-                            'document.getElementById(\'run-terminal-' + str(i) + '\').click();">'
-                            'Run Terminal Command'
-                            '</button>'
-                            '</div>'
-                        )
-                        
-                        html_output += btn_html
-                    
-                    html_output += """
-                    </div>
-                    """
-                
-                html_output += """
-                <script>
-                    // Debug function to check if LinkedIn URLs are correctly stored
-                    function debugLinkedInUrls() {
-                        var links = document.querySelectorAll('[id^="linkedin-display-"]');
-                        for (var i = 0; i < links.length; i++) {
-                            console.log('LinkedIn URL ' + i + ':', links[i].getAttribute('data-url'));
-                        }
-                    }
-                    
-                    // Execute this on page load
-                    setTimeout(debugLinkedInUrls, 1000);
-                </script>
-                </div>
-                """
-                
-                return html_output
+            with gr.Row():
+                prev_page_button = gr.Button("◀ Previous")
+                refresh_db_button = gr.Button("Refresh Company Database")
+                next_page_button = gr.Button("Next ▶")
             
-            # Initial load of company database
-            company_html.value = update_company_database()
+            # Create a container to display the current page of company data
+            company_html = gr.HTML()
             
-            # Add a series of invisible buttons for each possible company (up to a reasonable limit)
-            # These will be triggered by the HTML buttons
-            hidden_buttons = []
-            hidden_urls = []
-            max_companies = 20  # Set a reasonable maximum
+            # Initial load of company database
+            company_html.value = update_company_database()[0]
             
-            for i in range(max_companies):
-                # Create a visible textbox for debugging if needed
-                url_input = gr.Textbox(visible=False, elem_id=f"linkedin-url-{i}", label=f"LinkedIn URL {i}")
-                hidden_urls.append(url_input)
-                
-                # Create the button that will be triggered by the HTML button for viewing in browser
-                btn = gr.Button(f"Hidden Button {i}", visible=False, elem_id=f"view-profile-{i}")
-                btn.click(fn=view_linkedin_profile, inputs=[url_input], outputs=status_box)
-                hidden_buttons.append(btn)
-                
-                # Create additional textbox and button for terminal command
-                url_input_terminal = gr.Textbox(visible=False, elem_id=f"linkedin-url-terminal-{i}", label=f"LinkedIn URL Terminal {i}")
-                hidden_urls.append(url_input_terminal)
-                
-                # Create the button that will be triggered by the HTML button for running terminal command
-                terminal_btn = gr.Button(f"Hidden Terminal Button {i}", visible=False, elem_id=f"run-terminal-{i}")
-                terminal_btn.click(fn=run_terminal_command_for_linkedin, inputs=[url_input_terminal], outputs=status_box)
-                hidden_buttons.append(terminal_btn)
+            # Single event channel: card buttons write '<action>:<row id>' and click the trigger
+            company_action_payload = gr.Textbox(elem_id="company-action-payload", elem_classes=["company-event-channel"], show_label=False)
+            company_action_trigger = gr.Button("Company Action", elem_id="company-action-trigger", elem_classes=["company-event-channel"])
+            company_action_trigger.click(fn=handle_company_action, inputs=[company_action_payload], outputs=status_box)
             
-            # Update when refresh button is clicked
+            # Update when refresh, search or paging changes
             refresh_db_button.click(
                 fn=update_company_database,
-                inputs=[],
-                outputs=company_html
+                inputs=[company_search, company_page],
+                outputs=[company_html, company_page]
+            )
+            company_search.submit(
+                fn=lambda search: update_company_database(search, 1),
+                inputs=[company_search],
+                outputs=[company_html, company_page]
+            )
+            prev_page_button.click(
+                fn=lambda search, page: update_company_database(search, (page or 1) - 1),
+                inputs=[company_search, company_page],
+                outputs=[company_html, company_page]
+            )
+            next_page_button.click(
+                fn=lambda search, page: update_company_database(search, (page or 1) + 1),
+                inputs=[company_search, company_page],
+                outputs=[company_html, company_page]
             )
 
 if __name__ == "__main__":
-    demo.launch(share=True) 
\ No newline at end of file
+    openai_driver_pool.warm()
+    perplexity_driver_pool.warm()
+    try:
+        demo.launch(share=True)
+    finally:
+        openai_driver_pool.close()
+        perplexity_driver_pool.close()
+        async_runtime.shutdown() 
\ No newline at end of file